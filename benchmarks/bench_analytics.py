@@ -0,0 +1,149 @@
+"""
+Sydney Umezurike
+bench_analytics.py
+CS 5001 - Memory Game
+Benchmark for the streaming leaderboard summaries.
+Adds millions of results to one quantile sketch and
+reports the update time of each block, which should
+stay flat, the sketch size and its quantile error.
+Then grows a scratch score database and times saving
+a result and reading a percentile at every size,
+next to the exact SQL count the summaries replace.
+
+Usage:
+    python benchmarks/bench_analytics.py --values 2000000 --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from score_analytics import MOVES, QuantileSketch, share_beaten
+from score_store import ScoreStore
+from solver import ExpectedMovesTable
+
+CARD_COUNTS = [8, 10, 12]
+
+
+def bench_sketch(values, blocks, seed):
+    """Time adding values to one sketch, block by block, and check its quantiles."""
+    rng = np.random.default_rng(seed)
+    data = rng.lognormal(3, 0.6, values)
+    sketch = QuantileSketch()
+    parts = [QuantileSketch() for _ in range(4)]
+    size = values // blocks
+    print(f"{'values':>12}{'us/update':>12}{'sketch bytes':>14}")
+    for block in range(blocks):
+        chunk = data[block * size:(block + 1) * size].tolist()
+        start = time.perf_counter()
+        for value in chunk:
+            sketch.add(value)
+        elapsed = time.perf_counter() - start
+        for value in chunk[::len(parts)]:
+            parts[block % len(parts)].add(value)
+        print(f"{(block + 1) * size:>12,}{elapsed * 1e6 / len(chunk):>12.3f}{len(sketch.to_bytes()):>14,}")
+
+    merged = QuantileSketch()
+    start = time.perf_counter()
+    for part in parts:
+        merged.merge(part)
+    merge_ms = (time.perf_counter() - start) * 1000
+    print(f"merge {len(parts)} sketches: {merge_ms:.3f} ms")
+    print(f"{'quantile':>10}{'sketch':>12}{'exact':>12}{'error':>10}")
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        exact = float(np.quantile(data[:blocks * size], q))
+        estimate = sketch.quantile(q)
+        print(f"{q:>10}{estimate:>12.3f}{exact:>12.3f}{abs(estimate / exact - 1):>10.2%}")
+
+
+def bench_store(rows, steps, seed):
+    """Grow a score database and time saves and percentile reads at each size."""
+    rng = random.Random(seed)
+    table = ExpectedMovesTable()
+    scratch = tempfile.mkdtemp(prefix="memory_analytics_")
+    db_path = os.path.join(scratch, "scores.db")
+    store = ScoreStore(db_path, legacy_path=db_path + ".missing")
+    sizes = sorted({max(1, rows // 10 ** i) for i in range(steps)})
+    print(f"\n{'rows':>10}{'catch up ms':>13}{'snapshot ms':>13}{'save us':>10}"
+          f"{'percentile us':>15}{'SQL rank us':>13}")
+    loaded = 0
+    for size in sizes:
+        batch = []
+        for _ in range(size - loaded):
+            card_count = rng.choice(CARD_COUNTS)
+            moves = rng.randrange(card_count // 2, 6 * card_count)
+            batch.append((f"player{rng.randrange(10000)}", moves, "default_deck.txt", card_count,
+                          0.0, table.efficiency(moves, card_count)))
+        # Load through another connection, like another game process saving
+        other = sqlite3.connect(db_path)
+        with other:
+            other.executemany(
+                "INSERT INTO results (name, moves, deck, card_count, created, efficiency) "
+                "VALUES (?, ?, ?, ?, ?, ?)", batch)
+        other.close()
+        loaded = size
+
+        # Results saved elsewhere are folded in on the next read
+        start = time.perf_counter()
+        store.summary("all", MOVES)
+        catch_up = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        with store._write() as cursor:
+            store.analytics.flush(cursor)
+        snapshot = (time.perf_counter() - start) * 1000
+
+        saves = 300
+        start = time.perf_counter()
+        for _ in range(saves):
+            moves = rng.randrange(4, 48)
+            store.add_result("bench", moves, "default_deck.txt", 8, table.efficiency(moves, 8))
+        save = (time.perf_counter() - start) * 1e6 / saves
+
+        start = time.perf_counter()
+        for _ in range(saves):
+            share_beaten(store.summary("count:8", MOVES), rng.randrange(4, 48))
+        percentile = (time.perf_counter() - start) * 1e6 / saves
+
+        start = time.perf_counter()
+        for _ in range(10):
+            store.connection.execute("SELECT COUNT(*) FROM results WHERE card_count = 8 AND moves > ?",
+                                     (rng.randrange(4, 48),)).fetchone()
+        exact = (time.perf_counter() - start) * 1e6 / 10
+        print(f"{store.count():>10,}{catch_up:>13.1f}{snapshot:>13.1f}{save:>10.1f}"
+              f"{percentile:>15.1f}{exact:>13.1f}")
+
+    store.close()
+    start = time.perf_counter()
+    reopened = ScoreStore(db_path, legacy_path=db_path + ".missing")
+    reopened.summary("count:8", MOVES)
+    print(f"reopen and read a summary from the snapshot: {(time.perf_counter() - start) * 1000:.1f} ms")
+    reopened.close()
+    for name in os.listdir(scratch):
+        os.remove(os.path.join(scratch, name))
+    os.rmdir(scratch)
+
+
+def main():
+    """Run the sketch and store benchmarks."""
+    parser = argparse.ArgumentParser(description="Streaming leaderboard summaries benchmark")
+    parser.add_argument("--values", type=int, default=2000000, help="values added to one sketch")
+    parser.add_argument("--blocks", type=int, default=10, help="timing blocks for the sketch")
+    parser.add_argument("--rows", type=int, default=1000000, help="largest score database")
+    parser.add_argument("--steps", type=int, default=4, help="database sizes, each 10x the last")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    args = parser.parse_args()
+
+    bench_sketch(args.values, args.blocks, args.seed)
+    bench_store(args.rows, args.steps, args.seed)
+
+
+if __name__ == "__main__":
+    main()
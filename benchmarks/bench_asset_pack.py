@@ -0,0 +1,168 @@
+"""
+Sydney Umezurike
+bench_asset_pack.py
+CS 5001 - Memory Game
+Benchmark for cold-start asset loading.
+Does the image work of a launch until the board is
+playable: the splash and UI images, the deck's faces
+and the flip frames, through the game's own preloader,
+deck loading and flip setup. Runs it from the loose
+files, with their manifest and image cache already
+built as on every launch after the first, and from an
+asset pack built from the same decks. Before every run
+the files are dropped from the OS page cache where
+the kernel allows it, so their reads are cold, and the
+files opened and stat'ed are counted.
+
+Draws with Tk when there is a display, or on Xvfb if
+it is installed, and on the fake turtle screen
+otherwise, which skips Tk's image decoding.
+
+Usage:
+    python benchmarks/bench_asset_pack.py --decks default_deck.txt custom_deck.txt --runs 20
+"""
+
+import argparse
+import builtins
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from bench_soak import open_display, make_renderer
+
+
+class FileCounter:
+    """Counts files opened and stat'ed while it is active."""
+
+    def __enter__(self):
+        self.opens = self.stats = 0
+        self._open, self._stat = builtins.open, os.stat
+
+        def counting_open(*args, **kwargs):
+            self.opens += 1
+            return self._open(*args, **kwargs)
+
+        def counting_stat(*args, **kwargs):
+            self.stats += 1
+            return self._stat(*args, **kwargs)
+        builtins.open, os.stat = counting_open, counting_stat
+        return self
+
+    def __exit__(self, *exc):
+        builtins.open, os.stat = self._open, self._stat
+
+
+def evict(folders, files=()):
+    """Drop every file under some folders from the OS page cache.
+
+    Returns:
+        bool: False if the kernel does not support it.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    paths = list(files)
+    for folder in folders:
+        for root, _, names in os.walk(folder):
+            paths.extend(os.path.join(root, name) for name in names)
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            return False
+        finally:
+            os.close(fd)
+    return True
+
+
+def cold_start(deck, pack_path, display):
+    """Load what a launch needs for a deck, from the pack if pack_path is given.
+
+    Returns:
+        dict: Milliseconds taken, files opened and stat'ed, and shapes registered.
+    """
+    from asset_pack import AssetPack
+    from constants import ASSETS_PATH, IMAGE_CACHE_PATH, SPLASH_SCREEN
+    from main import MemoryGame
+    from startup import AssetPreloader
+
+    renderer, _ = make_renderer(display)
+    game = MemoryGame(renderer)
+    game.replays_path = None
+    game.session_path = None
+    game.current_deck = deck
+    evict([ASSETS_PATH, IMAGE_CACHE_PATH], [pack_path] if pack_path else [])
+    with FileCounter() as counter:
+        start = time.perf_counter()
+        if pack_path:
+            game.use_pack(AssetPack(pack_path))
+        game.assets.register(os.path.join(ASSETS_PATH, SPLASH_SCREEN), pinned=True)
+        preloader = AssetPreloader(deck, game.startup_images(), game.pack)
+        preloader.run()  # On this thread, so the time covers all of it
+        while not preloader.pump(game.assets, 1000):
+            pass
+        game.load_deck()
+        game.prepare_flips(game.deck_manifest.paths)
+        elapsed = (time.perf_counter() - start) * 1000
+    shapes = len(game.assets.entries)
+    if game.pack is not None:
+        game.pack.close()
+    renderer.bye()
+    return {"ms": elapsed, "opens": counter.opens, "stats": counter.stats, "shapes": shapes,
+            "errors": preloader.errors}
+
+
+def main():
+    """Run the asset pack benchmark."""
+    parser = argparse.ArgumentParser(description="Asset pack cold-start benchmark")
+    parser.add_argument("--decks", nargs="+", default=["default_deck.txt", "custom_deck.txt"],
+                        help="deck files in the assets folder")
+    parser.add_argument("--runs", type=int, default=20, help="cold starts per deck and source")
+    parser.add_argument("--display", choices=["auto", "tk", "fake", "null"], default="auto",
+                        help="what to draw on")
+    args = parser.parse_args()
+    display, xvfb = open_display(args.display)
+
+    from asset_pack import build_pack
+
+    folder = tempfile.mkdtemp(prefix="memory_pack_")
+    try:
+        pack_path = os.path.join(folder, "bench.mgpack")
+        start = time.perf_counter()
+        for error in build_pack(pack_path, args.decks):
+            print(f"  {error}")
+        built = (time.perf_counter() - start) * 1000
+        cold = evict([folder])
+        print(f"pack of {', '.join(args.decks)}: {os.path.getsize(pack_path) / 1024:.0f} KB, "
+              f"built in {built:.0f} ms; {args.runs} cold starts each on the {display} display, "
+              f"page cache {'dropped' if cold else 'not dropped (unsupported)'} before every run\n")
+
+        print(f"{'deck':<20}{'source':>8}{'p50 ms':>9}{'min ms':>9}{'max ms':>9}"
+              f"{'opens':>7}{'stats':>7}{'shapes':>8}")
+        for deck in args.decks:
+            for source, path in (("loose", None), ("pack", pack_path)):
+                cold_start(deck, path, display)  # Warm up imports and the image cache
+                results = [cold_start(deck, path, display) for _ in range(args.runs)]
+                times = [result["ms"] for result in results]
+                last = results[-1]
+                for error in last["errors"]:
+                    print(f"  {error}")
+                print(f"{deck:<20}{source:>8}{statistics.median(times):>9.2f}{min(times):>9.2f}"
+                      f"{max(times):>9.2f}{last['opens']:>7}{last['stats']:>7}{last['shapes']:>8}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
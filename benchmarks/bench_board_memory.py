@@ -0,0 +1,76 @@
+"""
+Sydney Umezurike
+bench_board_memory.py
+CS 5001 - Memory Game
+Measures how much memory large boards take.
+Builds the compact board for each size and compares
+the memory it allocates with the same board stored
+as one Card object per card, then plays a few guesses
+to time match checks on the big board.
+
+Usage:
+    python benchmarks/bench_board_memory.py --sizes 1000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from game_logic import Card, MemoryGameLogic
+
+
+def allocated(build):
+    """Return what build returns and the bytes it left allocated."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def card_objects(images):
+    """Build the board the old way, as a shuffled list of Card objects."""
+    deck = [Card(image) for image in images for _ in range(2)]
+    random.shuffle(deck)
+    return deck
+
+
+def main():
+    """Report board memory and match check speed for each size."""
+    parser = argparse.ArgumentParser(description="Compact board memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000],
+                        help="cards on each board")
+    parser.add_argument("--guesses", type=int, default=100000, help="random guesses to time")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    print(f"{'cards':>9}{'board KB':>11}{'traced KB':>11}{'Card list KB':>14}{'guess us':>10}")
+    for size in args.sizes:
+        images = [f"face{i}.gif" for i in range(size // 2)]
+        logic, board_bytes = allocated(lambda: MemoryGameLogic(images))
+        _, list_bytes = allocated(lambda: card_objects(images))
+
+        start = time.perf_counter()
+        for _ in range(args.guesses):
+            first, second = rng.randrange(size), rng.randrange(size)
+            logic.reveal(first)
+            logic.reveal(second)
+            if not logic.check_indices(first, second):
+                logic.hide(first)
+                logic.hide(second)
+        guess_us = (time.perf_counter() - start) / args.guesses * 1e6
+
+        print(f"{size:>9}{logic.nbytes() / 1024:>11.0f}{board_bytes / 1024:>11.0f}"
+              f"{list_bytes / 1024:>14.0f}{guess_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
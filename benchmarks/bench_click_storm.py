@@ -0,0 +1,166 @@
+"""
+Sydney Umezurike
+bench_click_storm.py
+CS 5001 - Memory Game
+Benchmark for input handling under a click storm.
+Fires random clicks at a board's cards at a steady
+rate, on the null renderer's virtual clock, and counts
+screen updates and the time from each click that
+changed the board until the update that drew it.
+Compares redrawing on every click, asking the game
+clock for an update on every click, and the input
+queue, which drops clicks that cannot do anything and
+applies the rest once per frame.
+
+Usage:
+    python benchmarks/bench_click_storm.py --rates 20 200 2000 --seconds 60
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import FRAME_MS
+from instrumentation import Histogram
+from main import MemoryGame
+from renderer import NullRenderer
+from score_store import ScoreStore
+
+MODES = ["every_click", "clock", "queue"]
+
+
+class StormRenderer(NullRenderer):
+    def __init__(self):
+        """A null renderer that counts updates and times clicks until they are drawn."""
+        super().__init__()
+        self.updates = 0
+        self.waiting = []  # Times of clicks that changed the board, not drawn yet
+        self.latency = Histogram("ms")
+
+    def update(self):
+        self.updates += 1
+        for clicked in self.waiting:
+            self.latency.record(self.now - clicked)
+        self.waiting = []
+
+
+def new_game(folder, mode, card_count, fps):
+    """Deal a board on a StormRenderer, with clicks wired up the way mode says.
+
+    Returns:
+        MemoryGame: The game, with its board on screen.
+    """
+    renderer = StormRenderer()
+    game = MemoryGame(renderer, score_store=ScoreStore(
+        os.path.join(folder, f"{mode}.db"), legacy_path=os.path.join(folder, "missing.txt")))
+    game.replays_path = None
+    game.session_path = None
+    game.clock.frame_ms = 1000 / fps
+    game.card_count = card_count
+    game.player_name = "storm"
+    renderer.width, renderer.height = 1600, 1200  # Room for the whole board, so every card can be clicked
+    game.setup_game()
+    wire_clicks(game, mode)
+    return game
+
+
+def wire_clicks(game, mode):
+    """Point the renderer's clicks past the input queue, unless mode is "queue".
+
+    Dealing a board wires clicks to the queue again, so this runs after every deal.
+    """
+    if mode == "queue":
+        return
+    renderer = game.renderer
+
+    def handle(x, y):
+        # Without the queue every click is handled as it arrives and asks for a redraw
+        if game.handle_click(x, y):
+            renderer.waiting.append(renderer.now)
+        if mode == "every_click":
+            renderer.update()
+        else:
+            game.clock.request_update()
+    renderer.onclick(handle)
+
+
+def storm(folder, mode, rate, seconds, card_count, fps, seed):
+    """Click random cards at rate clicks per second for a number of virtual seconds.
+
+    Returns:
+        dict: Counts, latency and CPU time for the run.
+    """
+    rng = random.Random(seed)
+    game = new_game(folder, mode, card_count, fps)
+    renderer = game.renderer
+    clicks = games = 0
+    cpu = 0.0
+    end = seconds * 1000
+    while renderer.now < end:
+        gap = rng.expovariate(rate / 1000)
+        start = time.perf_counter()
+        renderer.advance(gap)
+        x, y = game.hit_index.cell_center(rng.choice(list(game.cards)))
+        renderer.click(x, y)
+        clicks += 1
+        if game.logic.check_all_matched():
+            renderer.advance(FRAME_MS)  # Let the winning frame draw
+            games += 1
+            game.start_reload()
+            wire_clicks(game, mode)
+        cpu += time.perf_counter() - start
+    renderer.advance(1000 * 2)  # Let the last flips settle and draw
+    latency = game.input_queue.latency if mode == "queue" else renderer.latency
+    stats = game.input_queue.stats()
+    game.leaderboard.store.close()
+    return {
+        "clicks": clicks,
+        "updates": renderer.updates,
+        "updates_per_s": renderer.updates / seconds,
+        "dropped": stats["dropped"] + stats["coalesced"],
+        "games": games,
+        "p50": latency.percentile(50),
+        "p99": latency.percentile(99),
+        "max": latency.max if latency.count else 0.0,
+        "cpu_us": cpu * 1e6 / max(clicks, 1),
+    }
+
+
+def main():
+    """Run the click storm benchmark."""
+    parser = argparse.ArgumentParser(description="Click storm benchmark")
+    parser.add_argument("--rates", type=int, nargs="+", default=[20, 200, 2000],
+                        help="clicks per second")
+    parser.add_argument("--seconds", type=int, default=60, help="virtual seconds per run")
+    parser.add_argument("--cards", type=int, default=12, help="cards on the board")
+    parser.add_argument("--fps", type=float, default=1000 / FRAME_MS, help="frame rate cap")
+    parser.add_argument("--seed", type=int, default=5001, help="click seed")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="memory_click_storm_")
+    try:
+        print(f"{args.cards} cards, {args.seconds} virtual seconds per run, "
+              f"frames capped at {args.fps:.0f} fps; latency is from a click to the "
+              f"update that drew it")
+        print(f"{'clicks/s':>9}{'mode':>13}{'clicks':>8}{'updates':>9}{'upd/s':>7}"
+              f"{'dropped':>9}{'games':>7}{'p50 ms':>8}{'p99 ms':>8}{'max ms':>8}{'cpu us':>8}")
+        for rate in args.rates:
+            for mode in MODES:
+                result = storm(folder, mode, rate, args.seconds, args.cards, args.fps,
+                               args.seed + rate)
+                print(f"{rate:>9}{mode:>13}{result['clicks']:>8}{result['updates']:>9}"
+                      f"{result['updates_per_s']:>7.1f}{result['dropped']:>9}{result['games']:>7}"
+                      f"{result['p50']:>8.1f}{result['p99']:>8.1f}{result['max']:>8.1f}"
+                      f"{result['cpu_us']:>8.1f}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Sydney Umezurike
+bench_deck_stream.py
+CS 5001 - Memory Game
+Benchmark for streaming huge decks.
+Writes synthetic decks of small distinct images, as a
+folder and as a deck file, and times loading a board
+from each: sampling the faces in one pass, checking
+only those and converting them into the image cache.
+That is compared with compiling a manifest of the
+whole deck, which checks every image. Also checks the
+sample is uniform and repeats for the same seed.
+
+Usage:
+    python benchmarks/bench_deck_stream.py --faces 1000 10000 100000 --cards 12 100
+"""
+
+import argparse
+import collections
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from deck_manifest import compile_deck, sample_deck
+from image_cache import Image, ImageCache, encode_image
+
+
+def make_deck(folder, faces):
+    """Write faces distinct tiny images into a folder and a deck file listing them.
+
+    Returns:
+        tuple: (folder name, deck file name), relative to folder.
+    """
+    images = f"faces{faces}"
+    os.makedirs(os.path.join(folder, images))
+    names = []
+    for i in range(faces):
+        pixel = bytes((i & 0xFF, (i >> 8) & 0xFF, (i >> 16) & 0xFF, 255))
+        data, suffix = encode_image(Image(4, 6, pixel * 24))
+        name = os.path.join(images, f"face{i:06d}{suffix}")
+        with open(os.path.join(folder, name), "wb") as file:
+            file.write(data)
+        names.append(name)
+    deck = f"deck{faces}.txt"
+    with open(os.path.join(folder, deck), "w") as file:
+        file.write("\n".join(names))
+    return images, deck
+
+
+def load_board(folder, deck, cards, seed):
+    """Sample a board's faces and convert them into a cold cache, as MemoryGame.check_deck does.
+
+    Returns:
+        tuple: (sampling ms, converting ms).
+    """
+    start = time.perf_counter()
+    sample = sample_deck(deck, cards // 2, seed, folder)
+    sampled = time.perf_counter()
+    cache = ImageCache(os.path.join(folder, "image_cache", os.path.splitext(deck)[0]), workers=1)
+    cache.build(sample.entries)
+    converted = time.perf_counter()
+    if sample.errors or cache.errors or len(sample.entries) != cards // 2:
+        sys.exit(f"{deck}: {sample.errors + cache.errors}")
+    return (sampled - start) * 1000, (converted - sampled) * 1000
+
+
+def check_uniform(folder, deck, trials):
+    """Count how often each face is sampled, and check a seed repeats its sample."""
+    counts = collections.Counter()
+    for seed in range(trials):
+        counts.update(sample_deck(deck, 2, seed, folder).faces)
+    again = sample_deck(deck, 2, 0, folder).faces == sample_deck(deck, 2, 0, folder).faces
+    expected = 2 * trials / len(counts) if counts else 0
+    print(f"\nuniformity over {trials} samples of 2 from {deck}: each face picked "
+          f"{min(counts.values())}-{max(counts.values())} times, expected {expected:.0f}; "
+          f"same seed, same faces: {again}")
+
+
+def main():
+    """Run the streaming deck benchmark."""
+    parser = argparse.ArgumentParser(description="Streaming deck benchmark")
+    parser.add_argument("--faces", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="deck sizes to write")
+    parser.add_argument("--cards", type=int, nargs="+", default=[12, 100], help="board sizes")
+    parser.add_argument("--trials", type=int, default=4000, help="samples for the uniformity check")
+    parser.add_argument("--seed", type=int, default=5001, help="sampling seed")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="memory_deck_stream_")
+    try:
+        print(f"{'faces':>8}{'cards':>7}{'sample folder ms':>18}{'sample file ms':>16}"
+              f"{'convert ms':>12}{'whole deck ms':>15}")
+        for faces in args.faces:
+            images, deck = make_deck(folder, faces)
+            start = time.perf_counter()
+            compile_deck(deck, folder)
+            manifest = (time.perf_counter() - start) * 1000
+            for cards in args.cards:
+                from_folder, convert = load_board(folder, images, cards, args.seed + cards)
+                from_file, _ = load_board(folder, deck, cards, args.seed + cards)
+                # Compiling the manifest checks every face, and every face is converted too
+                whole = manifest + convert / (cards // 2) * faces
+                print(f"{faces:>8,}{cards:>7}{from_folder:>18.1f}{from_file:>16.1f}"
+                      f"{convert:>12.1f}{whole:>15,.0f}")
+        check_uniform(folder, make_deck(folder, 50)[1], args.trials)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Sydney Umezurike
+bench_flip_animation.py
+CS 5001 - Memory Game
+Benchmark for the card flip animation.
+Deals a board, turns every card over at once and back
+again, and times every game clock tick while the flips
+run, with the frame budget and without it. A slow
+shape change can be simulated to show the budget
+dropping frames instead of stretching them. Also times
+building the frames for the board from a cold cache,
+and what narrowing the faces on every frame would cost
+instead.
+
+Draws with Tk when there is a display, or on Xvfb if
+it is installed, and on the fake turtle screen
+otherwise.
+
+Usage:
+    python benchmarks/bench_flip_animation.py --cards 12 --rounds 50
+    python benchmarks/bench_flip_animation.py --slow-us 1000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from bench_soak import open_display, make_renderer
+
+
+def new_game(folder, cards, display):
+    """Deal a board with its flip frames in a cold cache in folder.
+
+    Returns:
+        tuple: (game, milliseconds to build the frames).
+    """
+    from constants import BG_COLOR
+    from flip_animation import FlipFrames
+    from main import MemoryGame
+    from score_store import ScoreStore
+
+    renderer, _ = make_renderer(display)
+    game = MemoryGame(renderer, score_store=ScoreStore(
+        os.path.join(folder, "scores.db"), legacy_path=os.path.join(folder, "missing.txt")))
+    game.replays_path = None
+    game.session_path = None
+    game.flip_frames = game.animator.frames = FlipFrames(os.path.join(folder, "flip"), workers=1)
+    game.card_count = cards
+    game.player_name = "bench"
+    renderer.setup("Flip benchmark", 1280, 1024, BG_COLOR)  # Room for a dozen cards at once
+    game.deal_cards()
+    start = time.perf_counter()
+    game.prepare_flips(game.logic.card_images)
+    built = (time.perf_counter() - start) * 1000
+    game.build_board(0)
+    return game, built
+
+
+def flip_all(game, rounds, budget, slow_us):
+    """Turn every card on screen over and back, rounds times, timing each clock tick.
+
+    Returns:
+        dict: Tick times in microseconds and the animator's counts.
+    """
+    from constants import ASSETS_PATH, CARD_BACK
+    from instrumentation import Histogram
+
+    animator = game.animator
+    animator.budget = budget
+    animator.flipped = animator.drawn = animator.dropped = animator.deferred = 0
+    renderer = game.renderer
+    set_shape = renderer.set_shape
+    if slow_us:
+        def slow_set_shape(sprite, shape):
+            # Stands in for a slow Tk canvas, such as a software rendered display
+            end = time.perf_counter() + slow_us / 1e6
+            while time.perf_counter() < end:
+                pass
+            set_shape(sprite, shape)
+        renderer.set_shape = slow_set_shape
+
+    card_back = os.path.join(ASSETS_PATH, CARD_BACK)
+    ticks = Histogram("us")
+    start_all = time.perf_counter()
+    for turn in range(2 * rounds):
+        for index, sprite in game.cards.items():
+            face = game.logic.board.image(index)
+            old, new = (card_back, face) if turn % 2 == 0 else (face, card_back)
+            animator.flip(sprite, old, new)
+        while animator.flips:
+            start = time.perf_counter()
+            renderer.advance(game.clock.frame_ms)
+            ticks.record((time.perf_counter() - start) * 1e6)
+    elapsed = time.perf_counter() - start_all
+    renderer.set_shape = set_shape
+    return {"ticks": ticks, "stats": animator.stats(), "elapsed": elapsed}
+
+
+def resize_cost(game):
+    """Time narrowing every face on the board to one frame width, as a frame without the cache would."""
+    from image_cache import decode_image, fit_image, scale_image
+    from constants import CARD_WIDTH, CARD_HEIGHT
+
+    cards = []
+    for index in game.cards:
+        with open(game.logic.board.image(index), "rb") as file:
+            cards.append(fit_image(decode_image(file.read()), CARD_WIDTH, CARD_HEIGHT))
+    width = game.flip_frames.widths[len(game.flip_frames.widths) // 2]
+    start = time.perf_counter()
+    for card in cards:
+        scale_image(card, width, CARD_HEIGHT)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    """Run the flip animation benchmark."""
+    parser = argparse.ArgumentParser(description="Flip animation benchmark")
+    parser.add_argument("--cards", type=int, default=12, help="cards on the board, all flipped at once")
+    parser.add_argument("--rounds", type=int, default=50, help="times every card is turned over and back")
+    parser.add_argument("--slow-us", type=float, default=0,
+                        help="extra microseconds every shape change takes")
+    parser.add_argument("--display", choices=["auto", "tk", "fake", "null"], default="auto",
+                        help="what to draw on")
+    args = parser.parse_args()
+    display, xvfb = open_display(args.display)
+
+    from constants import FLIP_DURATION_MS, FLIP_FRAME_BUDGET_MS
+
+    folder = tempfile.mkdtemp(prefix="memory_flip_")
+    try:
+        game, built = new_game(folder, args.cards, display)
+        game.flip_frames.files = {}  # Forget what this process found, so only the disk cache helps
+        start = time.perf_counter()
+        game.flip_frames.build(game.logic.card_images)
+        warm = (time.perf_counter() - start) * 1000
+        print(f"{len(game.cards)} cards flipping at once on the {display} display, "
+              f"{FLIP_DURATION_MS} ms per flip, {game.clock.frame_ms:.0f} ms frames, "
+              f"{len(game.flip_frames.widths)} frames per side")
+        print(f"frames for the board: {built:.0f} ms from a cold cache, {warm:.1f} ms cached; "
+              f"narrowing every face on each frame instead: {resize_cost(game):.1f} ms per frame\n")
+
+        print(f"{'budget ms':>10}{'slow us':>9}{'ticks':>7}{'p50 ms':>8}{'p99 ms':>8}{'max ms':>8}"
+              f"{'drawn':>8}{'dropped':>9}{'deferred':>10}{'instant':>9}")
+        for budget in (FLIP_FRAME_BUDGET_MS, float("inf")):
+            result = flip_all(game, args.rounds, budget, args.slow_us)
+            ticks, stats = result["ticks"], result["stats"]
+            print(f"{budget:>10}{args.slow_us:>9.0f}{ticks.count:>7}{ticks.percentile(50) / 1000:>8.2f}"
+                  f"{ticks.percentile(99) / 1000:>8.2f}{ticks.max / 1000:>8.2f}{stats['drawn']:>8}"
+                  f"{stats['dropped']:>9}{stats['deferred']:>10}{stats['instant']:>9}")
+        game.leaderboard.store.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Sydney Umezurike
+bench_game_server.py
+CS 5001 - Memory Game
+Load generator for the multi-session game server.
+Starts the server in its own process (or connects to
+one already running), opens many sessions at once,
+plays every game to the end with a perfect-memory
+player, and reports sessions/sec and p50/p99 latency
+from sending a flip to getting its result.
+
+Usage:
+    python benchmarks/bench_game_server.py --sessions 10000
+    python benchmarks/bench_game_server.py --port 5001 --no-spawn --sessions 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from game_server import raise_file_limit, DEFAULT_HOST, DEFAULT_PORT, MATCH, MISS, IGNORED
+from score_store import ScoreStore
+
+
+class Stats:
+    def __init__(self):
+        """Collect latencies and outcomes from every session."""
+        self.latencies = []  # Seconds from sending a flip to reading its result
+        self.finished = 0
+        self.errors = 0
+        self.moves = 0
+
+
+async def play_session(reader, writer, session_id, card_count, stats, rng):
+    """Play one full game over its own connection.
+
+    The player remembers every face it has seen, so it plays a known pair
+    when it has one and otherwise flips unseen cards.
+    """
+    def send(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    async def receive():
+        return json.loads(await reader.readline())
+
+    async def flip(index):
+        start = time.perf_counter()
+        send({"type": "flip", "index": index})
+        reply = await receive()
+        stats.latencies.append(time.perf_counter() - start)
+        return reply
+
+    try:
+        send({"type": "new", "name": f"load{session_id}", "cards": card_count})
+        board = await receive()
+        unseen = list(range(board["cards"]))
+        rng.shuffle(unseen)
+        seen = {}  # Face -> positions seen but not matched
+        while True:
+            pair = next((found for found in seen.values() if len(found) == 2), None)
+            if pair:
+                first, second = pair
+                await flip(first)
+            else:
+                first = unseen.pop()
+                found = seen.setdefault((await flip(first))["face"], [])
+                found.append(first)
+                second = found[0] if len(found) == 2 else unseen.pop()
+            reply = await flip(second)
+            if reply["result"] == IGNORED:
+                raise RuntimeError(f"session {session_id}: flip {second} was ignored")
+            found = seen.setdefault(reply["face"], [])
+            if second not in found:
+                found.append(second)
+            stats.moves += 1
+
+            await receive()  # The hide or remove message once the cards settle
+            if reply["result"] == MATCH:
+                del seen[reply["face"]]
+                if reply["matches"] * 2 == board["cards"]:
+                    win = await receive()
+                    if win["type"] != "win":
+                        raise RuntimeError(f"session {session_id}: expected a win, got {win}")
+                    stats.finished += 1
+                    break
+            elif reply["result"] != MISS:
+                raise RuntimeError(f"session {session_id}: unexpected reply {reply}")
+        send({"type": "quit"})
+    except Exception as e:
+        stats.errors += 1
+        if stats.errors <= 5:
+            print(f"Session error: {e!r}")
+    finally:
+        writer.close()
+
+
+async def run_load(args, connect):
+    """Run every session at once and return the stats and elapsed time."""
+    stats = Stats()
+    connecting = asyncio.Semaphore(args.connect_rate)  # Limit connects in flight, not sessions
+
+    async def session(i):
+        try:
+            async with connecting:
+                reader, writer = await connect()
+        except OSError as e:
+            stats.errors += 1
+            print(f"Could not connect: {e}")
+            return
+        await play_session(reader, writer, i, args.cards, stats, random.Random(args.seed + i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    return stats, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    """Return a percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def start_server(args, scratch):
+    """Start the server in its own process and wait until it is listening."""
+    db_path = os.path.join(scratch, "leaderboard.db")
+    command = [sys.executable, os.path.join(SRC, "game_server.py"),
+               "--flip-delay", str(args.flip_delay), "--db", db_path]
+    if args.unix:
+        command += ["--unix", args.unix]
+    else:
+        command += ["--host", args.host, "--port", str(args.port)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if "listening" not in line:
+        process.kill()
+        raise RuntimeError(f"Server did not start: {line!r}")
+    return process, db_path
+
+
+def main():
+    """Run the load test and print the results."""
+    parser = argparse.ArgumentParser(description="Game server load generator")
+    parser.add_argument("--sessions", type=int, default=10000, help="concurrent sessions")
+    parser.add_argument("--cards", type=int, default=12, help="cards in each game")
+    parser.add_argument("--flip-delay", type=float, default=50,
+                        help="ms cards stay up after a guess (server setting)")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP address of the server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port of the server")
+    parser.add_argument("--unix", help="use this Unix socket instead of TCP")
+    parser.add_argument("--no-spawn", action="store_true",
+                        help="connect to a server that is already running")
+    parser.add_argument("--connect-rate", type=int, default=500,
+                        help="connections opened at the same time")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    args = parser.parse_args()
+
+    raise_file_limit()
+    scratch = tempfile.mkdtemp(prefix="memory_server_")
+    if args.unix is None and not args.no_spawn:
+        args.unix = os.path.join(scratch, "server.sock")
+    process = db_path = None
+    if not args.no_spawn:
+        process, db_path = start_server(args, scratch)
+
+    if args.unix:
+        def connect():
+            return asyncio.open_unix_connection(args.unix)
+    else:
+        def connect():
+            return asyncio.open_connection(args.host, args.port)
+
+    try:
+        stats, elapsed = asyncio.run(run_load(args, connect))
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGINT)  # Lets the server finish its score writes
+            process.wait(timeout=60)
+
+    print(f"sessions:      {args.sessions} ({stats.finished} finished, {stats.errors} errors)")
+    print(f"elapsed:       {elapsed:.2f} s")
+    print(f"sessions/sec:  {stats.finished / elapsed:.0f}")
+    print(f"moves:         {stats.moves} ({stats.moves / elapsed:.0f}/s)")
+    print(f"flip latency:  p50 {percentile(stats.latencies, 0.5) * 1000:.2f} ms, "
+          f"p99 {percentile(stats.latencies, 0.99) * 1000:.2f} ms")
+    if db_path is not None:
+        store = ScoreStore(db_path, legacy_path=db_path + ".missing")
+        saved = store.count()
+        store.close()
+        print(f"scores saved:  {saved}")
+        if saved != stats.finished:
+            sys.exit(f"Expected {stats.finished} saved scores, found {saved}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Sydney Umezurike
+bench_game_state.py
+CS 5001 - Memory Game
+Times the incremental game state counters.
+Times the O(1) queries in MemoryGameLogic against the
+full scans of the cards they replace. That they agree
+is checked by tests/test_game_logic.py.
+
+Usage:
+    python benchmarks/bench_game_state.py --sizes 8 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from game_logic import MemoryGameLogic
+
+
+def full_scan(logic):
+    """Work out every counter the slow way, by walking the whole board."""
+    board = logic.board
+    unmatched = [i for i in range(len(board)) if not board.matched[i]]
+    seen_unmatched = {}
+    for i in unmatched:
+        if i in logic.seen:
+            seen_unmatched.setdefault(board.face_id(i), set()).add(i)
+    return {
+        "won": all(board.matched[i] for i in range(len(board))),
+        "remaining_pairs": len(unmatched) // 2,
+        "matched_pairs": (len(board) - len(unmatched)) // 2,
+        "seen_unmatched": len(seen_unmatched),
+        "known_faces": {face_id for face_id, found in seen_unmatched.items() if len(found) == 2},
+    }
+
+
+def counters(logic):
+    """Read the same values from the incremental counters."""
+    return {
+        "won": logic.check_all_matched(),
+        "remaining_pairs": logic.remaining_pairs,
+        "matched_pairs": logic.matched_pairs(),
+        "seen_unmatched": logic.seen_unmatched_faces(),
+        "known_faces": logic.known_faces,
+    }
+
+
+def time_us(func, number):
+    """Return the mean time of func in microseconds."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main():
+    """Time the counters against full scans."""
+    parser = argparse.ArgumentParser(description="Game state counter benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 100, 1000, 10000],
+                        help="cards on each board")
+    args = parser.parse_args()
+
+    print(f"{'cards':>8}{'scan win us':>14}{'O(1) win us':>14}{'scan state us':>16}{'O(1) state us':>16}")
+    for size in args.sizes:
+        logic = MemoryGameLogic([f"face{i}.gif" for i in range(size // 2)])
+        for face_id in range(size // 2):
+            logic.check_indices(*logic.pair_positions(face_id))  # All matched: worst case for a scan
+        number = max(10, 100000 // size)
+        scan_win = time_us(lambda: all(logic.is_matched(i) for i in range(size)), number)
+        fast_win = time_us(logic.check_all_matched, number)
+        scan_state = time_us(lambda: full_scan(logic), max(3, number // 10))
+        fast_state = time_us(lambda: counters(logic), number)
+        print(f"{size:>8}{scan_win:>14.2f}{fast_win:>14.2f}{scan_state:>16.2f}{fast_state:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
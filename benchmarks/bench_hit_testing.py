@@ -0,0 +1,81 @@
+"""
+Sydney Umezurike
+bench_hit_testing.py
+CS 5001 - Memory Game
+Microbenchmark for click hit-testing.
+Compares the old linear scan over every card's
+position with the SpatialIndex lookup for boards
+of 8 to 10,000 cards, laid out by BoardLayout for
+the default window like the game does.
+
+Usage:
+    python benchmarks/bench_hit_testing.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from layout import BoardLayout
+from ui_components import QUIT_BUTTON_NAME, LOAD_BUTTON_NAME
+
+BOARD_SIZES = [8, 12, 100, 1000, 10000]
+CLICKS = 2000
+
+
+class FakeCard:
+    def __init__(self, x, y):
+        """A stand-in for a card turtle that only knows its position."""
+        self.x = x
+        self.y = y
+
+    def pos(self):
+        """Return the card position like turtle.Turtle.pos."""
+        return (self.x, self.y)
+
+
+def linear_scan(cards, x, y, half_width, half_height):
+    """The original handle_click search: check every card until one is hit."""
+    for card in cards:
+        card_x, card_y = card.pos()
+        if abs(card_x - x) < half_width and abs(card_y - y) < half_height:
+            return card
+    return None
+
+
+def time_per_click(func, clicks):
+    """Return the mean time in microseconds of func over a list of clicks."""
+    start = time.perf_counter()
+    for x, y in clicks:
+        func(x, y)
+    return (time.perf_counter() - start) / len(clicks) * 1e6
+
+
+def main():
+    """Time both hit-testing strategies for every board size."""
+    rng = random.Random(5001)
+    print(f"{'cards':>8}{'scan us/click':>16}{'index us/click':>16}{'speedup':>10}")
+    for card_count in BOARD_SIZES:
+        # The same index show_rows builds; cards below the window sit where
+        # scrolling would bring them, so every card can be clicked
+        layout = BoardLayout(card_count)
+        index = layout.hit_index()
+        for name, center in ((QUIT_BUTTON_NAME, layout.quit_button),
+                             (LOAD_BUTTON_NAME, layout.load_button)):
+            index.add_region(name, *layout.button_region(center))
+        cards = [FakeCard(*index.cell_center(i)) for i in range(card_count)]
+        half_width, half_height = layout.card_width / 2, layout.card_height / 2
+
+        # Click the centers of random cards so both strategies always find a hit
+        clicks = [cards[rng.randrange(card_count)].pos() for _ in range(CLICKS)]
+        scan = time_per_click(lambda x, y: linear_scan(cards, x, y, half_width, half_height),
+                              clicks)
+        indexed = time_per_click(index.lookup, clicks)
+        print(f"{card_count:>8}{scan:>16.2f}{indexed:>16.2f}{scan / indexed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
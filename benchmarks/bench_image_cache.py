@@ -0,0 +1,191 @@
+"""
+Sydney Umezurike
+bench_image_cache.py
+CS 5001 - Memory Game
+Benchmark for the image cache.
+Converts each deck into a fresh cache, once in this
+process and once with a process pool, then checks a
+warm build only looks the files up and that changing
+one image rebuilds just that one. Decode time and
+decoded memory are compared for the original files
+and the converted ones, for the bundled decks and a
+synthetic deck of large PNG and PPM images.
+
+Decode time is measured with Tk when a display is
+available, and with the pure-Python decoder otherwise.
+
+Usage:
+    python benchmarks/bench_image_cache.py --synthetic 8 --size 400x600
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from asset_cache import BYTES_PER_PIXEL
+from constants import ASSETS_PATH, CARD_WIDTH, CARD_HEIGHT
+from deck_manifest import image_dimensions, load_manifest
+from image_cache import ImageCache, Image, PARALLEL_MIN, decode_image, encode_image
+
+
+def make_synthetic_deck(folder, count, width, height, seed):
+    """Write a deck of large PNG and PPM images with some transparency.
+
+    Returns:
+        str: The deck file name.
+    """
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        base = [rng.randrange(256) for _ in range(3)]
+        row = bytearray()
+        for x in range(width):
+            row += bytes(((base[0] + x) % 256, base[1], (base[2] + x // 2) % 256, 255))
+        pixels = bytearray()
+        for y in range(height):
+            pixels += row
+        if i % 2 == 0:
+            pixels[3] = 0  # One transparent pixel makes this one an RGBA PNG
+        data, suffix = encode_image(Image(width, height, pixels))
+        name = f"synthetic{i:03d}{suffix}"
+        with open(os.path.join(folder, name), "wb") as file:
+            file.write(data)
+        names.append(name)
+    deck = "synthetic_deck.txt"
+    with open(os.path.join(folder, deck), "w") as file:
+        file.write("\n".join(names))
+    return deck
+
+
+def tk_decoder():
+    """Return a function that decodes image bytes with Tk, or None without a display."""
+    try:
+        import base64
+        import tkinter
+        root = tkinter.Tk()
+        root.withdraw()
+    except Exception:
+        return None
+
+    def decode(data):
+        tkinter.PhotoImage(data=base64.b64encode(data), master=root)
+    return decode
+
+
+def time_decode(paths, decode, repeat):
+    """Return the mean milliseconds to decode each file."""
+    blobs = []
+    for path in paths:
+        with open(path, "rb") as file:
+            blobs.append(file.read())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for data in blobs:
+            decode(data)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(blobs))
+
+
+def decoded_bytes(paths):
+    """Return the memory the images take once decoded, and their size on disk."""
+    memory = disk = 0
+    for path in paths:
+        with open(path, "rb") as file:
+            width, height = image_dimensions(file.read(32))
+        memory += width * height * BYTES_PER_PIXEL
+        disk += os.path.getsize(path)
+    return memory, disk
+
+
+def bench_deck(deck, assets_path, workers, decode, decoder_name, repeat):
+    """Convert one deck every way and print the results."""
+    manifest = load_manifest(deck, assets_path)
+    if manifest.errors:
+        sys.exit(f"{deck}: {'; '.join(manifest.errors)}")
+    scratch = tempfile.mkdtemp(prefix="memory_image_cache_")
+    try:
+        timings = {}
+        for label, count in (("in process", 1), (f"{workers} processes", workers)):
+            cache = ImageCache(os.path.join(scratch, label), workers=count)
+            start = time.perf_counter()
+            sources = cache.build(manifest.entries)
+            timings[label] = (time.perf_counter() - start) * 1000
+            if cache.errors:
+                sys.exit(f"{deck}: {'; '.join(cache.errors)}")
+
+        start = time.perf_counter()
+        cache.build(manifest.entries)
+        warm = (time.perf_counter() - start) * 1000
+        warm_reused = cache.reused
+
+        # Change one image's bytes; only that image should be converted again
+        changed_folder = os.path.join(scratch, "changed")
+        shutil.copytree(assets_path, changed_folder,
+                        ignore=shutil.ignore_patterns("image_cache", "replays", "*.db*", "*.manifest.json"))
+        with open(os.path.join(changed_folder, manifest.faces[0]), "ab") as file:
+            file.write(b"\0")  # Past the end of the image, so it still decodes
+        changed = load_manifest(deck, changed_folder)
+        cache.build(changed.entries)
+        rebuilt = cache.built
+
+        originals = manifest.paths
+        converted = [sources[path] for path in originals]
+        memory_before, disk_before = decoded_bytes(originals)
+        memory_after, disk_after = decoded_bytes(converted)
+        decode_before = time_decode(originals, decode, repeat)
+        decode_after = time_decode(converted, decode, repeat)
+
+        print(f"{deck}: {len(originals)} faces")
+        for label, ms in timings.items():
+            note = " (too few faces for the pool)" if label != "in process" and len(originals) < PARALLEL_MIN else ""
+            print(f"  cold build, {label:<14}{ms:>10.1f} ms{note}")
+        print(f"  warm build{'':<18}{warm:>10.2f} ms ({warm_reused} cached)")
+        print(f"  one image changed{'':<11}{rebuilt:>10d} rebuilt")
+        print(f"  {decoder_name} decode per face  {decode_before:>8.2f} ms -> {decode_after:.2f} ms "
+              f"({decode_before / max(decode_after, 1e-9):.1f}x)")
+        print(f"  decoded memory{'':<14}{memory_before / 1024:>10.0f} KB -> {memory_after / 1024:.0f} KB "
+              f"({100 * (1 - memory_after / memory_before):.0f}% less)")
+        print(f"  on disk{'':<21}{disk_before / 1024:>10.0f} KB -> {disk_after / 1024:.0f} KB")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main():
+    """Benchmark the bundled decks and a synthetic deck of large images."""
+    parser = argparse.ArgumentParser(description="Image cache benchmark")
+    parser.add_argument("--decks", nargs="*", default=["default_deck.txt", "custom_deck.txt"],
+                        help="bundled deck files to convert")
+    parser.add_argument("--synthetic", type=int, default=8, help="large images in the synthetic deck")
+    parser.add_argument("--size", default="400x600", help="synthetic image size, WIDTHxHEIGHT")
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1), help="pool processes")
+    parser.add_argument("--repeat", type=int, default=5, help="decodes per face when timing")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    args = parser.parse_args()
+
+    decode = tk_decoder()
+    decoder_name = "Tk"
+    if decode is None:
+        decode, decoder_name = decode_image, "Python"
+        print("No display for Tk; timing the pure-Python decoder instead.")
+    print(f"Card size {CARD_WIDTH}x{CARD_HEIGHT}, {os.cpu_count()} CPUs\n")
+
+    for deck in args.decks:
+        bench_deck(deck, ASSETS_PATH, args.workers, decode, decoder_name, args.repeat)
+
+    if args.synthetic:
+        width, height = (int(value) for value in args.size.lower().split("x"))
+        folder = tempfile.mkdtemp(prefix="memory_synthetic_deck_")
+        try:
+            deck = make_synthetic_deck(folder, args.synthetic, width, height, args.seed)
+            bench_deck(deck, folder, args.workers, decode, decoder_name, 1)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Sydney Umezurike
+bench_replay.py
+CS 5001 - Memory Game
+Benchmark for replay logs and the replay engine.
+Records many games played by a simulated player on
+the default deck, timing what each recorded event
+costs, then scans the whole folder with the replay
+engine. A few replays get a wrong score on purpose
+to check the engine catches them.
+
+Usage:
+    python benchmarks/bench_replay.py --replays 5000 --cards 12
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from constants import DEFAULT_DECK
+from deck_manifest import load_manifest
+from game_logic import MemoryGameLogic
+from replay import ReplayEngine, ReplayWriter, REPLAY_SUFFIX
+from layout import BoardLayout
+
+
+class FakeClock:
+    def __init__(self):
+        """A clock the simulated player moves forward by hand."""
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def record_game(path, seed, faces, manifest_id, card_count, rng, cheat=False):
+    """Play one game with a forgetful player and record it.
+
+    Returns:
+        tuple: (events recorded, seconds spent recording them).
+    """
+    clock = FakeClock()
+    board_rng = random.Random(seed)
+    logic = MemoryGameLogic(board_rng.sample(faces, card_count // 2), board_rng)
+    index = BoardLayout(card_count).hit_index()
+    writer = ReplayWriter(path, seed, DEFAULT_DECK, manifest_id, card_count,
+                          f"player{seed % 100}", clock)
+    writer.layout(index.columns, index.start_x, index.start_y)  # As MemoryGame.show_rows does
+
+    events = 0
+    spent = 0.0
+    moves = 0
+    unmatched = list(range(card_count))
+    while not logic.check_all_matched():
+        pair = rng.sample(unmatched, 2)
+        for card in pair:
+            clock.now += rng.randrange(200, 800)
+            start = time.perf_counter()
+            writer.click(*index.cell_center(card))
+            writer.flip(card)
+            spent += time.perf_counter() - start
+            events += 2
+            logic.reveal(card)
+        moves += 1
+        if logic.check_indices(*pair):
+            unmatched.remove(pair[0])
+            unmatched.remove(pair[1])
+        else:
+            logic.hide(pair[0])
+            logic.hide(pair[1])
+        clock.now += 1000  # The cards settle before the next flip
+    writer.win(moves - 1 if cheat else moves)
+    writer.close()
+    return events + 1, spent
+
+
+def main():
+    """Record replays, then verify them all."""
+    parser = argparse.ArgumentParser(description="Replay log benchmark")
+    parser.add_argument("--replays", type=int, default=2000, help="games to record")
+    parser.add_argument("--cards", type=int, default=12, help="cards in each game")
+    parser.add_argument("--cheats", type=int, default=10, help="replays with a wrong score")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    args = parser.parse_args()
+
+    manifest = load_manifest(DEFAULT_DECK)
+    rng = random.Random(args.seed)
+    folder = tempfile.mkdtemp(prefix="memory_replays_")
+
+    events = 0
+    spent = 0.0
+    start = time.perf_counter()
+    for i in range(args.replays):
+        path = os.path.join(folder, f"game{i:06d}{REPLAY_SUFFIX}")
+        count, seconds = record_game(path, rng.getrandbits(63), manifest.faces,
+                                     manifest.manifest_id, args.cards, rng, cheat=i < args.cheats)
+        events += count
+        spent += seconds
+    record_time = time.perf_counter() - start
+    size = sum(entry.stat().st_size for entry in os.scandir(folder))
+
+    print(f"recorded {args.replays} replays in {record_time:.2f} s, "
+          f"{size / args.replays:.0f} bytes per replay")
+    print(f"recording cost: {spent / events * 1e6:.2f} us per event ({events} events)")
+
+    engine = ReplayEngine()
+    start = time.perf_counter()
+    valid = invalid = 0
+    for path, result in engine.scan(folder):
+        if isinstance(result, str) or not result.valid:
+            invalid += 1
+        else:
+            valid += 1
+    scan_time = time.perf_counter() - start
+    print(f"scanned {valid + invalid} replays in {scan_time:.2f} s "
+          f"({(valid + invalid) / scan_time:.0f}/s): {valid} valid, {invalid} invalid")
+    if invalid != args.cheats:
+        sys.exit(f"Expected {args.cheats} invalid replays, found {invalid}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Sydney Umezurike
+bench_score_store.py
+CS 5001 - Memory Game
+Benchmark for the leaderboard score store.
+Fills a scratch database with many results, times
+single inserts and top-N reads, then has several
+processes write at once and checks no score was lost.
+
+Usage:
+    python benchmarks/bench_score_store.py --rows 1000000 --writers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from score_store import ScoreStore
+
+DECKS = ["default_deck.txt", "custom_deck.txt"]
+CARD_COUNTS = [8, 10, 12]
+
+
+def open_store(db_path):
+    """Open a store on the scratch database with no legacy file to migrate."""
+    return ScoreStore(db_path, legacy_path=db_path + ".missing")
+
+
+def fill(db_path, rows, seed):
+    """Bulk load random results so reads and inserts run against a large table."""
+    rng = random.Random(seed)
+    store = open_store(db_path)
+    batch = [(f"player{rng.randrange(10000)}", rng.randrange(4, 200), rng.choice(DECKS),
+              rng.choice(CARD_COUNTS), time.time()) for _ in range(rows)]
+    with store._write() as cursor:
+        cursor.executemany(
+            "INSERT INTO results (name, moves, deck, card_count, created) VALUES (?, ?, ?, ?, ?)",
+            batch)
+    store.close()
+
+
+def time_ms(func, repeat):
+    """Return the mean time of func in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def writer(db_path, writer_id, count):
+    """Insert count results from one process."""
+    store = open_store(db_path)
+    for i in range(count):
+        store.add_result(f"writer{writer_id}", 4 + i % 50, DECKS[i % 2], CARD_COUNTS[i % 3])
+    store.close()
+
+
+def main():
+    """Run the single-process and multi-process benchmarks."""
+    parser = argparse.ArgumentParser(description="Score store benchmark")
+    parser.add_argument("--rows", type=int, default=1000000, help="results to preload")
+    parser.add_argument("--writers", type=int, default=4, help="concurrent writer processes")
+    parser.add_argument("--writes", type=int, default=500, help="results per writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        db_path = os.path.join(scratch, "bench.db")
+        start = time.perf_counter()
+        fill(db_path, args.rows, 5001)
+        print(f"loaded {args.rows:,} results in {time.perf_counter() - start:.1f} s")
+
+        store = open_store(db_path)
+        rng = random.Random(1)
+        insert = time_ms(lambda: store.add_result("bench", rng.randrange(4, 200),
+                                                  rng.choice(DECKS), rng.choice(CARD_COUNTS)), 2000)
+        print(f"insert:                 {insert:.3f} ms")
+        print(f"top 6 overall:          {time_ms(lambda: store.top(6), 2000):.3f} ms")
+        print(f"top 6 per deck:         {time_ms(lambda: store.top(6, deck=DECKS[0]), 2000):.3f} ms")
+        print(f"top 6 per card count:   {time_ms(lambda: store.top(6, card_count=12), 2000):.3f} ms")
+        print(f"top 6 deck+count (SQL): {time_ms(lambda: store.top(6, DECKS[0], 12), 2000):.3f} ms")
+        before = store.count()
+
+        start = time.perf_counter()
+        workers = [multiprocessing.Process(target=writer, args=(db_path, i, args.writes))
+                   for i in range(args.writers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        written = store.count() - before
+        expected = args.writers * args.writes
+        print(f"{args.writers} writers: {written:,}/{expected:,} results saved "
+              f"in {elapsed:.2f} s ({written / elapsed:,.0f} writes/s)")
+        store.close()
+        if written != expected:
+            sys.exit("lost writes under concurrency")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Sydney Umezurike
+bench_session.py
+CS 5001 - Memory Game
+Benchmark for session snapshots and resuming.
+For boards from a dozen cards to a million, times
+encoding a board once, what a move costs on the click
+path, the background write and reading a snapshot
+back into a playable board. Then times a new game on
+the bundled deck from launch until the board is
+playable, next to resuming the same board from its
+snapshot.
+
+Usage:
+    python benchmarks/bench_session.py --sizes 12 1000 100000 1000000 --runs 20
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from board import Board
+from constants import ASSETS_PATH, SPLASH_SCREEN_DURATION
+from game_logic import MemoryGameLogic
+from main import MemoryGame
+from renderer import NullRenderer
+from score_store import ScoreStore
+from session import SessionBoard, SessionWriter, read_session
+from startup import StartupTimer
+
+
+def bench_sizes(sizes, folder, saves):
+    """Time snapshots of synthetic boards of every size."""
+    print(f"{'cards':>10}{'encode ms':>11}{'move us':>10}{'write ms':>10}"
+          f"{'file KB':>10}{'resume ms':>11}")
+    for size in sizes:
+        images = [os.path.join(ASSETS_PATH, f"face{i}.gif") for i in range(size // 2)]
+        board = Board.shuffled(images)
+        path = os.path.join(folder, f"session_{size}.mgs")
+        start = time.perf_counter()
+        session_board = SessionBoard(5001, "synthetic_deck.txt", None, "bench", board, {})
+        encode = (time.perf_counter() - start) * 1000
+
+        # What the click path pays: a snapshot handed to the writer thread
+        writer = SessionWriter(path)
+        writer.start()
+        start = time.perf_counter()
+        for move in range(saves):
+            board.matched.set(2 * move % size)
+            writer.save(session_board.snapshot(move, 0, [move % size]))
+        move_cost = (time.perf_counter() - start) * 1e6 / saves
+        writer.flush()
+        writer.close()
+
+        # The write itself, on the writer thread in the game
+        parts = session_board.snapshot(saves, 0, [])
+        start = time.perf_counter()
+        writer._write(parts)
+        write = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        session = read_session(path)
+        logic = MemoryGameLogic.from_board(session.board())
+        resume = (time.perf_counter() - start) * 1000
+        assert logic.board.face_ids == board.face_ids and logic.board.matched.bits == board.matched.bits
+        print(f"{size:>10,}{encode:>11.2f}{move_cost:>10.1f}{write:>10.2f}"
+              f"{os.path.getsize(path) / 1024:>10.1f}{resume:>11.2f}")
+
+
+def new_game(folder, inputs=()):
+    """Create a game that draws nothing and keeps its files in folder."""
+    game = MemoryGame(NullRenderer(inputs), score_store=ScoreStore(
+        os.path.join(folder, "scores.db"), legacy_path=os.path.join(folder, "missing.txt")))
+    game.replays_path = None
+    game.session_path = os.path.join(folder, "session.mgs")
+    return game
+
+
+def bench_startup(folder, card_count, runs):
+    """Time a new game until playable, and resuming the board it saved."""
+    fresh, resumed = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        game = new_game(folder, ["bench", str(card_count)])
+        game.start(StartupTimer(start))
+        while not game.cards:
+            game.renderer.advance(20)  # Virtual time, so the splash costs no wall time here
+        fresh.append((time.perf_counter() - start) * 1000)
+        game.session_writer.close()
+        game.leaderboard.store.close()
+
+        start = time.perf_counter()
+        session = read_session(game.session_path)
+        game = new_game(folder)
+        game.resume(session, StartupTimer(start))
+        resumed.append((time.perf_counter() - start) * 1000)
+        game.session_writer.close()
+        game.leaderboard.store.close()
+
+    fresh_ms, resumed_ms = statistics.median(fresh), statistics.median(resumed)
+    print(f"\n{card_count} cards on {game.current_deck}, median of {runs} launches")
+    print(f"  new game until playable {fresh_ms:>8.1f} ms "
+          f"(+ {SPLASH_SCREEN_DURATION} s splash and two prompts for the player)")
+    print(f"  resume until playable   {resumed_ms:>8.1f} ms ({fresh_ms / max(resumed_ms, 1e-9):.1f}x less work)")
+
+
+def main():
+    """Run the snapshot and startup benchmarks."""
+    parser = argparse.ArgumentParser(description="Session snapshot benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 1000, 100000, 1000000],
+                        help="board sizes to snapshot")
+    parser.add_argument("--saves", type=int, default=1000, help="snapshots per board size")
+    parser.add_argument("--cards", type=int, default=12, help="card count for the startup timing")
+    parser.add_argument("--runs", type=int, default=20, help="launches to time")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="memory_session_")
+    try:
+        bench_sizes(args.sizes, folder, args.saves)
+        bench_startup(folder, args.cards, args.runs)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
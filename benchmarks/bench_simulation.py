@@ -0,0 +1,43 @@
+"""
+Sydney Umezurike
+bench_simulation.py
+CS 5001 - Memory Game
+Throughput benchmark for the headless batch simulator.
+Reports games per second and the average number of
+moves for every player model and card count.
+
+Usage:
+    python benchmarks/bench_simulation.py --games 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simulation import PLAYER_MODELS, simulate_games
+
+
+def main():
+    """Run the simulator for every model and card count and print the results."""
+    parser = argparse.ArgumentParser(description="Batch simulator throughput benchmark")
+    parser.add_argument("--games", type=int, default=200000, help="games per configuration")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    parser.add_argument("--memory", type=int, default=4, help="limited memory size in flips")
+    parser.add_argument("--cards", type=int, nargs="+", default=[8, 10, 12], help="card counts to run")
+    args = parser.parse_args()
+
+    print(f"{'model':<10}{'cards':>6}{'games/s':>14}{'games/min':>14}{'mean moves':>12}")
+    for model in PLAYER_MODELS:
+        for card_count in args.cards:
+            start = time.perf_counter()
+            moves = simulate_games(args.games, card_count, model, args.memory, args.seed)
+            elapsed = time.perf_counter() - start
+            rate = args.games / elapsed
+            print(f"{model:<10}{card_count:>6}{rate:>14,.0f}{rate * 60:>14,.0f}{moves.mean():>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
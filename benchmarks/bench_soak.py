@@ -0,0 +1,337 @@
+"""
+Sydney Umezurike
+bench_soak.py
+CS 5001 - Memory Game
+Soak test for long running sessions, such as a kiosk.
+Plays thousands of scripted games through MemoryGame,
+reloading the board after each one and switching the
+deck now and then, on the turtle renderer with virtual
+time. RSS, traced Python memory, live turtles, screen
+objects, canvas items, timers and cached shapes are
+sampled as it goes. It fails if any of them grows
+faster than its allowed slope once warmed up, and
+names the allocation sites that kept growing.
+
+Draws with Tk when there is a display, or on Xvfb if
+it is installed, and on the fake turtle screen
+otherwise.
+
+Usage:
+    python benchmarks/bench_soak.py --games 3000 --samples 30
+    python benchmarks/bench_soak.py --display fake --games 500 --report soak.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+DECKS = ["default_deck.txt", "custom_deck.txt"]
+CARD_COUNTS = [8, 10, 12, 16, 24]
+REFERENCE_CARDS = 12  # Board the counts are sampled on
+
+# Allowed growth per 1000 games once warmed up
+DEFAULT_RSS_SLOPE = 1024  # KB
+DEFAULT_TRACED_SLOPE = 128  # KB
+DEFAULT_COUNT_SLOPE = 0.5  # Turtles, items, timers or shapes
+
+COUNT_METRICS = ["live_turtles", "screen_objects", "canvas_items", "pending_timers", "cached_shapes"]
+
+
+def open_display(mode):
+    """Pick what to draw on: Tk on a display, Tk on Xvfb, the fake screen or nothing.
+
+    The fake turtle module has to be installed before any game module
+    imports turtle, so this runs before the game is imported.
+
+    Args:
+        mode (str): "auto", "tk", "fake" or "null".
+
+    Returns:
+        tuple: (display used, Xvfb process to stop afterwards or None).
+    """
+    xvfb = None
+    if mode in ("auto", "tk"):
+        if not os.environ.get("DISPLAY") and shutil.which("Xvfb"):
+            display = f":{90 + os.getpid() % 100}"
+            xvfb = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24"],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            time.sleep(1)
+            os.environ["DISPLAY"] = display
+        try:
+            import tkinter
+            tkinter.Tk().destroy()
+            return "tk", xvfb
+        except Exception as e:
+            if xvfb is not None:
+                xvfb.terminate()
+            if mode == "tk":
+                sys.exit(f"No display for Tk: {e}")
+    if mode == "null":
+        return "null", None
+    import fake_turtle
+    fake_turtle.install()
+    return "fake", None
+
+
+def make_renderer(display):
+    """Create the renderer, with timers on a virtual clock so games run at CPU speed.
+
+    Returns:
+        tuple: (renderer, classes whose live instances count as turtles).
+    """
+    import renderer
+    if display == "null":
+        return renderer.NullRenderer(), (renderer.Sprite, renderer.Pen)
+
+    class VirtualTimeRenderer(renderer.TurtleRenderer):
+        """Draws with turtle, but keeps timers and the clock like NullRenderer."""
+
+        def __init__(self):
+            super().__init__()
+            self.now = 0
+            self.timers = []
+            self.order = itertools.count()
+
+        ontimer = renderer.NullRenderer.ontimer
+        clock = renderer.NullRenderer.clock
+        advance = renderer.NullRenderer.advance
+
+        def add_shape(self, name, data=None):
+            # The fake screen has no Tk to make images with, so it only gets the name
+            super().add_shape(name, None if display == "fake" else data)
+
+        def textinput(self, title, prompt):
+            return None
+
+        def bye(self):
+            self.timers = []
+
+    screen = VirtualTimeRenderer()
+    return screen, (getattr(screen.turtle, "RawTurtle", screen.turtle.Turtle),)
+
+
+def rss_kb():
+    """Return the resident set size in KB, or the peak where the current one is unknown."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 if sys.platform == "darwin" else peak
+
+
+def click_card(game, index):
+    """Page a card into view if needed and click its center."""
+    if index not in game.layout.visible_cells(game.first_row):
+        game.scroll(index // game.layout.columns - game.first_row)
+    game.handle_click(*game.hit_index.cell_center(index))
+
+
+def play(game, rng, mistakes, abandon):
+    """Play the current board to a win, or give up on it part way.
+
+    Returns:
+        bool: True if the board was won.
+    """
+    from constants import CARD_FLIP_DURATION, FRAME_MS
+    settle = CARD_FLIP_DURATION * 1000 + 2 * FRAME_MS
+    logic = game.logic
+    faces = list(range(len(logic.board.table)))
+    rng.shuffle(faces)
+    for turn, face_id in enumerate(faces):
+        if turn and rng.random() < abandon:
+            return False
+        first, second = logic.pair_positions(face_id)
+        if rng.random() < mistakes:
+            others = [index for index in range(len(logic.board))
+                      if not logic.is_matched(index) and index not in (first, second)]
+            if others:
+                click_card(game, first)
+                click_card(game, rng.choice(others))
+                game.renderer.advance(settle)
+        click_card(game, first)
+        click_card(game, second)
+        game.renderer.advance(settle)
+    return logic.check_all_matched()
+
+
+def sample(game, games, turtle_types):
+    """Measure everything the soak test watches.
+
+    The counts depend on the board, so every sample is taken on the same
+    freshly dealt reference board, and only real growth changes them.
+
+    Returns:
+        dict: Metric name -> value.
+    """
+    game.current_deck = DECKS[0]
+    game.card_count = REFERENCE_CARDS
+    game.start_reload()
+    game.renderer.advance(60 * 1000)  # Let every timer left from the last board come due
+    gc.collect()
+    live = sum(1 for obj in gc.get_objects() if isinstance(obj, turtle_types))
+    return {
+        "games": games,
+        "rss_kb": round(rss_kb(), 1),
+        "traced_kb": round(tracemalloc.get_traced_memory()[0] / 1024, 1),
+        "live_turtles": live,
+        "screen_objects": game.renderer.object_count(),
+        "canvas_items": game.renderer.item_count(),
+        "pending_timers": len(game.renderer.timers) + game.clock.queued(),
+        "cached_shapes": len(game.assets.entries),
+    }
+
+
+def slope(samples, metric):
+    """Return a metric's least squares growth per 1000 games."""
+    if len(samples) < 2:
+        return 0.0
+    games = [entry["games"] for entry in samples]
+    values = [entry[metric] for entry in samples]
+    if len(set(values)) == 1:
+        return 0.0
+    return statistics.linear_regression(games, values).slope * 1000
+
+
+def growing_sites(snapshots, top):
+    """Find allocation sites that grew between every pair of snapshots.
+
+    Args:
+        snapshots (list): tracemalloc snapshots, oldest first.
+        top (int): The most sites to return.
+
+    Returns:
+        list: (bytes grown, blocks grown, "file:line"), largest first.
+    """
+    growth = None
+    for older, newer in zip(snapshots, snapshots[1:]):
+        step = {stat.traceback: stat for stat in newer.compare_to(older, "lineno") if stat.size_diff > 0}
+        if growth is None:
+            growth = {key: (stat.size_diff, stat.count_diff) for key, stat in step.items()}
+        else:
+            growth = {key: (size + step[key].size_diff, count + step[key].count_diff)
+                      for key, (size, count) in growth.items() if key in step}
+    sites = [(size, count, f"{key[0].filename}:{key[0].lineno}")
+             for key, (size, count) in (growth or {}).items()]
+    return sorted(sites, reverse=True)[:top]
+
+
+def main():
+    """Run the soak test and fail if anything keeps growing."""
+    parser = argparse.ArgumentParser(description="Memory Game soak test")
+    parser.add_argument("--games", type=int, default=3000, help="games to play")
+    parser.add_argument("--samples", type=int, default=30, help="measurements over the run")
+    parser.add_argument("--warmup", type=float, default=0.2,
+                        help="share of the games before growth is measured")
+    parser.add_argument("--deck-every", type=int, default=7, help="games between deck switches")
+    parser.add_argument("--mistakes", type=float, default=0.3, help="chance of a wrong guess per pair")
+    parser.add_argument("--abandon", type=float, default=0.05,
+                        help="chance per pair of reloading before the board is won")
+    parser.add_argument("--display", choices=["auto", "tk", "fake", "null"], default="auto",
+                        help="draw with Tk, the fake turtle screen, or the null renderer")
+    parser.add_argument("--max-rss-slope", type=float, default=DEFAULT_RSS_SLOPE,
+                        help="allowed RSS growth in KB per 1000 games")
+    parser.add_argument("--max-traced-slope", type=float, default=DEFAULT_TRACED_SLOPE,
+                        help="allowed traced memory growth in KB per 1000 games")
+    parser.add_argument("--max-count-slope", type=float, default=DEFAULT_COUNT_SLOPE,
+                        help="allowed growth of every object and item count per 1000 games")
+    parser.add_argument("--top", type=int, default=10, help="growing allocation sites to list")
+    parser.add_argument("--report", metavar="PATH", help="save the samples and verdict as JSON")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    args = parser.parse_args()
+
+    display, xvfb = open_display(args.display)
+    folder = tempfile.mkdtemp(prefix="memory_soak_")
+    try:
+        from main import MemoryGame
+        from score_store import ScoreStore
+
+        screen, turtle_types = make_renderer(display)
+        game = MemoryGame(screen, score_store=ScoreStore(
+            os.path.join(folder, "scores.db"), legacy_path=os.path.join(folder, "missing.txt")))
+        game.replays_path = None
+        game.session_path = None
+        game.player_name = "soak"
+        rng = random.Random(args.seed)
+        random.seed(args.seed)
+
+        tracemalloc.start()
+        sample_every = max(1, args.games // args.samples)
+        warmup = int(args.games * args.warmup)
+        snapshot_at = {warmup, warmup + (args.games - warmup) // 2, args.games}
+        samples, snapshots = [], []
+        won = 0
+        start = time.perf_counter()
+        print(f"Soak test: {args.games} games on {display}, sampling every {sample_every}")
+        print(f"{'games':>7}{'RSS MB':>9}{'traced KB':>11}{'turtles':>9}{'objects':>9}"
+              f"{'items':>7}{'timers':>8}{'shapes':>8}{'games/s':>9}")
+        for number in range(1, args.games + 1):
+            if number % args.deck_every == 0:
+                game.current_deck = DECKS[(number // args.deck_every) % len(DECKS)]
+            game.card_count = rng.choice(CARD_COUNTS)
+            game.start_reload()
+            won += play(game, rng, args.mistakes, args.abandon)
+            if number % sample_every == 0 or number == args.games:
+                entry = sample(game, number, turtle_types)
+                samples.append(entry)
+                rate = number / (time.perf_counter() - start)
+                print(f"{number:>7}{entry['rss_kb'] / 1024:>9.1f}{entry['traced_kb']:>11.0f}"
+                      f"{entry['live_turtles']:>9}{entry['screen_objects']:>9}{entry['canvas_items']:>7}"
+                      f"{entry['pending_timers']:>8}{entry['cached_shapes']:>8}{rate:>9.1f}")
+            if number in snapshot_at:
+                snapshots.append(tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, __file__),  # The samples kept here
+                    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                ]))
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        if xvfb is not None:
+            xvfb.terminate()
+
+    measured = [entry for entry in samples if entry["games"] >= warmup]
+    limits = {"rss_kb": args.max_rss_slope, "traced_kb": args.max_traced_slope}
+    limits.update({metric: args.max_count_slope for metric in COUNT_METRICS})
+    print(f"\n{won} of {args.games} games won; growth per 1000 games after game {warmup}:")
+    failures = []
+    for metric, limit in limits.items():
+        growth = slope(measured, metric)
+        ok = growth <= limit
+        if not ok:
+            failures.append(metric)
+        print(f"  {metric:<16}{growth:>+12.2f}  (limit {limit:g}) {'ok' if ok else 'FAIL'}")
+
+    sites = growing_sites(snapshots, args.top)
+    print("\nAllocation sites that grew between every snapshot:" if sites
+          else "\nNo allocation site grew between every snapshot.")
+    for size, count, where in sites:
+        print(f"  {size / 1024:>+9.1f} KB {count:>+8} blocks  {where}")
+
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump({"display": display, "games": args.games, "samples": samples,
+                       "slopes": {metric: slope(measured, metric) for metric in limits},
+                       "limits": limits, "failures": failures,
+                       "growing_sites": [{"bytes": size, "blocks": count, "site": where}
+                                         for size, count, where in sites]}, file, indent=2)
+    if failures:
+        sys.exit(f"Soak test failed, still growing: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
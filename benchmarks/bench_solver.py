@@ -0,0 +1,75 @@
+"""
+Sydney Umezurike
+bench_solver.py
+CS 5001 - Memory Game
+Benchmark for the expected moves solver.
+Checks the exact solution against simulated perfect
+players, times solving the whole table, a Monte Carlo
+estimate in one process and in a pool, and the table
+lookup the leaderboard does at the end of a game.
+
+Usage:
+    python benchmarks/bench_solver.py --games 100000 --huge 3000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simulation import simulate_games
+from solver import EXACT_LIMIT, ExpectedMovesTable, estimate_expected_moves, solve_expected_moves
+
+
+def main():
+    """Check and time the solver and print the results."""
+    parser = argparse.ArgumentParser(description="Expected moves solver benchmark")
+    parser.add_argument("--cards", type=int, nargs="+", default=[4, 8, 12, 20, 52],
+                        help="card counts to check against the simulator")
+    parser.add_argument("--games", type=int, default=100000, help="simulated games per check")
+    parser.add_argument("--huge", type=int, default=3000, help="card count for the Monte Carlo timing")
+    parser.add_argument("--huge-games", type=int, default=8, help="games for the Monte Carlo timing")
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1), help="pool processes")
+    parser.add_argument("--seed", type=int, default=5001, help="random seed")
+    args = parser.parse_args()
+
+    exact = solve_expected_moves(max(args.cards))
+    print(f"{'cards':>6}{'exact':>12}{'simulated':>12}{'difference':>12}")
+    for card_count in args.cards:
+        moves = simulate_games(args.games, card_count, seed=args.seed)
+        error = moves.std() / len(moves) ** 0.5
+        difference = moves.mean() - exact[card_count]
+        print(f"{card_count:>6}{exact[card_count]:>12.4f}{moves.mean():>12.4f}"
+              f"{difference:>+12.4f} ({abs(difference) / max(error, 1e-9):.1f} std errors)")
+
+    start = time.perf_counter()
+    solved = solve_expected_moves(EXACT_LIMIT)
+    print(f"\nsolve every board up to {EXACT_LIMIT} cards: {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(solved)} sizes)")
+
+    if args.huge:
+        for label, workers in (("in process", 1), (f"{args.workers} processes", args.workers)):
+            start = time.perf_counter()
+            mean, error = estimate_expected_moves(args.huge, args.huge_games, workers, args.seed)
+            elapsed = time.perf_counter() - start
+            print(f"Monte Carlo {args.huge} cards, {label:<12} {elapsed:>8.1f} s "
+                  f"({mean:.1f} +/- {error:.1f} moves)")
+        if args.huge <= 2 * EXACT_LIMIT:
+            print(f"  exact {solve_expected_moves(args.huge)[args.huge]:.1f} moves")
+
+    start = time.perf_counter()
+    table = ExpectedMovesTable()
+    loaded = (time.perf_counter() - start) * 1000
+    counts = [8, 12, 100, 1000, 1001, 5000]
+    start = time.perf_counter()
+    for _ in range(10000):
+        for card_count in counts:
+            table.efficiency(20, card_count)
+    lookup = (time.perf_counter() - start) * 1e6 / (10000 * len(counts))
+    print(f"\ntable load {loaded:.1f} ms, efficiency lookup {lookup:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
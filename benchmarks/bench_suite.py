@@ -0,0 +1,326 @@
+"""
+Sydney Umezurike
+bench_suite.py
+CS 5001 - Memory Game
+Headless benchmark suite for the game's hot paths.
+Runs game logic, click handling, status updates and
+the leaderboard against a fake turtle screen, writes
+the results to JSON and fails if any benchmark got
+slower than the stored baseline by more than the
+allowed threshold plus that benchmark's own noise.
+Every benchmark is timed in several passes, and the
+fastest is kept. A fixed pure Python loop is timed
+in each pass too, so a machine that is slower or
+busier than the baseline's is allowed for.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+import fake_turtle
+fake_turtle.install()  # Must happen before the game modules import turtle
+
+from board import Bitset
+from game_logic import MemoryGameLogic
+from layout import BoardLayout
+from main import MemoryGame
+from score_store import ScoreStore
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.json")
+
+BOARD_SIZES = [8, 12, 100, 1000]
+DECK_SIZES = [8, 100, 1000, 10000]
+LEADERBOARD_SIZES = [10, 1000, 100000]
+
+# A result fails when it is this much slower than the baseline (0.5 = 50%)
+DEFAULT_THRESHOLD = 0.5
+
+# ...and also at least this many microseconds slower, so timer noise on
+# sub-microsecond benchmarks is not reported as a regression
+DEFAULT_MIN_DELTA = 1.0
+
+# Passes over the whole suite; each benchmark keeps its fastest pass
+DEFAULT_PASSES = 3
+
+# The spread between passes is added to the threshold, up to this much
+MAX_NOISE = 1.0
+
+CALIBRATION = "calibration.python_loop"
+
+
+def measure(func, repeat=5, number=None, setup=None):
+    """Time a function and return the fastest time per call in microseconds.
+
+    Other processes only ever make a run slower, so the fastest run is
+    the one closest to the code's own cost.
+
+    Args:
+        func (function): The code to time.
+        repeat (int): How many timing runs to take the fastest of.
+        number (int): Calls per run. Chosen automatically when None.
+        setup (function): Called before every run, outside the timing.
+
+    Returns:
+        float: Fastest microseconds per call.
+    """
+    if number is None:
+        # Aim for runs of about 20 ms
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        once = max(time.perf_counter() - start, 1e-7)
+        number = max(1, min(10000, int(0.02 / once)))
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        runs.append((time.perf_counter() - start) / number)
+    return min(runs) * 1e6
+
+
+def new_game(card_count, score_store=None):
+    """Create a MemoryGame on a fresh fake screen with a synthetic deck.
+
+    Args:
+        card_count (int): The number of cards on the board.
+        score_store (ScoreStore): The store the leaderboard should use.
+
+    Returns:
+        MemoryGame: The game, with its board not yet created.
+    """
+    fake_turtle.reset()
+    game = MemoryGame(score_store=score_store)
+    game.card_count = card_count
+    faces = [f"face{i}.gif" for i in range(card_count // 2)]
+
+    def load_deck():
+        # The fake screen never opens image files, so any face names work
+        game.card_faces = faces
+        return True
+
+    game.load_deck = load_deck
+    game.convert_card_back = lambda: None  # Nor the converted card back
+    game.replays_path = None
+    game.session_path = None
+    return game
+
+
+def python_loop():
+    """A fixed amount of pure Python work, to measure how fast the machine is right now."""
+    total = 0
+    for i in range(20000):
+        total += i * i % 7
+    return total
+
+
+def reset_board(logic):
+    """Turn every card face down and unmatched again, keeping the deal."""
+    board = logic.board
+    board.face_up = Bitset(len(board))
+    board.matched = Bitset(len(board))
+    logic.reset_state()
+
+
+def bench_logic(results):
+    """Benchmark MemoryGameLogic.create_deck and check_all_matched."""
+    for size in DECK_SIZES:
+        logic = MemoryGameLogic([f"face{i}.gif" for i in range(size // 2)])
+        results[f"logic.create_deck[cards={size}]"] = measure(logic.create_deck)
+        # Worst case for a full scan: every card matched
+        for face_id in range(size // 2):
+            logic.check_indices(*logic.pair_positions(face_id))
+        results[f"logic.check_all_matched[cards={size}]"] = measure(logic.check_all_matched)
+
+
+def bench_board(results):
+    """Benchmark MemoryGame.create_cards, handle_click and update_status."""
+    for size in BOARD_SIZES:
+        game = new_game(size)
+
+        def create():
+            # Deal, lay out and show the first rows, as setup_game does
+            game.cards = {}
+            game.deal_cards()
+            game.layout = BoardLayout(game.card_count, *game.renderer.window_size())
+            game.create_cards()
+            game.show_rows(0)
+
+        results[f"game.create_cards[cards={size}]"] = measure(create, number=3 if size > 100 else None)
+
+        rng = random.Random(size)
+        # Only cards on screen have sprites and can be clicked
+        centers = {i: game.hit_index.cell_center(i) for i in game.cards}
+        unmatched = []  # Cards on screen that clicks can still flip
+
+        def click():
+            # Two clicks on unmatched cards make one guess; clear the selection so clicks keep flipping
+            game.selected_cards = []
+            game.renderer.screen.timers = []
+            game.clock.reset()
+            if len(unmatched) < 2:
+                # Every pair on screen is matched, so start the board over
+                reset_board(game.logic)
+                unmatched[:] = centers
+            first, second = rng.sample(unmatched, 2)
+            game.handle_click(*centers[first])
+            game.handle_click(*centers[second])
+            if game.logic.is_matched(first):
+                unmatched.remove(first)
+                unmatched.remove(second)
+
+        results[f"game.handle_click[cards={size}]"] = measure(click) / 2
+
+        counter = iter(range(10 ** 9))
+        results[f"ui.update_status[cards={size}]"] = measure(
+            lambda: game.ui.update_status(next(counter), 0))
+
+
+def bench_leaderboard(results, scratch):
+    """Benchmark Leaderboard.update_scores and display_scores."""
+    for size in LEADERBOARD_SIZES:
+        db_path = os.path.join(scratch, f"leaderboard{size}.db")
+        store = ScoreStore(db_path, legacy_path=db_path + ".missing")
+        rng = random.Random(size)
+        with store._write() as cursor:
+            cursor.executemany(
+                "INSERT INTO results (name, moves, deck, card_count, created) VALUES (?, ?, ?, ?, ?)",
+                [(f"player{i}", rng.randrange(4, 200), "default_deck.txt", 8, 0.0)
+                 for i in range(size)])
+        game = new_game(8, store)
+        board = game.leaderboard
+        results[f"leaderboard.update_scores[rows={size}]"] = measure(
+            lambda: board.update_scores("bench", rng.randrange(4, 200), "default_deck.txt", 8),
+            number=200)
+        results[f"leaderboard.display_scores[rows={size}]"] = measure(board.display_scores)
+        store.close()
+
+
+def run_suite(passes):
+    """Run every benchmark several times.
+
+    Args:
+        passes (int): How many times to run the whole suite.
+
+    Returns:
+        tuple: (benchmark name -> fastest microseconds over the passes,
+            benchmark name -> spread between the passes, as a fraction).
+    """
+    runs = {}
+    for _ in range(passes):
+        results = {CALIBRATION: measure(python_loop)}
+        bench_logic(results)
+        bench_board(results)
+        with tempfile.TemporaryDirectory() as scratch:
+            bench_leaderboard(results, scratch)
+        for name, value in results.items():
+            runs.setdefault(name, []).append(value)
+    best = {name: min(values) for name, values in runs.items()}
+    noise = {name: statistics.median(values) / min(values) - 1 for name, values in runs.items()}
+    return best, noise
+
+
+def compare(results, baseline, threshold, min_delta=DEFAULT_MIN_DELTA, noise=None,
+            baseline_noise=None):
+    """Compare results with the baseline.
+
+    Results are first scaled by how much faster or slower the machine ran
+    the calibration loop than it did for the baseline. A benchmark only
+    fails when it is slower by more than the threshold plus its own noise,
+    the larger of its spread between passes now and in the baseline.
+
+    Args:
+        results (dict): Benchmark name -> microseconds.
+        baseline (dict): Benchmark name -> baseline microseconds.
+        threshold (float): Allowed slowdown, 0.5 meaning 50% slower.
+        min_delta (float): Smallest slowdown in microseconds that can fail.
+        noise (dict): Benchmark name -> spread between passes now.
+        baseline_noise (dict): Benchmark name -> spread between passes in the baseline.
+
+    Returns:
+        list: Names of the benchmarks that regressed.
+    """
+    noise = noise or {}
+    baseline_noise = baseline_noise or {}
+    speed = 1.0
+    if results.get(CALIBRATION) and baseline.get(CALIBRATION):
+        speed = baseline[CALIBRATION] / results[CALIBRATION]
+        print(f"This machine ran the calibration loop at {speed:.0%} of the baseline's speed\n")
+    regressions = []
+    print(f"{'benchmark':<48}{'us':>12}{'baseline':>12}{'change':>10}{'allowed':>10}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if name == CALIBRATION:
+            continue
+        if base:
+            scaled = value * speed
+            change = scaled / base - 1
+            allowed = threshold + min(MAX_NOISE, max(noise.get(name, 0),
+                                                     baseline_noise.get(name, 0)))
+            regressed = change > allowed and scaled - base > min_delta
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<48}{scaled:>12.2f}{base:>12.2f}{change:>+9.0%}{allowed:>+9.0%}{flag}")
+            if flag:
+                regressions.append(name)
+        else:
+            print(f"{name:<48}{value:>12.2f}{'-':>12}{'new':>10}")
+    return regressions
+
+
+def main():
+    """Run every benchmark, save the results and check for regressions."""
+    parser = argparse.ArgumentParser(description="Headless hot path benchmarks")
+    parser.add_argument("--output", default=RESULTS_PATH, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before failing, 0.5 = 50%%")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="smallest slowdown in microseconds that counts")
+    parser.add_argument("--passes", type=int, default=DEFAULT_PASSES,
+                        help="times to run the whole suite, keeping each benchmark's fastest")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="save these results as the new baseline")
+    args = parser.parse_args()
+
+    results, noise = run_suite(max(1, args.passes))
+    report = {"unit": "microseconds per call", "python": sys.version.split()[0],
+              "passes": args.passes, "results": results, "noise": noise}
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+    regressions = compare(results, baseline.get("results", {}), args.threshold, args.min_delta,
+                          noise, baseline.get("noise"))
+    if regressions:
+        sys.exit(f"{len(regressions)} benchmark(s) regressed past {args.threshold:.0%}: "
+                 + ", ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Sydney Umezurike
+fake_turtle.py
+CS 5001 - Memory Game
+A stand-in for the turtle module used by the benchmarks.
+It keeps just enough state (positions, shapes, drawn
+items, timers) for the game code to run without a Tk
+display, and does no drawing at all.
+
+Call install() before importing any game module.
+"""
+
+import sys
+
+
+class Counters:
+    def __init__(self):
+        """Track how many fake turtles were created and how many canvas items exist."""
+        self.turtles = 0
+        self.items = 0
+
+
+counters = Counters()
+
+
+class Shape:
+    def __init__(self, kind, data=None):
+        """A registered shape; only remembers what it was made from."""
+        self.kind = kind
+        self.data = data
+
+
+class Turtle:
+    def __init__(self, shape="classic", visible=True):
+        """Create a turtle at the origin and register it with the screen."""
+        counters.turtles += 1
+        self._position = (0.0, 0.0)
+        self._shape = shape
+        self._visible = visible
+        self._heading = 0.0
+        self._pen_down = True
+        self._items = 0
+        _screen._turtles.append(self)
+
+    def goto(self, x, y=None):
+        if y is None:
+            x, y = x
+        if self._pen_down:
+            self._add_item()
+        self._position = (x, y)
+
+    setposition = setpos = goto
+
+    def pos(self):
+        return self._position
+
+    position = pos
+
+    def xcor(self):
+        return self._position[0]
+
+    def ycor(self):
+        return self._position[1]
+
+    def forward(self, distance):
+        if self._pen_down:
+            self._add_item()
+
+    fd = forward
+
+    def right(self, angle):
+        self._heading -= angle
+
+    def left(self, angle):
+        self._heading += angle
+
+    def setheading(self, angle):
+        self._heading = angle
+
+    def penup(self):
+        self._pen_down = False
+
+    pu = up = penup
+
+    def pendown(self):
+        self._pen_down = True
+
+    pd = down = pendown
+
+    def shape(self, name=None):
+        if name is None:
+            return self._shape
+        self._shape = name
+
+    def showturtle(self):
+        self._visible = True
+
+    st = showturtle
+
+    def hideturtle(self):
+        self._visible = False
+
+    ht = hideturtle
+
+    def isvisible(self):
+        return self._visible
+
+    def write(self, text, move=False, align="left", font=("Arial", 8, "normal")):
+        self._add_item()
+
+    def begin_fill(self):
+        pass
+
+    def end_fill(self):
+        self._add_item()
+
+    def clear(self):
+        counters.items -= self._items
+        self._items = 0
+
+    def _add_item(self):
+        self._items += 1
+        counters.items += 1
+
+    def __getattr__(self, name):
+        # Styling calls such as speed, color and pensize do nothing here
+        return _noop
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+class FakeCanvas:
+    def winfo_toplevel(self):
+        return self
+
+    def attributes(self, *args):
+        return None
+
+    def bind(self, *args, **kwargs):
+        return None
+
+    def find_all(self):
+        return range(counters.items)
+
+
+class Screen_:
+    def __init__(self):
+        """The single fake screen, with a manual timer queue."""
+        self._shapes = {}
+        self._turtles = []
+        self.timers = []  # (delay ms, callback) in the order they were scheduled
+        self.inputs = []  # Answers returned by textinput, in order
+        self.click_handler = None
+        self.updates = 0
+        self.width = 800
+        self.height = 600
+
+    def setup(self, width=800, height=600, startx=None, starty=None):
+        self.width = width
+        self.height = height
+
+    def window_width(self):
+        return self.width
+
+    def window_height(self):
+        return self.height
+
+    def addshape(self, name, shape=None):
+        self._shapes[name] = shape or Shape("image", name)
+
+    register_shape = addshape
+
+    def getshapes(self):
+        return list(self._shapes)
+
+    def ontimer(self, callback, delay=0):
+        self.timers.append((delay, callback))
+
+    def run_timers(self):
+        """Run every pending timer, including ones scheduled while running."""
+        while self.timers:
+            _, callback = self.timers.pop(0)
+            callback()
+
+    def onclick(self, handler, btn=1, add=None):
+        self.click_handler = handler
+
+    onscreenclick = onclick
+
+    def textinput(self, title, prompt):
+        return self.inputs.pop(0) if self.inputs else None
+
+    def update(self):
+        self.updates += 1
+
+    def clear(self):
+        for item in self._turtles:
+            item.clear()
+        self._turtles = []
+        self.click_handler = None
+
+    def turtles(self):
+        return self._turtles
+
+    def getcanvas(self):
+        return FakeCanvas()
+
+    def __getattr__(self, name):
+        # title, bgcolor, setup, tracer, bgpic, bye, mainloop ...
+        return _noop
+
+
+_screen = Screen_()
+
+
+def Screen():
+    return _screen
+
+
+def reset():
+    """Start over with an empty screen and zeroed counters."""
+    global _screen
+    _screen = Screen_()
+    counters.turtles = 0
+    counters.items = 0
+
+
+def write(*args, **kwargs):
+    return None
+
+
+def install():
+    """Put this module in sys.modules as 'turtle'.
+
+    Returns:
+        module: The fake turtle module.
+    """
+    module = sys.modules[__name__]
+    sys.modules["turtle"] = module
+    return module
+
+
+__all__ = ["Turtle", "Screen", "Shape", "install", "reset", "counters"]
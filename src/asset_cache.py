@@ -0,0 +1,209 @@
+"""
+Sydney Umezurike
+asset_cache.py
+CS 5001 - Memory Game
+Process-wide cache for image shapes.
+Registers every image path once per renderer,
+from an asset pack when one is open, keeps track of how much decoded image memory
+is in use and evicts the least recently used
+card faces when a memory budget is exceeded.
+"""
+
+import base64
+import os
+import weakref
+from collections import OrderedDict
+from deck_manifest import image_dimensions, IMAGE_HEADER_BYTES
+from constants import ASSET_MEMORY_BUDGET
+
+# Bytes Tk keeps per decoded pixel (RGBA)
+BYTES_PER_PIXEL = 4
+
+
+def decoded_size(path, data=None):
+    """Estimate how much memory an image takes once Tk decodes it.
+
+    GIF, PNG and PPM files store their width and height in the header, so
+    the decoded size can be worked out without decoding the image. Other
+    files fall back to their size on disk.
+
+    Args:
+        path (str): The path to the image.
+        data (bytes): Base64 image data already read from path. Defaults to None.
+
+    Returns:
+        int: The estimated decoded size in bytes.
+    """
+    try:
+        if data is not None:
+            header = base64.b64decode(data[:(IMAGE_HEADER_BYTES + 2) // 3 * 4])
+        else:
+            with open(path, "rb") as file:
+                header = file.read(IMAGE_HEADER_BYTES)
+        width, height = image_dimensions(header)
+        if width:
+            return width * height * BYTES_PER_PIXEL
+        return len(data) * 3 // 4 if data is not None else os.path.getsize(path)
+    except (OSError, ValueError):
+        return 0
+
+
+def read_image_data(path):
+    """Read an image file as the base64 data Tk accepts on every platform.
+
+    Args:
+        path (str): The path to the image.
+
+    Returns:
+        bytes: The base64 data, or None if the file could not be read.
+    """
+    try:
+        with open(path, "rb") as file:
+            return base64.b64encode(file.read())
+    except OSError:
+        return None
+
+
+class AssetCache:
+    def __init__(self, renderer, memory_budget=ASSET_MEMORY_BUDGET):
+        """Initialize an empty cache for one renderer.
+
+        Args:
+            renderer (Renderer): The renderer the shapes are registered with.
+            memory_budget (int): The most decoded bytes to keep registered.
+        """
+        self.renderer = renderer
+        self.memory_budget = memory_budget
+        self.entries = OrderedDict()  # Shape name -> decoded size, oldest first
+        self.pinned = set()  # Shapes that are never evicted
+        self.retained = set()  # Shapes in use on the current board
+        self.sources = {}  # Shape name -> converted file to load it from instead
+        self.pack = None  # AssetPack to take image data from before any file
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def register(self, path, pinned=False, data=None):
+        """Make sure an image is registered as a shape on the screen.
+
+        The first call for a path registers it with the renderer. Later
+        calls only mark it as recently used.
+
+        Args:
+            path (str): The path to the image.
+            pinned (bool): True to keep the shape registered forever, for UI images.
+            data (bytes): Base64 image data already read from path, so Tk
+                does not have to open the file. Defaults to None.
+
+        Returns:
+            str: The shape name to pass to turtle.shape.
+        """
+        if path in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(path)
+        else:
+            self.misses += 1
+            if data is None and self.pack is not None:
+                data = self.pack.image_data(path)
+            if data is None and path in self.sources:
+                data = read_image_data(self.sources[path])
+            self.renderer.add_shape(path, data)
+            size = decoded_size(path, data)
+            self.entries[path] = size
+            self.bytes_used += size
+        if pinned:
+            self.pinned.add(path)
+        self.evict()
+        return path
+
+    def add_sources(self, sources):
+        """Load some shapes from converted files, such as the image cache's.
+
+        The shape keeps its original name, so the rest of the game never
+        sees the converted file.
+
+        Args:
+            sources (dict): Shape name -> file to read the image from.
+
+        Returns:
+            None
+        """
+        self.sources.update(sources)
+
+    def use_pack(self, pack):
+        """Take image data from an asset pack, for every shape it holds.
+
+        Args:
+            pack (AssetPack): The open pack, or None to go back to the files.
+
+        Returns:
+            None
+        """
+        self.pack = pack
+
+    def retain(self, paths):
+        """Protect the shapes used by the current board from eviction.
+
+        Replaces the previously retained set, so faces from an old board
+        become evictable again.
+
+        Args:
+            paths (iterable): The shape names in use.
+
+        Returns:
+            None
+        """
+        self.retained = set(paths)
+        self.evict()
+
+    def evict(self):
+        """Unregister least recently used shapes until under the memory budget.
+
+        Returns:
+            None
+        """
+        if self.bytes_used <= self.memory_budget:
+            return
+        for path in list(self.entries):
+            if self.bytes_used <= self.memory_budget:
+                break
+            if path in self.pinned or path in self.retained:
+                continue
+            self.bytes_used -= self.entries.pop(path)
+            self.renderer.remove_shape(path)
+            self.evictions += 1
+
+    def stats(self):
+        """Return the cache counters.
+
+        Returns:
+            dict: Hits, misses, evictions, entries and bytes used.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes_used": self.bytes_used,
+            "memory_budget": self.memory_budget,
+        }
+
+
+# One cache per renderer for the whole process
+_caches = weakref.WeakKeyDictionary()
+
+
+def get_asset_cache(renderer):
+    """Return the shared asset cache for a renderer, creating it if needed.
+
+    Args:
+        renderer (Renderer): The renderer.
+
+    Returns:
+        AssetCache: The cache for that renderer.
+    """
+    cache = _caches.get(renderer)
+    if cache is None:
+        cache = _caches[renderer] = AssetCache(renderer)
+    return cache
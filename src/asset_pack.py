@@ -0,0 +1,379 @@
+"""
+Sydney Umezurike
+asset_pack.py
+CS 5001 - Memory Game
+Single-file asset packs.
+A pack bundles deck listings, their card faces, the
+card back, the UI images and the flip frames into one
+indexed file. The game maps it into memory once, and
+every image is stored as the base64 data Tk accepts,
+so a shape is registered straight from the mapped
+bytes, without opening, converting or encoding any
+file. Faces are stored already converted to the card
+size by the image cache.
+
+Usage:
+    python src/asset_pack.py build default_deck.txt custom_deck.txt
+    python src/asset_pack.py show assets/assets.mgpack
+"""
+
+import argparse
+import base64
+import hashlib
+import mmap
+import os
+import struct
+import time
+from deck_manifest import DeckManifest, describe_image, is_streamed_deck, load_manifest
+from image_cache import ImageCache, unusable_faces
+from flip_animation import FlipFrames
+from replay import ReplayError, read_varint, write_varint
+from session import pack_long_text
+from constants import (ASSETS_PATH, PACK_PATH, CARD_BACK, SPLASH_SCREEN, WINNER_IMAGE,
+                       END_CREDITS, QUIT_MESSAGE, CARD_WARNING, FILE_ERROR, QUIT_BUTTON,
+                       LOAD_BUTTON)
+
+PACK_MAGIC = b"MGPK"
+PACK_VERSION = 2  # Version 2 holds the smaller cards, with the card back scaled too
+
+# magic, version, entry count, index offset, index length
+HEADER = struct.Struct("<4sBIQI")
+
+# Entry kinds
+IMAGE = 1  # Base64 image data, ready for Tk
+DECK = 2  # A deck's face names, one per line
+
+# Images the game shows by name, packed with every deck
+UI_IMAGES = (CARD_BACK, SPLASH_SCREEN, WINNER_IMAGE, END_CREDITS, QUIT_MESSAGE,
+             CARD_WARNING, FILE_ERROR, QUIT_BUTTON, LOAD_BUTTON)
+
+
+class AssetPackError(Exception):
+    pass
+
+
+def entry_name(path):
+    """Name files in the assets folder relative to it, the way the pack index does."""
+    prefix = ASSETS_PATH + os.sep
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+class AssetPack:
+    def __init__(self, path=PACK_PATH):
+        """Map a pack into memory and read its index.
+
+        Args:
+            path (str): The pack file.
+
+        Raises:
+            OSError: If the file cannot be opened.
+            AssetPackError: If it is not a complete pack.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            try:
+                self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # An empty file cannot be mapped
+                raise AssetPackError(f"{path} is empty")
+        try:
+            self.entries = self._read_index()
+        except AssetPackError:
+            self.map.close()
+            raise
+
+    def _read_index(self):
+        """Parse the index into name -> (kind, offset, length, sha1, width, height)."""
+        if len(self.map) < HEADER.size or self.map[:4] != PACK_MAGIC:
+            raise AssetPackError(f"{self.path} is not an asset pack")
+        magic, version, count, index_offset, index_length = HEADER.unpack_from(self.map)
+        if version != PACK_VERSION:
+            raise AssetPackError(f"{self.path}: unsupported pack version {version}")
+        if index_offset + index_length > len(self.map):
+            raise AssetPackError(f"{self.path}: index runs past the end of the pack")
+        index = self.map[index_offset:index_offset + index_length]
+        entries = {}
+        try:
+            offset = 0
+            for _ in range(count):
+                kind = index[offset]
+                length, offset = read_varint(index, offset + 1)
+                name = index[offset:offset + length].decode("utf-8")
+                offset += length
+                start, offset = read_varint(index, offset)
+                size, offset = read_varint(index, offset)
+                sha1 = index[offset:offset + 20].hex()
+                width, offset = read_varint(index, offset + 20)
+                height, offset = read_varint(index, offset)
+                if start + size > index_offset:
+                    raise ValueError(f"{name} runs into the index")
+                entries[name] = (kind, start, size, sha1, width, height)
+        except (IndexError, ValueError, ReplayError) as e:
+            raise AssetPackError(f"{self.path}: index is cut short or damaged ({e})")
+        return entries
+
+    @property
+    def decks(self):
+        """The names of the decks in the pack."""
+        return [name for name, entry in self.entries.items() if entry[0] == DECK]
+
+    def has_deck(self, deck_file):
+        """Check if a deck is in the pack."""
+        entry = self.entries.get(deck_file)
+        return entry is not None and entry[0] == DECK
+
+    def image_data(self, path):
+        """Return an image's base64 data, sliced straight from the mapped file.
+
+        Args:
+            path (str): The image path or shape name.
+
+        Returns:
+            bytes: The data to hand to Tk, or None if the pack does not hold it.
+        """
+        entry = self.entries.get(entry_name(path))
+        if entry is None or entry[0] != IMAGE:
+            return None
+        return self.map[entry[1]:entry[1] + entry[2]]
+
+    def manifest(self, deck_file):
+        """Build the manifest of a packed deck from the index, without touching any file.
+
+        The entries carry the content hashes of the original images, so the
+        manifest id matches the one load_manifest gives for the loose deck.
+
+        Args:
+            deck_file (str): The deck file name it was packed from.
+
+        Returns:
+            DeckManifest: The manifest. Check its errors list.
+        """
+        if not self.has_deck(deck_file):
+            return DeckManifest(deck_file, errors=[f"{deck_file} is not in {self.path}"])
+        _, start, size, _, _, _ = self.entries[deck_file]
+        text = self.map[start:start + size].decode("utf-8")
+        entries = []
+        errors = []
+        for name in text.split("\n") if text else []:
+            entry = self.entries.get(name)
+            if entry is None or entry[0] != IMAGE:
+                errors.append(f"Card image {name} is missing from {self.path}")
+                continue
+            kind, start, size, sha1, width, height = entry
+            entries.append({"name": name, "path": os.path.join(ASSETS_PATH, name), "size": size,
+                            "mtime": 0, "sha1": sha1, "width": width, "height": height})
+        return DeckManifest(deck_file, 0, entries, errors)
+
+    def flip_frames(self, paths, widths):
+        """Find the flip frames the pack holds for some images.
+
+        Args:
+            paths (iterable): Image paths.
+            widths (list): The frame widths, widest first.
+
+        Returns:
+            dict: Image path -> frame shape names, for every image with all its frames.
+        """
+        frames = {}
+        for path in paths:
+            names = [f"{path}#flip{width}" for width in widths]
+            if all(entry_name(name) in self.entries for name in names):
+                frames[path] = names
+        return frames
+
+    def close(self):
+        """Unmap the pack.
+
+        Returns:
+            None
+        """
+        self.map.close()
+
+
+def open_pack(path=PACK_PATH):
+    """Open a pack, reporting why if it cannot be used.
+
+    Args:
+        path (str): The pack file.
+
+    Returns:
+        AssetPack: The pack, or None to use the loose files.
+    """
+    try:
+        return AssetPack(path)
+    except (OSError, AssetPackError) as e:
+        print(f"Could not open asset pack {path}, using the loose files: {e}")
+        return None
+
+
+def build_pack(path, decks, cache=None, frames=None, assets_path=ASSETS_PATH):
+    """Bundle some decks and the UI images into one pack file.
+
+    Faces are converted by the image cache and the flip frames are made
+    first, converting only what is not cached yet. The pack is written
+    to a temporary file that replaces the old one.
+
+    Args:
+        path (str): The pack file to write.
+        decks (list): Deck file names in the assets folder.
+        cache (ImageCache): Converts the faces. Defaults to the game's image cache.
+        frames (FlipFrames): Makes the flip frames. Defaults to the game's frame cache.
+        assets_path (str): The folder holding the decks and images.
+
+    Returns:
+        list: Problems found; decks with any are left out of the pack.
+
+    Raises:
+        OSError: If the pack cannot be written.
+    """
+    cache = cache or ImageCache()
+    frames = frames or FlipFrames()
+    errors = []
+    listings = {}  # Deck file -> face names
+    images = {}  # Entry name -> (file to read, original sha1, width, height)
+    hashes = {}  # Original image path -> sha1
+    ui_paths = {os.path.join(assets_path, name) for name in UI_IMAGES}
+    for deck in decks:
+        if is_streamed_deck(deck, assets_path):
+            errors.append(f"{deck}: huge decks are sampled per board, so they are not packed")
+            continue
+        manifest = load_manifest(deck, assets_path)
+        problems = manifest.errors
+        if not problems:
+            sources = cache.build(manifest.entries)
+            problems = cache.errors + [f"Card image {name} could not be converted"
+                                       for name in unusable_faces(manifest.entries, sources)]
+        if problems:
+            errors.extend(f"{deck}: {problem}" for problem in problems)
+            continue
+        listings[deck] = manifest.faces
+        for entry in manifest.entries:
+            images[entry["name"]] = (sources.get(entry["path"], entry["path"]), entry["sha1"],
+                                     entry["width"], entry["height"])
+            hashes[entry["path"]] = entry["sha1"]
+    for name in UI_IMAGES:
+        image_path = os.path.join(assets_path, name)
+        try:
+            entry = describe_image(image_path)
+        except OSError as e:
+            errors.append(f"{name}: {e.strerror or e}")
+            continue
+        if name == CARD_BACK:
+            # Scaled to the card size like the faces
+            converted = cache.build([entry]).get(image_path)
+            if converted is None:
+                errors.extend(f"{name}: {error}" for error in cache.errors)
+                continue
+            images[name] = (converted, entry["sha1"], cache.width, cache.height)
+        else:
+            images[name] = (image_path, entry["sha1"], entry["width"], entry["height"])
+        hashes[image_path] = entry["sha1"]
+
+    # The card back turns over too, the other UI images never do
+    card_back = os.path.join(assets_path, CARD_BACK)
+    flipped = [path for path in sorted(hashes) if path == card_back or path not in ui_paths]
+    frames.build(flipped)
+    errors.extend(f"flip frames for {error}" for error in frames.errors)
+    for image_path, files in frames.files.items():
+        if image_path in flipped:
+            for width, file in zip(frames.widths, files):
+                images[f"{entry_name(image_path)}#flip{width}"] = (file, hashes[image_path],
+                                                                   width, frames.height)
+    write_pack(path, listings, images)
+    return errors
+
+
+def write_pack(path, listings, images):
+    """Write the blobs and then the index, and move the file into place.
+
+    Args:
+        path (str): The pack file.
+        listings (dict): Deck file -> face names.
+        images (dict): Entry name -> (file to read, sha1, width, height).
+
+    Returns:
+        None
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    index = bytearray()
+    count = 0
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(temp_path, "wb") as file:
+            file.write(bytes(HEADER.size))
+            for deck, faces in listings.items():
+                blob = "\n".join(faces).encode("utf-8")
+                _add_entry(index, file, DECK, deck, blob, hashlib.sha1(blob).hexdigest(), 0, 0)
+                count += 1
+            for name, (source, sha1, width, height) in sorted(images.items()):
+                with open(source, "rb") as image:
+                    blob = base64.b64encode(image.read())
+                _add_entry(index, file, IMAGE, name, blob, sha1, width, height)
+                count += 1
+            index_offset = file.tell()
+            file.write(index)
+            file.seek(0)
+            file.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, count, index_offset, len(index)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _add_entry(index, file, kind, name, blob, sha1, width, height):
+    """Write one blob and append its index entry."""
+    index.append(kind)
+    index += pack_long_text(name)
+    write_varint(index, file.tell())
+    write_varint(index, len(blob))
+    index += bytes.fromhex(sha1)
+    write_varint(index, width)
+    write_varint(index, height)
+    file.write(blob)
+
+
+def main():
+    """Build a pack from some decks, or print what a pack holds."""
+    parser = argparse.ArgumentParser(description="Memory Game asset packs")
+    parser.add_argument("command", choices=["build", "show"])
+    parser.add_argument("args", nargs="*",
+                        help="deck files in the assets folder to build from, or the pack to show")
+    parser.add_argument("-o", "--output", default=PACK_PATH, help="the pack file to build")
+    parser.add_argument("--workers", type=int, default=None, help="processes to convert with")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        path = args.args[0] if args.args else PACK_PATH
+        try:
+            pack = AssetPack(path)
+        except (OSError, AssetPackError) as e:
+            raise SystemExit(f"Could not read asset pack: {e}")
+        images = [entry for entry in pack.entries.values() if entry[0] == IMAGE]
+        print(f"{path}: {len(pack.decks)} decks, {len(images)} images, "
+              f"{len(pack.map) / 1024:.0f} KB")
+        for deck in pack.decks:
+            manifest = pack.manifest(deck)
+            print(f"  {deck}: {len(manifest.entries)} faces ({manifest.manifest_id})")
+        pack.close()
+        return
+
+    if not args.args:
+        parser.error("build needs at least one deck file")
+    start = time.perf_counter()
+    try:
+        errors = build_pack(args.output, args.args, ImageCache(workers=args.workers),
+                            FlipFrames(workers=args.workers))
+    except OSError as e:
+        raise SystemExit(f"Could not write asset pack {args.output}: {e}")
+    for error in errors:
+        print(f"  {error}")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{args.output}: {os.path.getsize(args.output) / 1024:.0f} KB in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
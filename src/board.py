@@ -0,0 +1,232 @@
+"""
+Sydney Umezurike
+board.py
+CS 5001 - Memory Game
+Compact board storage for the Memory Game.
+Faces are stored as interned integer ids in a
+typed array and the face up and matched flags are
+bitsets, so even boards with 100,000+ cards take
+only a few MB and matches are integer compares.
+"""
+
+import random
+from array import array
+
+
+class FaceTable:
+    def __init__(self, images=()):
+        """Initialize the table that turns face images into small integer ids.
+
+        Args:
+            images (iterable): Images to intern straight away.
+        """
+        self.images = []  # Face id -> image
+        self.ids = {}  # Image -> face id
+        for image in images:
+            self.intern(image)
+
+    @classmethod
+    def from_unique(cls, images):
+        """Create a table from images that have no repeats, such as a saved table.
+
+        Args:
+            images (list): The images, in face id order.
+
+        Returns:
+            FaceTable: The table, built without interning one image at a time.
+        """
+        table = cls()
+        table.images = list(images)
+        table.ids = dict(zip(table.images, range(len(table.images))))
+        return table
+
+    def intern(self, image):
+        """Return the id of an image, giving it a new id if it is new.
+
+        Args:
+            image (str): The face image path.
+
+        Returns:
+            int: The face id.
+        """
+        face_id = self.ids.get(image)
+        if face_id is None:
+            face_id = self.ids[image] = len(self.images)
+            self.images.append(image)
+        return face_id
+
+    def image(self, face_id):
+        """Return the image for a face id.
+
+        Args:
+            face_id (int): The face id.
+
+        Returns:
+            str: The face image path.
+        """
+        return self.images[face_id]
+
+    def __len__(self):
+        return len(self.images)
+
+
+class Bitset:
+    __slots__ = ("bits", "size", "count")
+
+    def __init__(self, size):
+        """Initialize a bitset with every bit cleared.
+
+        Args:
+            size (int): The number of bits.
+        """
+        self.bits = bytearray((size + 7) // 8)
+        self.size = size
+        self.count = 0  # Number of set bits, kept up to date
+
+    @classmethod
+    def from_bytes(cls, data, size):
+        """Create a bitset from bits saved with its bits attribute.
+
+        Args:
+            data (bytes): The saved bits, eight per byte.
+            size (int): The number of bits.
+
+        Returns:
+            Bitset: The bitset, with its count worked out from the bits.
+        """
+        bitset = cls(size)
+        bitset.bits[:] = data[:len(bitset.bits)]
+        bitset.count = int.from_bytes(bitset.bits, "little").bit_count()
+        return bitset
+
+    def __getitem__(self, index):
+        return (self.bits[index >> 3] >> (index & 7)) & 1
+
+    def __contains__(self, index):
+        return 0 <= index < self.size and self[index] == 1
+
+    def __len__(self):
+        return self.count
+
+    def set(self, index):
+        """Set a bit.
+
+        Args:
+            index (int): The bit to set.
+
+        Returns:
+            bool: True if the bit was not already set.
+        """
+        mask = 1 << (index & 7)
+        byte = self.bits[index >> 3]
+        if byte & mask:
+            return False
+        self.bits[index >> 3] = byte | mask
+        self.count += 1
+        return True
+
+    def clear(self, index):
+        """Clear a bit.
+
+        Args:
+            index (int): The bit to clear.
+
+        Returns:
+            bool: True if the bit was set before.
+        """
+        mask = 1 << (index & 7)
+        byte = self.bits[index >> 3]
+        if not byte & mask:
+            return False
+        self.bits[index >> 3] = byte & ~mask
+        self.count -= 1
+        return True
+
+    def __iter__(self):
+        """Yield the index of every set bit."""
+        for byte_index, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                yield byte_index * 8 + low.bit_length() - 1
+                byte ^= low
+
+    def nbytes(self):
+        """Return the memory used by the bits."""
+        return len(self.bits)
+
+
+class Board:
+    def __init__(self, face_ids, table):
+        """Initialize a board from face ids.
+
+        Args:
+            face_ids (array): The face id of every card, in board order.
+            table (FaceTable): The table the ids belong to.
+        """
+        self.face_ids = face_ids
+        self.table = table
+        self.face_up = Bitset(len(face_ids))
+        self.matched = Bitset(len(face_ids))
+
+    @classmethod
+    def shuffled(cls, images, rng=random):
+        """Create a board holding two cards of every image, shuffled.
+
+        Args:
+            images (list): The face images, one per pair, with no repeats.
+            rng (random.Random): The random generator to shuffle with.
+
+        Returns:
+            Board: The new board.
+
+        Raises:
+            ValueError: If an image is repeated, since its id would have more than two cards.
+        """
+        table = FaceTable()
+        ids = [table.intern(image) for image in images]
+        if len(table) != len(ids):
+            raise ValueError(f"{len(ids) - len(table)} face images are repeated")
+        pairs = array(id_typecode(len(table)), ids)
+        face_ids = pairs + pairs
+        rng.shuffle(face_ids)
+        return cls(face_ids, table)
+
+    def __len__(self):
+        return len(self.face_ids)
+
+    def face_id(self, index):
+        """Return the face id of the card at a position."""
+        return self.face_ids[index]
+
+    def image(self, index):
+        """Return the face image of the card at a position."""
+        return self.table.images[self.face_ids[index]]
+
+    def same_face(self, index1, index2):
+        """Check if two cards show the same face, as an integer compare."""
+        return self.face_ids[index1] == self.face_ids[index2]
+
+    def nbytes(self):
+        """Return the memory used by the face ids and flags, in bytes.
+
+        The face table is not counted because it holds one entry per pair
+        shared with the deck, not per card.
+        """
+        return (self.face_ids.itemsize * len(self.face_ids)
+                + self.face_up.nbytes() + self.matched.nbytes())
+
+
+def id_typecode(count):
+    """Return the smallest unsigned array typecode that can hold count ids.
+
+    Args:
+        count (int): The number of distinct ids.
+
+    Returns:
+        str: An array typecode.
+    """
+    if count <= 1 << 8:
+        return "B"
+    if count <= 1 << 16:
+        return "H"
+    return "I"
@@ -15,18 +15,18 @@ BG_COLOR = "#A0D6D8"
 INITIAL_BG_COLOR = "pink"  
 
 # Card settings
-CARD_SPACING = 50  
-CARD_WIDTH = 100  
-CARD_HEIGHT = 150  
+CARD_SPACING = 10  
+CARD_WIDTH = 80  # Small enough for a 14-card board to fit the default window without paging
+CARD_HEIGHT = 120  
 START_X = -550  
 START_Y = 300  
 COLUMNS = 4  
 
-# Button coordinates
-QUIT_BUTTON_X = (250, 350)  
-QUIT_BUTTON_Y = (-320, -220)  
-LOAD_BUTTON_X = (120, 220)  
-LOAD_BUTTON_Y = (-320, -220)  
+# Layout settings
+LAYOUT_MARGIN = 25  # Gap between the window edge and each area
+PANEL_WIDTH = 250  # Width of the leaderboard panel
+STATUS_HEIGHT = 100  # Height of the status bar
+BUTTON_SIZE = 100  # Width and height of the clickable button area
 
 # Timing constants
 SPLASH_SCREEN_DURATION = 2  
@@ -34,10 +34,24 @@ CARD_FLIP_DURATION = 1
 END_CREDITS_DURATION = 5  
 QUIT_MESSAGE_DURATION = 3  
 WARNING_DURATION = 3  
+FRAME_MS = 16  # Shortest time between two screen updates
+INPUT_QUEUE_LIMIT = 32  # Most clicks waiting for the next frame
+FLIP_FRAMES = 4  # Narrowed images per side of a card in the flip animation
+FLIP_DURATION_MS = 180  # How long a card takes to turn over; 0 turns the animation off
+FLIP_FRAME_BUDGET_MS = 4  # Most time one frame may spend on flips before the rest wait
+RESIZE_DELAY_MS = 150  # How long the window has to stop changing size before the board is laid out again
 
-# Valid card counts
-VALID_CARD_COUNTS = [8, 10, 12]  
+# Startup settings
+STARTUP_TICK_MS = 20  # Time between preload ticks while the splash is up
+PRELOAD_PER_TICK = 4  # Shapes registered per preload tick
+STARTUP_REPORT_ENV = "MEMORY_GAME_STARTUP_REPORT"  # Set to a path to save startup timings
+PROFILE_ENV = "MEMORY_GAME_PROFILE"  # Set to a .json or .csv path to time the hot paths
+
+# Card counts
+MIN_CARD_COUNT = 4  # Any even number of cards from here up, as the deck allows
 DEFAULT_CARD_COUNT = 8  
+EAGER_FACE_LIMIT = 64  # Decks with more faces register them when first flipped
+STREAM_DECK_BYTES = 64 * 1024  # Larger deck files are sampled as they stream, not compiled
 
 # File names
 DEFAULT_DECK = "default_deck.txt"  
@@ -47,10 +61,24 @@ WINNER_IMAGE = "winner.gif"
 END_CREDITS = "EndCredits.gif"  
 QUIT_MESSAGE = "quitmsg.gif"  
 CARD_WARNING = "card_warning.gif"  
+FILE_ERROR = "file_error.gif"  
 QUIT_BUTTON = "quitbutton.gif"  
 LOAD_BUTTON = "load_deck_button.gif"  
 LEADERBOARD_FILE = "leaderboard.txt"  
+LEADERBOARD_DB = "leaderboard.db"  
+EXPECTED_MOVES_FILE = "expected_moves.json"  
+SESSION_FILE = "session.mgs"  
+PACK_FILE = "assets.mgpack"  
+
+# Asset cache settings
+ASSET_MEMORY_BUDGET = 64 * 1024 * 1024  # Decoded image bytes kept registered
 
 # Assets path
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))  
-ASSETS_PATH = os.path.join(CURRENT_DIR, "..", "assets")  
+ASSETS_PATH = os.path.normpath(os.path.join(CURRENT_DIR, "..", "assets"))  
+REPLAYS_PATH = os.path.join(ASSETS_PATH, "replays")  # Where game replays are saved
+IMAGE_CACHE_PATH = os.path.join(ASSETS_PATH, "image_cache")  # Card faces converted for Tk
+FLIP_CACHE_PATH = os.path.join(IMAGE_CACHE_PATH, "flip")  # Narrowed faces for the flip animation
+EXPECTED_MOVES_PATH = os.path.join(ASSETS_PATH, EXPECTED_MOVES_FILE)  # Precomputed by solver.py
+SESSION_PATH = os.path.join(ASSETS_PATH, SESSION_FILE)  # Snapshot of the unfinished board
+PACK_PATH = os.path.join(ASSETS_PATH, PACK_FILE)  # Decks and images bundled by asset_pack.py
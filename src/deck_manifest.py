@@ -0,0 +1,444 @@
+"""
+Sydney Umezurike
+deck_manifest.py
+CS 5001 - Memory Game
+Compiles deck files into cached manifests.
+A manifest lists every card image of a deck with
+its resolved path, size, modification time, content
+hash and dimensions, and is saved next to the deck
+so later loads only re-check images that changed.
+Huge decks, given as a large deck file or a folder
+of images, are streamed instead: the faces a board
+needs are picked by reservoir sampling in one pass
+and only those are checked.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import random
+import struct
+from constants import ASSETS_PATH, STREAM_DECK_BYTES
+
+MANIFEST_SUFFIX = ".manifest.json"
+MANIFEST_VERSION = 3  # Version 2 lists every face once, version 3 reads every PNM kind
+
+PNM_KINDS = (b"P2", b"P3", b"P5", b"P6")  # Plain and binary PGM and PPM
+IMAGE_HEADER_BYTES = 512  # Enough for the size, after any comments a PNM header has
+
+# Files picked up from a deck folder
+IMAGE_SUFFIXES = (".gif", ".png", ".ppm", ".pgm", ".pnm")
+
+
+class DeckError(Exception):
+    def __init__(self, deck_file, errors):
+        """Raised when a deck has one or more problems.
+
+        Args:
+            deck_file (str): The deck file name.
+            errors (list): Every problem found, as messages.
+        """
+        super().__init__(f"{deck_file}: " + "; ".join(errors))
+        self.deck_file = deck_file
+        self.errors = errors
+
+
+def image_dimensions(header):
+    """Read the width and height of an image from its first bytes.
+
+    Supports GIF and PNG headers, and the plain and binary PPM and PGM
+    headers the image cache can decode, comments included.
+
+    Args:
+        header (bytes): At least the first IMAGE_HEADER_BYTES of the image file.
+
+    Returns:
+        tuple: (width, height), or (0, 0) if the format is not recognised.
+    """
+    if header[:3] == b"GIF" and len(header) >= 10:
+        return struct.unpack("<HH", header[6:10])
+    if header[:8] == b"\x89PNG\r\n\x1a\n" and len(header) >= 24:
+        return struct.unpack(">II", header[16:24])
+    if header[:2] in PNM_KINDS:
+        fields = []
+        lines = header[2:].splitlines()
+        for line in lines[:-1] if len(lines) > 1 else lines:  # The last line may be cut short
+            fields += line.split(b"#", 1)[0].split()
+            if len(fields) >= 2:
+                break
+        if len(fields) >= 2 and fields[0].isdigit() and fields[1].isdigit():
+            return int(fields[0]), int(fields[1])
+    return (0, 0)
+
+
+def describe_image(path, stat=None):
+    """Build the manifest entry for one image file.
+
+    Args:
+        path (str): The absolute path to the image.
+        stat (os.stat_result): The file's stat, if already known.
+
+    Returns:
+        dict: Size, mtime, sha1 hash, width and height of the image.
+    """
+    if stat is None:
+        stat = os.stat(path)
+    with open(path, "rb") as file:
+        data = file.read()
+    width, height = image_dimensions(data[:IMAGE_HEADER_BYTES])
+    return {
+        "path": path,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha1": hashlib.sha1(data).hexdigest(),
+        "width": width,
+        "height": height,
+    }
+
+
+class DeckManifest:
+    def __init__(self, deck_file, deck_mtime=0, entries=None, errors=None):
+        """Initialize a manifest.
+
+        Args:
+            deck_file (str): The deck file name in the assets folder.
+            deck_mtime (int): The deck file's modification time in ns.
+            entries (list): One dict per card face, in deck order.
+            errors (list): Problems found while compiling or checking the deck.
+        """
+        self.deck_file = deck_file
+        self.deck_mtime = deck_mtime
+        self.entries = entries or []
+        self.errors = errors or []
+
+    @property
+    def faces(self):
+        """The card face names, in deck order."""
+        return [entry["name"] for entry in self.entries]
+
+    @property
+    def paths(self):
+        """The absolute paths of the card images, in deck order."""
+        return [entry["path"] for entry in self.entries]
+
+    @property
+    def manifest_id(self):
+        """A short hash identifying this exact deck contents."""
+        digest = hashlib.sha1()
+        for entry in self.entries:
+            digest.update(f"{entry['name']}:{entry['sha1']};".encode())
+        return digest.hexdigest()[:16]
+
+    def require_faces(self, count):
+        """Add an error if the deck has fewer than count usable faces.
+
+        Args:
+            count (int): The fewest faces a board can be dealt from.
+
+        Returns:
+            DeckManifest: This manifest, so the check can be chained.
+        """
+        if not self.errors and len(self.entries) < count:
+            self.errors.append(f"{self.deck_file} has {len(self.entries)} usable faces, "
+                               f"at least {count} are needed")
+        return self
+
+    def to_json(self):
+        """Return the manifest as a JSON-serialisable dict."""
+        return {
+            "version": MANIFEST_VERSION,
+            "deck": self.deck_file,
+            "deck_mtime": self.deck_mtime,
+            "entries": self.entries,
+        }
+
+
+class SampledDeck(DeckManifest):
+    def __init__(self, deck_file, entries=None, errors=None, total=0, skipped=None):
+        """Initialize the faces sampled from a streamed deck for one board.
+
+        Its manifest id covers only the sampled faces, so a replay can
+        check it by sampling the deck again with the same seed.
+
+        Args:
+            deck_file (str): The deck file or folder name in the assets folder.
+            entries (list): One dict per sampled face, in sampling order.
+            errors (list): Problems that stop the deck being used.
+            total (int): The number of faces the deck lists.
+            skipped (list): Problems with sampled faces that were passed over.
+        """
+        super().__init__(deck_file, 0, entries, errors)
+        self.total = total
+        self.skipped = skipped or []
+
+
+def manifest_path(deck_path):
+    """Return where the manifest for a deck file is stored.
+
+    Args:
+        deck_path (str): The path to the deck file.
+
+    Returns:
+        str: The manifest path, next to the deck file.
+    """
+    return deck_path + MANIFEST_SUFFIX
+
+
+def compile_deck(deck_file, assets_path=ASSETS_PATH, previous=None):
+    """Read a deck file and describe every image it lists.
+
+    Every problem is collected instead of stopping at the first one.
+    Images whose size and mtime match the previous manifest reuse its entry
+    instead of being read and hashed again. A face listed more than once is
+    only kept once, since every face makes exactly one pair.
+
+    Args:
+        deck_file (str): The deck file name in the assets folder.
+        assets_path (str): The folder holding the deck and its images.
+        previous (DeckManifest): An older manifest to reuse entries from.
+
+    Returns:
+        DeckManifest: The compiled manifest. Check its errors list.
+    """
+    deck_path = os.path.join(assets_path, deck_file)
+    try:
+        deck_mtime = os.stat(deck_path).st_mtime_ns
+        with open(deck_path, "r") as file:
+            names = [line.strip() for line in file if line.strip()]
+    except OSError as e:
+        return DeckManifest(deck_file, errors=[f"Could not read deck file {deck_file}: {e}"])
+
+    known = {entry["name"]: entry for entry in previous.entries} if previous else {}
+    entries = []
+    errors = []
+    if not names:
+        errors.append(f"Deck file {deck_file} lists no card images")
+    listed = set()
+    for name in names:
+        if name in listed:
+            print(f"Deck file {deck_file} lists {name} more than once, using it once")
+            continue
+        listed.add(name)
+        entry = revalidate_entry(name, os.path.abspath(os.path.join(assets_path, name)),
+                                 known.get(name), errors)
+        if entry is not None:
+            entries.append(entry)
+    return DeckManifest(deck_file, deck_mtime, entries, errors)
+
+
+def revalidate_entry(name, path, entry, errors):
+    """Check one image, re-reading it only if it changed.
+
+    Args:
+        name (str): The face name from the deck file.
+        path (str): The absolute path to the image.
+        entry (dict): The image's previous manifest entry, or None.
+        errors (list): Problems are appended here.
+
+    Returns:
+        dict: The up-to-date entry, or None if the image is missing.
+    """
+    try:
+        stat = os.stat(path)
+        if (entry is not None and entry["path"] == path and entry["size"] == stat.st_size
+                and entry["mtime"] == stat.st_mtime_ns):
+            return entry
+        entry = describe_image(path, stat)
+        entry["name"] = name
+        if entry["width"] == 0:
+            errors.append(f"Card image {name} is not a supported image")
+        return entry
+    except OSError:
+        errors.append(f"Could not find card image {name}")
+        return None
+
+
+def load_manifest(deck_file, assets_path=ASSETS_PATH):
+    """Return an up-to-date manifest for a deck, using the cache when possible.
+
+    If the deck file itself is unchanged, only the images in the cached
+    manifest are stat'ed, and only images whose mtime changed are read
+    again. The manifest is saved back if anything changed.
+
+    Args:
+        deck_file (str): The deck file name in the assets folder.
+        assets_path (str): The folder holding the deck and its images.
+
+    Returns:
+        DeckManifest: The manifest. Check its errors list.
+    """
+    deck_path = os.path.join(assets_path, deck_file)
+    cached = read_manifest(deck_path)
+    try:
+        deck_mtime = os.stat(deck_path).st_mtime_ns
+    except OSError as e:
+        return DeckManifest(deck_file, errors=[f"Could not find deck file {deck_file}: {e}"])
+
+    if cached is not None and cached.deck_mtime == deck_mtime:
+        errors = []
+        entries = []
+        changed = False
+        for old in cached.entries:
+            entry = revalidate_entry(old["name"], old["path"], old, errors)
+            if entry is not None:
+                entries.append(entry)
+            changed = changed or entry is not old
+        manifest = DeckManifest(deck_file, deck_mtime, entries, errors)
+    else:
+        manifest = compile_deck(deck_file, assets_path, cached)
+        changed = True
+
+    if changed and not manifest.errors:
+        write_manifest(deck_path, manifest)
+    return manifest
+
+
+def read_manifest(deck_path):
+    """Read a cached manifest, ignoring missing or outdated files.
+
+    Args:
+        deck_path (str): The path to the deck file.
+
+    Returns:
+        DeckManifest: The cached manifest, or None.
+    """
+    try:
+        with open(manifest_path(deck_path), "r") as file:
+            data = json.load(file)
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return DeckManifest(data["deck"], data["deck_mtime"], data["entries"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_manifest(deck_path, manifest):
+    """Save a manifest next to its deck file atomically.
+
+    Failing to save is not an error; the deck is just compiled again next time.
+
+    Args:
+        deck_path (str): The path to the deck file.
+        manifest (DeckManifest): The manifest to save.
+
+    Returns:
+        None
+    """
+    path = manifest_path(deck_path)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as file:
+            json.dump(manifest.to_json(), file)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Could not save deck manifest {path}: {e}")
+
+
+def is_streamed_deck(deck_file, assets_path=ASSETS_PATH):
+    """Check if a deck is too big to compile a manifest for every board.
+
+    Args:
+        deck_file (str): The deck file or folder name in the assets folder.
+        assets_path (str): The folder holding the deck.
+
+    Returns:
+        bool: True for a folder of images or a deck file over STREAM_DECK_BYTES.
+    """
+    deck_path = os.path.join(assets_path, deck_file)
+    try:
+        return os.path.isdir(deck_path) or os.path.getsize(deck_path) > STREAM_DECK_BYTES
+    except OSError:
+        return False
+
+
+def iter_deck(deck_file, assets_path=ASSETS_PATH):
+    """Yield the faces of a deck file or folder as they are read.
+
+    Face names from a folder include the folder, so they are relative to
+    the assets folder like the names in a deck file.
+
+    Args:
+        deck_file (str): The deck file or folder name in the assets folder.
+        assets_path (str): The folder holding the deck and its images.
+
+    Yields:
+        str: Each face name.
+
+    Raises:
+        OSError: If the deck cannot be read.
+    """
+    deck_path = os.path.join(assets_path, deck_file)
+    if os.path.isdir(deck_path):
+        prefix = os.path.join(deck_file, "")
+        with os.scandir(deck_path) as entries:
+            for entry in entries:
+                if (entry.name.lower().endswith(IMAGE_SUFFIXES) and not entry.name.startswith(".")
+                        and entry.is_file()):
+                    yield prefix + entry.name
+        return
+    with open(deck_path, "r") as file:
+        for line in file:
+            name = line.strip()
+            if name:
+                yield name
+
+
+def sample_deck(deck_file, count, seed=None, assets_path=ASSETS_PATH):
+    """Pick the faces for one board from a huge deck, in one pass over it.
+
+    Every face gets a priority from a hash of its name keyed by the seed,
+    and the faces with the lowest priorities are kept in a heap as the
+    deck streams past. That is a uniform sample, like random.sample, and
+    it does not depend on the order a folder is listed in, so the same
+    seed always picks the same faces. A few spare faces are kept, and
+    only the sampled faces are checked, in priority order, until count
+    of them are usable.
+
+    Args:
+        deck_file (str): The deck file or folder name in the assets folder.
+        count (int): The number of faces to pick.
+        seed (int): The board's seed. Defaults to a random one.
+        assets_path (str): The folder holding the deck and its images.
+
+    Returns:
+        SampledDeck: Up to count usable faces. Check its errors list.
+    """
+    if seed is None:
+        seed = random.getrandbits(63)
+    key = (seed % (1 << 64)).to_bytes(8, "little")
+    keep = count + max(4, count // 8)  # Spares in case some sampled images are unusable
+    heap = []  # (-priority, name) of the lowest priorities seen so far
+    kept = set()  # Names in the heap, so a repeated name is not kept twice
+    total = 0
+    try:
+        for name in iter_deck(deck_file, assets_path):
+            total += 1
+            if name in kept:
+                continue
+            digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8, key=key).digest()
+            priority = int.from_bytes(digest, "big")
+            if len(heap) < keep:
+                heapq.heappush(heap, (-priority, name))
+                kept.add(name)
+            elif priority < -heap[0][0]:
+                dropped = heapq.heappushpop(heap, (-priority, name))
+                kept.discard(dropped[1])
+                kept.add(name)
+    except OSError as e:
+        return SampledDeck(deck_file, errors=[f"Could not read deck {deck_file}: {e}"])
+
+    entries = []
+    skipped = []
+    for _, name in sorted(heap, reverse=True):
+        if len(entries) == count:
+            break
+        problems = []
+        path = os.path.abspath(os.path.join(assets_path, name))
+        entry = revalidate_entry(name, path, None, problems)
+        if entry is None or problems:
+            skipped.extend(problems)
+        else:
+            entries.append(entry)
+    errors = [] if entries else [f"Deck {deck_file} has no usable card images"]
+    return SampledDeck(deck_file, entries, errors, total, skipped)
@@ -0,0 +1,369 @@
+"""
+Sydney Umezurike
+flip_animation.py
+CS 5001 - Memory Game
+Card flip animation.
+A flip shows the card narrowing until it is edge on,
+then the other side widening again. The narrowed
+images for every face and the card back are made once,
+by content hash, into the image cache, so a flip only
+switches between shapes that are already registered.
+The frames run on one game clock timer with a time
+budget per frame; flips that fall behind skip frames
+instead of holding up input.
+
+Usage:
+    python src/flip_animation.py build default_deck.txt custom_deck.txt
+    python src/flip_animation.py prune default_deck.txt custom_deck.txt
+"""
+
+import argparse
+import math
+import os
+import time
+from deck_manifest import describe_image, load_manifest
+from image_cache import (CACHE_SUFFIXES, CACHE_VERSION, ImageError, decode_image, run_jobs,
+                         fit_image, save_image, scale_image)
+from instrumentation import Histogram
+from constants import (CARD_WIDTH, CARD_HEIGHT, BG_COLOR, ASSETS_PATH, CARD_BACK,
+                       FLIP_CACHE_PATH, FLIP_FRAMES, FLIP_DURATION_MS, FLIP_FRAME_BUDGET_MS)
+
+
+def flip_widths(width=CARD_WIDTH, frames=FLIP_FRAMES):
+    """Return the widths of a card turning edge on, widest first.
+
+    Args:
+        width (int): The card width.
+        frames (int): The number of narrowed images per side.
+
+    Returns:
+        list: The frame widths in pixels, never less than 2.
+    """
+    return [max(2, round(width * math.cos(math.pi / 2 * i / (frames + 1))))
+            for i in range(1, frames + 1)]
+
+
+def convert_frames(source, targets, widths, width, height, matte=None):
+    """Decode an image once and save it narrowed to every frame width.
+
+    Runs in a worker process, so errors are returned instead of raised.
+
+    Args:
+        source (str): The image to convert.
+        targets (list): The cached path of each frame, without a suffix.
+        widths (list): The width of each frame.
+        width (int): The card width.
+        height (int): The card height.
+        matte (str): A color to flatten transparency onto, or None to keep it.
+
+    Returns:
+        tuple: (list of frame paths, None), or (None, error message).
+    """
+    try:
+        with open(source, "rb") as file:
+            card = fit_image(decode_image(file.read()), width, height)
+        return [save_image(scale_image(card, frame_width, height), target, matte)
+                for target, frame_width in zip(targets, widths)], None
+    except (OSError, ImageError) as e:
+        return None, f"{os.path.basename(source)}: {e}"
+
+
+class FlipFrames:
+    def __init__(self, folder=FLIP_CACHE_PATH, frames=FLIP_FRAMES, width=CARD_WIDTH,
+                 height=CARD_HEIGHT, matte=BG_COLOR, workers=None):
+        """Initialize a cache of narrowed card images.
+
+        Args:
+            folder (str): Where the frames are saved.
+            frames (int): Narrowed images per side of the card.
+            width (int): The card width.
+            height (int): The card height.
+            matte (str): The color transparency is flattened onto.
+            workers (int): Processes to convert with. Defaults to one per CPU.
+        """
+        self.folder = folder
+        self.widths = flip_widths(width, frames)
+        self.width = width
+        self.height = height
+        self.matte = matte
+        self.workers = workers
+        self.files = {}  # Image path -> frame files, widest first
+        self.failed = set()  # Image paths that could not be converted
+        self.built = 0  # Images converted by the last build
+        self.reused = 0  # Images the last build found already converted
+        self.errors = []  # Problems from the last build
+
+    def targets(self, sha1):
+        """Return the cached path of every frame for a content hash, without suffixes."""
+        background = self.matte.lstrip("#").lower() if self.matte else "alpha"
+        return [os.path.join(self.folder, f"{sha1}_{frame_width}of{self.width}x{self.height}"
+                                          f"_{background}_v{CACHE_VERSION}")
+                for frame_width in self.widths]
+
+    def lookup(self, sha1):
+        """Return the frame files for a content hash, or None unless all were built."""
+        files = []
+        for target in self.targets(sha1):
+            for suffix in CACHE_SUFFIXES:
+                if os.path.exists(target + suffix):
+                    files.append(target + suffix)
+                    break
+            else:
+                return None
+        return files
+
+    def build(self, paths):
+        """Make sure every image has its frames, converting only new ones.
+
+        Images are hashed to find their frames, so this is meant for the few
+        faces of one board, not a whole large deck.
+
+        Args:
+            paths (iterable): Image paths, such as a board's faces and the card back.
+
+        Returns:
+            dict: Image path -> frame files, for every image that has them.
+        """
+        self.built = self.reused = 0
+        self.errors = []
+        missing = {}  # sha1 -> an image path with that content
+        waiting = []  # (path, sha1) of images to convert
+        for path in paths:
+            if path in self.files or path in self.failed:
+                continue
+            try:
+                sha1 = describe_image(path)["sha1"]
+            except OSError as e:
+                self.failed.add(path)
+                self.errors.append(f"{os.path.basename(path)}: {e.strerror or e}")
+                continue
+            files = self.lookup(sha1)
+            if files is None:
+                missing.setdefault(sha1, path)
+                waiting.append((path, sha1))
+            else:
+                self.files[path] = files
+                self.reused += 1
+        if not missing:
+            return self.files
+
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+        except OSError as e:
+            self.errors.append(f"Could not create flip frame cache {self.folder}: {e}")
+            return self.files
+        jobs = [(path, self.targets(sha1), self.widths, self.width, self.height, self.matte)
+                for sha1, path in missing.items()]
+        converted = {}
+        for (sha1, _), (files, error) in zip(missing.items(),
+                                             run_jobs(convert_frames, jobs, self.workers)):
+            if files is None:
+                self.errors.append(error)
+            else:
+                converted[sha1] = files
+                self.built += 1
+        for path, sha1 in waiting:
+            if sha1 in converted:
+                self.files[path] = converted[sha1]
+            else:
+                self.failed.add(path)
+        return self.files
+
+    def prune(self, keep):
+        """Delete frames of images that no longer belong to any deck.
+
+        Args:
+            keep (iterable): Content hashes to keep.
+
+        Returns:
+            int: The number of files deleted.
+        """
+        keep = {os.path.basename(target) for sha1 in keep for target in self.targets(sha1)}
+        removed = 0
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            return 0
+        for entry in entries:
+            name, suffix = os.path.splitext(entry.name)
+            if suffix in CACHE_SUFFIXES and name not in keep:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+class FlipAnimator:
+    def __init__(self, clock, renderer, assets, frames, duration=FLIP_DURATION_MS,
+                 budget=FLIP_FRAME_BUDGET_MS):
+        """Initialize the animator on the game clock.
+
+        Args:
+            clock (GameClock): The clock the frames run on.
+            renderer (Renderer): The renderer whose sprites are flipped.
+            assets (AssetCache): Registers the frame shapes.
+            frames (FlipFrames): Where the frame files come from.
+            duration (float): How long a flip takes, in milliseconds. 0 turns it off.
+            budget (float): The most milliseconds one frame may spend on flips.
+        """
+        self.clock = clock
+        self.renderer = renderer
+        self.assets = assets
+        self.frames = frames
+        self.duration = duration
+        self.budget = budget
+        self.flips = {}  # Sprite -> [start time, frame shapes, frame shown]
+        self.shapes = {}  # Image path -> frame shape names, widest first
+        self.timer = None  # The clock timer for the next frame
+        self.frame_times = Histogram("us")  # Time each frame spent on flips
+        self.flipped = 0  # Flips animated
+        self.instant = 0  # Flips that had no frames, so the shape was just swapped
+        self.drawn = 0  # Frames drawn
+        self.dropped = 0  # Frames skipped because a flip was behind
+        self.deferred = 0  # Flips left for the next frame once the budget was used up
+
+    def prepare(self, path):
+        """Register an image's frames, so flipping it costs no decoding.
+
+        Args:
+            path (str): The image path, which is also its shape name.
+
+        Returns:
+            list: The frame shape names, widest first, or None if it has no frames.
+        """
+        names = self.shapes.get(path)
+        if names is None:
+            files = self.frames.files.get(path)
+            if files is None:
+                return None
+            names = [f"{path}#flip{width}" for width in self.frames.widths]
+            self.assets.add_sources(dict(zip(names, files)))
+            self.shapes[path] = names
+        try:
+            for name in names:
+                self.assets.register(name)  # A cache hit once registered
+        except Exception as e:
+            print(f"Could not load flip frames for {os.path.basename(path)}: {e}")
+            del self.shapes[path]
+            self.frames.files.pop(path, None)
+            self.frames.failed.add(path)
+            return None
+        return names
+
+    def flip(self, sprite, old, new):
+        """Turn a sprite over from one image to another.
+
+        The first frame is shown straight away. If either image has no
+        frames, the sprite just shows the new image.
+
+        Args:
+            sprite: The sprite to turn over.
+            old (str): The shape it is showing now.
+            new (str): The shape it ends up showing.
+
+        Returns:
+            None
+        """
+        old_frames = self.prepare(old) if self.duration > 0 else None
+        new_frames = self.prepare(new) if old_frames else None
+        if not new_frames:
+            self.flips.pop(sprite, None)
+            self.renderer.set_shape(sprite, new)
+            self.instant += 1
+            return
+        shapes = old_frames + new_frames[::-1] + [new]
+        self.flips[sprite] = [self.clock.now(), shapes, 0]
+        self.renderer.set_shape(sprite, shapes[0])
+        self.flipped += 1
+        self.drawn += 1
+        if self.timer is None or self.timer.generation != self.clock.generation:
+            self.timer = self.clock.schedule(self.clock.frame_ms, self.frame)
+
+    def frame(self):
+        """Move every flip on to the frame its elapsed time calls for.
+
+        A flip that is behind jumps straight to its current frame. Once this
+        frame has used its budget, the other flips wait for the next frame,
+        and the ones done in this frame go to the back of the line.
+
+        Returns:
+            None
+        """
+        self.timer = None
+        start = time.perf_counter()
+        deadline = start + self.budget / 1000
+        now = self.clock.now()
+        for sprite, flip in list(self.flips.items()):
+            if time.perf_counter() > deadline:
+                self.deferred += 1
+                continue
+            started, shapes, shown = flip
+            last = len(shapes) - 1
+            step = min(last, int((now - started) * len(shapes) / self.duration))
+            if step > shown:
+                self.dropped += step - shown - 1
+                self.renderer.set_shape(sprite, shapes[step])
+                flip[2] = step
+                self.drawn += 1
+            del self.flips[sprite]
+            if step < last:
+                self.flips[sprite] = flip
+        self.frame_times.record((time.perf_counter() - start) * 1e6)
+        self.clock.request_update()
+        if self.flips:
+            self.timer = self.clock.schedule(self.clock.frame_ms, self.frame)
+
+    def clear(self):
+        """Stop every flip, such as when the sprites are pointed at other cards.
+
+        Returns:
+            None
+        """
+        self.flips = {}
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def stats(self):
+        """Return the flip and frame counts and the frame time summary as a dict."""
+        return {
+            "flipped": self.flipped,
+            "instant": self.instant,
+            "drawn": self.drawn,
+            "dropped": self.dropped,
+            "deferred": self.deferred,
+            "frame_us": self.frame_times.summary(),
+        }
+
+
+def main():
+    """Build or prune the flip frames for some decks."""
+    parser = argparse.ArgumentParser(description="Memory Game flip frames")
+    parser.add_argument("command", choices=["build", "prune"])
+    parser.add_argument("decks", nargs="+", help="deck files in the assets folder")
+    parser.add_argument("--workers", type=int, default=None, help="processes to convert with")
+    args = parser.parse_args()
+
+    frames = FlipFrames(workers=args.workers)
+    card_back = os.path.join(ASSETS_PATH, CARD_BACK)
+    manifests = [load_manifest(deck) for deck in args.decks]
+    for manifest in manifests:
+        for error in manifest.errors:
+            print(f"{manifest.deck_file}: {error}")
+    if args.command == "prune":
+        keep = {entry["sha1"] for manifest in manifests for entry in manifest.entries}
+        keep.add(describe_image(card_back)["sha1"])
+        print(f"removed {frames.prune(keep)} flip frames")
+        return
+
+    for manifest in manifests:
+        start = time.perf_counter()
+        frames.build([card_back] + manifest.paths)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{manifest.deck_file}: {frames.built} converted, {frames.reused} cached "
+              f"in {elapsed:.1f} ms")
+        for error in frames.errors:
+            print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,18 @@ This file handles the core game mechanics
 for the Memory Game, including card behavior 
 and game logic like creating and shuffling 
 the deck, and checking for matches.
+The board itself is stored compactly in board.py.
 """
 
 import random
-import turtle
 import os
+from array import array
+from board import Board, Bitset
 from constants import ASSETS_PATH
 
 class Card:
+    __slots__ = ("image", "face_up", "matched")
+
     def __init__(self, image):
         '''Initializes the card with a given image.
         
@@ -47,11 +51,13 @@ class Card:
         return self.image == other_card.image
 
 class MemoryGameLogic:
-    def __init__(self, card_images=None):
+    def __init__(self, card_images=None, rng=random):
         '''Initializes the game logic with the provided card images or the default deck.
         
         Args:
             card_images (list): List of image paths for the cards. Defaults to None, if the default deck is used.
+            rng (random.Random): The random generator to shuffle with, so a seeded
+                generator always deals the same board.
         
         Returns:
             None
@@ -59,21 +65,76 @@ class MemoryGameLogic:
         if card_images is None:
             card_images = self.get_default_deck()  # Use the default deck if no custom images are provided
         self.card_images = card_images
-        self.cards = self.create_deck()
+        self.board = self.create_deck(rng)
+        self.reset_state()
+
+    def reset_state(self):
+        '''Builds the incremental counters for the current board.
+        
+        The counters are kept up to date by reveal and check_indices, so
+        win checks and state queries never have to walk the whole board.
+        They are indexed by face id and stored in arrays, like the board.
+        
+        Returns:
+            None
+        '''
+        face_count = len(self.board.table)
+        self.positions = array("i", [-1]) * (2 * face_count)  # Face id -> its two card positions
+        for index, face_id in enumerate(self.board.face_ids):
+            slot = 2 * face_id
+            self.positions[slot if self.positions[slot] < 0 else slot + 1] = index
+        self.remaining_pairs = (len(self.board) - self.board.matched.count) // 2
+        self.seen = Bitset(len(self.board))  # Cards that have been face up at least once
+        self.seen_counts = bytearray(face_count)  # Face id -> seen cards of it not yet matched
+        self.seen_face_count = 0  # Faces with at least one seen, unmatched card
+        self.known_faces = set()  # Unmatched face ids whose two cards have both been seen
+
+    @classmethod
+    def from_board(cls, board):
+        '''Creates the game logic for a board that is already dealt, such as a saved one.
+        
+        Matched cards on the board stay matched. Nothing counts as seen yet.
+        
+        Args:
+            board (Board): The board to play.
+        
+        Returns:
+            MemoryGameLogic: The game logic for that board.
+        '''
+        logic = cls.__new__(cls)
+        logic.card_images = board.table.images
+        logic.board = board
+        logic.reset_state()
+        return logic
 
-    def create_deck(self):
-        '''Creates the deck of cards based on the images.
+    def create_deck(self, rng=random):
+        '''Creates the board of card pairs based on the images.
+        
+        Args:
+            rng (random.Random): The random generator to shuffle with.
         
         Returns:
-            list: A shuffled deck of cards.
+            Board: A shuffled board with two cards of every image.
         '''
-        deck = []
-        # Duplicate each image for matching pairs
-        for image in self.card_images:
-            deck.append(Card(image))
-            deck.append(Card(image))
-        random.shuffle(deck)  # Shuffle the deck
-        return deck
+        return Board.shuffled(self.card_images, rng)
+
+    @property
+    def cards(self):
+        '''Card objects for the board, built on demand.
+        
+        The board itself keeps no Card objects, so these are copies and
+        changing them does not change the game.
+        
+        Returns:
+            list: One Card per board position.
+        '''
+        cards = []
+        for index in range(len(self.board)):
+            card = Card(self.board.image(index))
+            card.face_up = bool(self.board.face_up[index])
+            card.matched = bool(self.board.matched[index])
+            cards.append(card)
+        return cards
 
     def get_default_deck(self):
         '''Returns a list of image paths from the default deck configuration file.
@@ -91,11 +152,57 @@ class MemoryGameLogic:
             with open(default_deck_path, "r") as file:
                 return file.read().splitlines()  # Read all the lines and return them as a list
         except Exception as e:
-            turtle.write(f"Error loading default deck: {e}", align="center", font=("Arial", 16, "bold"))
+            print(f"Error loading default deck: {e}")
             return []  # If default deck can't be loaded, return an empty list
 
+    def face_at(self, index):
+        '''Returns the image of the card at a position.
+        
+        Args:
+            index (int): The card position.
+        
+        Returns:
+            str: The card's image.
+        '''
+        return self.board.image(index)
+
+    def reveal(self, index):
+        '''Turns a card face up and remembers that it has been seen.
+        
+        Args:
+            index (int): The card position.
+        
+        Returns:
+            str: The revealed card's image.
+        '''
+        board = self.board
+        board.face_up.set(index)
+        if not board.matched[index] and self.seen.set(index):
+            face_id = board.face_ids[index]
+            count = self.seen_counts[face_id] + 1
+            self.seen_counts[face_id] = count
+            if count == 1:
+                self.seen_face_count += 1
+            elif count == 2:
+                self.known_faces.add(face_id)
+        return board.image(index)
+
+    def hide(self, index):
+        '''Turns a card face down again.
+        
+        Args:
+            index (int): The card position.
+        
+        Returns:
+            None
+        '''
+        self.board.face_up.clear(index)
+
     def check_for_match(self, card1, card2):
-        '''Checks if two cards match.
+        '''Checks if two Card objects match, marking them matched if they do.
+        
+        This works on standalone cards. Cards on the board are checked by
+        position with check_indices, which also keeps the counters.
         
         Args:
             card1 (Card): The first card to compare.
@@ -104,15 +211,102 @@ class MemoryGameLogic:
         Returns:
             bool: True if the cards match, False otherwise.
         '''
+        if card1 is card2 or card1.matched or card2.matched:
+            return False
         if card1.match(card2):
             card1.matched = card2.matched = True  # Mark both cards as matched
             return True
         return False
 
+    def check_indices(self, index1, index2):
+        '''Checks if the cards at two positions match.
+        
+        A match is an integer compare of the two face ids and updates the
+        counters in constant time.
+        
+        Args:
+            index1 (int): The first card position.
+            index2 (int): The second card position.
+        
+        Returns:
+            bool: True if the cards match, False otherwise.
+        '''
+        board = self.board
+        if index1 == index2 or board.matched[index1] or board.matched[index2]:
+            return False
+        if not board.same_face(index1, index2):
+            return False
+        board.matched.set(index1)  # Mark both cards as matched
+        board.matched.set(index2)
+        self.remaining_pairs -= 1
+        face_id = board.face_ids[index1]
+        if self.seen_counts[face_id]:
+            self.seen_counts[face_id] = 0
+            self.seen_face_count -= 1
+        self.known_faces.discard(face_id)
+        return True
+
     def check_all_matched(self):
         '''Checks if all cards have been matched.
         
         Returns:
             bool: True if all cards are matched, False otherwise.
         '''
-        return all(card.matched for card in self.cards)
+        return self.remaining_pairs == 0
+
+    def matched_pairs(self):
+        '''Returns how many pairs have been matched.
+        
+        Returns:
+            int: The number of matched pairs.
+        '''
+        return len(self.board) // 2 - self.remaining_pairs
+
+    def is_matched(self, index):
+        '''Checks if the card at a position has been matched.
+        
+        Args:
+            index (int): The card position.
+        
+        Returns:
+            bool: True if the card is matched.
+        '''
+        return bool(self.board.matched[index])
+
+    def pair_positions(self, face_id):
+        '''Returns the positions of the two cards showing a face.
+        
+        Args:
+            face_id (int): The face id.
+        
+        Returns:
+            tuple: Two card positions.
+        '''
+        return self.positions[2 * face_id], self.positions[2 * face_id + 1]
+
+    def seen_unmatched_faces(self):
+        '''Returns how many different faces have been seen but not matched yet.
+        
+        Returns:
+            int: The number of seen, unmatched faces.
+        '''
+        return self.seen_face_count
+
+    def known_pair(self):
+        '''Returns the positions of a pair whose cards have both been seen.
+        
+        Returns:
+            tuple: Two card positions, or None if no pair is fully known.
+        '''
+        for face_id in self.known_faces:
+            return self.pair_positions(face_id)
+        return None
+
+    def nbytes(self):
+        '''Returns the memory used by the board and its counters, in bytes.
+        
+        Returns:
+            int: The size of the board, position and seen arrays.
+        '''
+        return (self.board.nbytes() + self.positions.itemsize * len(self.positions)
+                + self.seen.nbytes() + len(self.seen_counts))
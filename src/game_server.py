@@ -0,0 +1,445 @@
+"""
+Sydney Umezurike
+game_server.py
+CS 5001 - Memory Game
+Asyncio server that hosts many games from one process.
+Every connection is an independent game session played
+with the MemoryGameLogic rules. Messages are JSON lines,
+flip-back timers run on the event loop instead of a
+turtle screen, and finished games go to the leaderboard.
+
+Usage:
+    python src/game_server.py --port 5001
+    python src/game_server.py --unix /tmp/memory_game.sock
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+from game_logic import MemoryGameLogic
+from deck_manifest import load_manifest, is_streamed_deck, sample_deck
+from layout import BoardLayout, nearest_card_count
+from score_store import ScoreStore
+from solver import ExpectedMovesTable
+from constants import DEFAULT_CARD_COUNT, DEFAULT_DECK, CARD_FLIP_DURATION, MIN_CARD_COUNT
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5001
+
+# Connections waiting to be accepted; high so thousands of clients can connect at once
+LISTEN_BACKLOG = 4096
+
+# Longest message a client may send, in bytes
+MAX_MESSAGE = 4096
+
+# Results of a flip message
+FIRST = "first"
+MATCH = "match"
+MISS = "miss"
+IGNORED = "ignored"
+
+# Stands in for the faces of a huge deck, which is sampled for every game
+STREAMED = "streamed"
+
+
+def is_number(value):
+    """Check if a JSON value is a number; true and false are not."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class GameSession:
+    def __init__(self, server, writer):
+        """Initialize a session for one connection, with no game started yet.
+
+        Args:
+            server (GameServer): The server the session belongs to.
+            writer (asyncio.StreamWriter): Where messages to the client go.
+        """
+        self.server = server
+        self.writer = writer
+        self.player_name = ""
+        self.deck = DEFAULT_DECK
+        self.card_count = 0
+        self.seed = None  # Seed the current board was shuffled with
+        self.logic = None
+        self.hit_index = None
+        self.selected_cards = []
+        self.guesses = 0
+        self.matches = 0
+        self.timer = None  # Pending flip-back or remove timer
+
+    def send(self, message):
+        """Send one message to the client.
+
+        Args:
+            message (dict): The message.
+
+        Returns:
+            None
+        """
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+    async def handle(self, message):
+        """Handle one message from the client.
+
+        Args:
+            message (dict): The decoded message.
+
+        Returns:
+            bool: False if the client asked to quit.
+        """
+        kind = message.get("type")
+        if kind == "new":
+            await self.new_game(message.get("name", ""), message.get("cards", DEFAULT_CARD_COUNT),
+                                message.get("deck", DEFAULT_DECK), message.get("seed"))
+        elif kind == "flip":
+            self.flip(message.get("index"))
+        elif kind == "click":
+            self.click(message.get("x"), message.get("y"))
+        elif kind == "quit":
+            return False
+        else:
+            self.send({"type": "error", "message": f"Unknown message type {kind!r}"})
+        return True
+
+    async def new_game(self, name, card_count, deck, seed=None):
+        """Start a new game, dropping any game in progress.
+
+        The deck is loaded off the event loop, so other sessions keep
+        playing while it loads.
+
+        Args:
+            name (str): The player's name.
+            card_count (int): The number of cards, rounded to a count the deck can deal.
+            deck (str): The deck file name in the assets folder.
+            seed (int): The seed to shuffle with, to deal a board again. Defaults to a new one.
+
+        Returns:
+            None
+        """
+        try:
+            card_count = int(card_count)
+        except (TypeError, ValueError):
+            card_count = DEFAULT_CARD_COUNT
+        if not isinstance(seed, int) or isinstance(seed, bool) or not 0 <= seed < 2 ** 63:
+            seed = random.getrandbits(63)
+
+        faces = await self.server.deck_faces(deck, nearest_card_count(card_count) // 2, seed)
+        if faces is None:
+            self.send({"type": "error", "message": f"Could not load deck {deck}"})
+            return
+        card_count = nearest_card_count(card_count, 2 * len(faces))
+
+        self.cancel_timer()
+        self.player_name = str(name).strip()[:64]
+        self.deck = deck
+        self.card_count = card_count
+        self.seed = seed
+        # Dealt like MemoryGame.deal_cards, so the same seed gives the same board
+        rng = random.Random(seed)
+        self.logic = MemoryGameLogic(rng.sample(faces, card_count // 2), rng)
+        self.hit_index = BoardLayout(card_count).hit_index()
+        self.selected_cards = []
+        self.guesses = 0
+        self.matches = 0
+        self.send({"type": "board", "cards": card_count, "seed": seed,
+                   "columns": self.hit_index.columns,
+                   "start": [self.hit_index.start_x, self.hit_index.start_y],
+                   "pitch": [self.hit_index.pitch_x, self.hit_index.pitch_y]})
+
+    def click(self, x, y):
+        """Flip the card under a board coordinate, like a click in the game window.
+
+        Args:
+            x (float): The x-coordinate of the click.
+            y (float): The y-coordinate of the click.
+
+        Returns:
+            None
+        """
+        index = None
+        if self.hit_index is not None and is_number(x) and is_number(y):
+            index = self.hit_index.card_at(x, y)
+        self.flip(index)
+
+    def flip(self, index):
+        """Flip a card and check for a match, following MemoryGame.flip_card.
+
+        Args:
+            index (int): The card position.
+
+        Returns:
+            None
+        """
+        if (self.logic is None or not isinstance(index, int) or isinstance(index, bool)
+                or not 0 <= index < self.card_count
+                or len(self.selected_cards) >= 2 or index in self.selected_cards
+                or self.logic.is_matched(index)):
+            self.send({"type": "flip", "index": index, "result": IGNORED})
+            return
+
+        face = self.logic.reveal(index)
+        self.selected_cards.append(index)
+        result = FIRST
+        if len(self.selected_cards) == 2:
+            self.guesses += 1
+            if self.logic.check_indices(*self.selected_cards):
+                self.matches = self.logic.matched_pairs()
+                result = MATCH
+            else:
+                result = MISS
+            self.timer = self.server.loop.call_later(
+                self.server.flip_delay, self.end_turn, result == MATCH)
+
+        self.send({"type": "flip", "index": index, "face": face, "result": result,
+                   "guesses": self.guesses, "matches": self.matches})
+
+    def end_turn(self, matched):
+        """Remove matched cards or flip the two cards back, then check for a win.
+
+        Args:
+            matched (bool): True if the two selected cards matched.
+
+        Returns:
+            None
+        """
+        self.timer = None
+        indices = self.selected_cards
+        self.selected_cards = []
+        if not matched:
+            for index in indices:
+                self.logic.hide(index)
+        self.send({"type": "remove" if matched else "hide", "indices": indices})
+        if matched and self.logic.check_all_matched():
+            self.server.submit(self, self.player_name, self.guesses, self.deck, self.card_count)
+            self.logic = None
+
+    def cancel_timer(self):
+        """Cancel the pending flip-back timer, if any.
+
+        Returns:
+            None
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
+class GameServer:
+    def __init__(self, flip_delay=CARD_FLIP_DURATION, db_path=None):
+        """Initialize the server.
+
+        Args:
+            flip_delay (float): Seconds cards stay up after a guess.
+            db_path (str): The leaderboard database. Defaults to the game's own.
+        """
+        self.flip_delay = flip_delay
+        self.db_path = db_path
+        self.loop = None
+        self.sessions = set()
+        self.decks = {}  # Deck file -> future of its face names or STREAMED, while loading or loaded
+        self.saves = set()  # Leaderboard submissions still running
+        self.games_finished = 0
+        # SQLite connections belong to one thread, so every write goes through this one
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._store = None
+        self.expected_moves = ExpectedMovesTable()
+
+    async def deck_faces(self, deck, pairs, seed=None):
+        """Return the face names of a deck, loading it the first time.
+
+        Compiling a manifest and sampling a deck read files, so they run in
+        an executor thread instead of stalling every session. Sessions that
+        ask for a deck while it loads share the one load. A load that fails
+        is not kept, so the deck is loaded again once it has been fixed.
+        Huge decks are sampled for every game instead, checking only the
+        faces that game needs.
+
+        Args:
+            deck (str): The deck file or folder name in the assets folder.
+            pairs (int): The number of pairs the game needs.
+            seed (int): The board's seed, which picks the faces of a huge deck.
+
+        Returns:
+            list: The face names, or None if the deck has errors.
+        """
+        deck = os.path.basename(str(deck))  # Only decks in the assets folder
+        loading = self.decks.get(deck)
+        if loading is None:
+            loading = self.decks[deck] = self.loop.run_in_executor(None, self._load_deck, deck)
+        try:
+            # Shielded, so a session that goes away does not cancel the load for the others
+            faces = loading.result() if loading.done() else await asyncio.shield(loading)
+        except Exception as e:
+            print(f"Error loading deck {deck}: {e}")
+            faces = None
+        if faces is None:
+            if self.decks.get(deck) is loading:
+                del self.decks[deck]
+            return None
+        if faces == STREAMED:
+            faces = await self.loop.run_in_executor(None, self._sample_deck, deck, pairs, seed)
+        return faces
+
+    def _load_deck(self, deck):
+        """Compile a deck's manifest from an executor thread."""
+        if is_streamed_deck(deck):
+            return STREAMED
+        manifest = load_manifest(deck).require_faces(MIN_CARD_COUNT // 2)
+        return None if manifest.errors else manifest.faces
+
+    def _sample_deck(self, deck, pairs, seed):
+        """Sample the faces of a huge deck for one game from an executor thread."""
+        sample = sample_deck(deck, pairs, seed).require_faces(MIN_CARD_COUNT // 2)
+        return None if sample.errors else sample.faces
+
+    def submit(self, session, name, moves, deck, card_count):
+        """Save a finished game in the background and tell the player.
+
+        Args:
+            session (GameSession): The session that won.
+            name (str): The player's name.
+            moves (int): The number of moves the game took.
+            deck (str): The deck file the game was played with.
+            card_count (int): The number of cards on the board.
+
+        Returns:
+            None
+        """
+        self.games_finished += 1
+        task = self.loop.create_task(self._submit(session, name, moves, deck, card_count))
+        self.saves.add(task)
+        task.add_done_callback(self.saves.discard)
+
+    async def _submit(self, session, name, moves, deck, card_count):
+        try:
+            result_id = await self.loop.run_in_executor(
+                self.executor, self._save, name, moves, deck, card_count)
+            session.send({"type": "win", "guesses": moves, "result_id": result_id})
+        except Exception as e:
+            print(f"Error saving score: {e}")
+            session.send({"type": "win", "guesses": moves, "result_id": None})
+
+    def _save(self, name, moves, deck, card_count):
+        """Write one result from the executor thread."""
+        if self._store is None:
+            self._store = ScoreStore(self.db_path)
+        efficiency = self.expected_moves.efficiency(moves, card_count)
+        return self._store.add_result(name, moves, deck, card_count, efficiency)
+
+    async def handle_connection(self, reader, writer):
+        """Run one session until the client disconnects or quits.
+
+        Args:
+            reader (asyncio.StreamReader): Messages from the client.
+            writer (asyncio.StreamWriter): Messages to the client.
+
+        Returns:
+            None
+        """
+        session = GameSession(self, writer)
+        self.sessions.add(session)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    session.send({"type": "error", "message": "Messages must be JSON lines"})
+                    continue
+                if not isinstance(message, dict) or not await session.handle(message):
+                    break
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            session.cancel_timer()
+            self.sessions.discard(session)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Start listening on TCP, or on a Unix socket if a path is given.
+
+        Returns:
+            asyncio.Server: The listening server.
+        """
+        self.loop = asyncio.get_running_loop()
+        if unix_path:
+            return await asyncio.start_unix_server(
+                self.handle_connection, unix_path, backlog=LISTEN_BACKLOG, limit=MAX_MESSAGE)
+        return await asyncio.start_server(
+            self.handle_connection, host, port, backlog=LISTEN_BACKLOG, limit=MAX_MESSAGE)
+
+    async def close(self):
+        """Wait for pending score saves, then close the leaderboard.
+
+        Returns:
+            None
+        """
+        if self.saves:
+            await asyncio.gather(*self.saves, return_exceptions=True)
+        if self._store is not None:
+            await self.loop.run_in_executor(self.executor, self._store.close)
+        self.executor.shutdown()
+
+
+def raise_file_limit():
+    """Allow as many open sockets as the system permits.
+
+    Every session holds a socket, so the default limit of open files is
+    often lower than the number of players.
+
+    Returns:
+        int: The new limit, or None if it could not be read.
+    """
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    except (ImportError, ValueError, OSError):
+        return None
+
+
+async def serve(args):
+    """Run the server until it is interrupted."""
+    server = GameServer(args.flip_delay / 1000, args.db)
+    listener = await server.start(args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Memory Game server listening on {where}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+def main():
+    """Parse the command line and run the server."""
+    parser = argparse.ArgumentParser(description="Memory Game multi-session server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--flip-delay", type=float, default=CARD_FLIP_DURATION * 1000,
+                        help="ms cards stay up after a guess")
+    parser.add_argument("--db", help="leaderboard database (defaults to the game's own)")
+    args = parser.parse_args()
+
+    raise_file_limit()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,789 @@
+"""
+Sydney Umezurike
+image_cache.py
+CS 5001 - Memory Game
+On-disk cache of card faces converted for Tk.
+Faces can be GIF, PNG, PPM or PGM files of any size.
+Each one is decoded, scaled to fit the card without
+changing its shape, laid on the board background and
+saved as PPM, which Tk loads without any
+decompression. Cached files are named by the source's
+content hash, the target size and the background, so
+only new or changed images are ever converted again.
+
+The decoders and the scaler are plain Python rather
+than Tk's PhotoImage: Tk can only zoom and subsample
+by whole numbers, so it cannot make a 100x150 face
+80x120, and it needs a Tk interpreter on the main
+thread, where the preloader thread and the worker
+processes cannot use it.
+
+Usage:
+    python src/image_cache.py build default_deck.txt custom_deck.txt
+    python src/image_cache.py prune default_deck.txt custom_deck.txt
+"""
+
+import argparse
+import multiprocessing
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from deck_manifest import load_manifest
+from constants import CARD_WIDTH, CARD_HEIGHT, BG_COLOR, IMAGE_CACHE_PATH
+
+# Bump when decoding or scaling changes, so old cached files are not used
+CACHE_VERSION = 2  # Version 2 keeps each face's shape instead of stretching it
+
+# Suffixes of cached files, in the order they are looked for
+CACHE_SUFFIXES = (".ppm", ".png")
+
+# Fewest images to convert before a process pool is worth starting
+PARALLEL_MIN = 8
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+class ImageError(Exception):
+    pass
+
+
+class Image:
+    __slots__ = ("width", "height", "pixels")
+
+    def __init__(self, width, height, pixels):
+        """A decoded image.
+
+        Args:
+            width (int): The width in pixels.
+            height (int): The height in pixels.
+            pixels (bytearray): RGBA bytes, row by row from the top.
+        """
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+
+
+def decode_image(data):
+    """Decode a GIF, PNG or PPM/PGM file.
+
+    Args:
+        data (bytes): The file contents.
+
+    Returns:
+        Image: The decoded image. For GIFs, the first frame.
+
+    Raises:
+        ImageError: If the format is not supported or the file is damaged.
+    """
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return decode_gif(data)
+    if data[:8] == PNG_SIGNATURE:
+        return decode_png(data)
+    if data[:2] in (b"P2", b"P3", b"P5", b"P6"):
+        return decode_pnm(data)
+    raise ImageError("not a GIF, PNG or PPM image")
+
+
+def decode_gif(data):
+    """Decode the first frame of a GIF onto its full canvas."""
+    try:
+        width, height, flags = struct.unpack_from("<HHB", data, 6)
+        offset = 13
+        palette = None
+        if flags & 0x80:
+            size = 3 << ((flags & 7) + 1)
+            palette = data[offset:offset + size]
+            offset += size
+        transparent = None
+        while offset < len(data):
+            block = data[offset]
+            if block == 0x21:  # Extension; only the graphic control one matters
+                label = data[offset + 1]
+                offset += 2
+                while data[offset]:
+                    length = data[offset]
+                    if label == 0xF9 and length >= 4 and data[offset + 1] & 1:
+                        transparent = data[offset + 4]
+                    offset += length + 1
+                offset += 1
+            elif block == 0x2C:  # Image descriptor
+                left, top, frame_width, frame_height, frame_flags = struct.unpack_from(
+                    "<HHHHB", data, offset + 1)
+                offset += 10
+                if frame_flags & 0x80:
+                    size = 3 << ((frame_flags & 7) + 1)
+                    palette = data[offset:offset + size]
+                    offset += size
+                if palette is None:
+                    raise ImageError("GIF has no color table")
+                min_code_size = data[offset]
+                offset += 1
+                chunks = []
+                while data[offset]:
+                    length = data[offset]
+                    chunks.append(data[offset + 1:offset + 1 + length])
+                    offset += length + 1
+                indices = lzw_decode(b"".join(chunks), min_code_size, frame_width * frame_height)
+                if frame_flags & 0x40:
+                    indices = deinterlace(indices, frame_width, frame_height)
+                frame = palette_to_rgba(indices, palette, transparent)
+                return place_frame(frame, frame_width, frame_height, left, top, width, height)
+            elif block == 0x3B:  # Trailer
+                break
+            else:
+                raise ImageError(f"unknown GIF block {block:#x}")
+    except (IndexError, struct.error):
+        raise ImageError("GIF is cut short")
+    raise ImageError("GIF has no image")
+
+
+def lzw_decode(data, min_code_size, count):
+    """Decode GIF LZW data into exactly count palette indices."""
+    clear = 1 << min_code_size
+    end = clear + 1
+    table = [bytes([i]) for i in range(clear)] + [b"", b""]
+    code_size = min_code_size + 1
+    out = bytearray()
+    previous = None
+    bits = 0
+    bit_count = 0
+    for byte in data:
+        bits |= byte << bit_count
+        bit_count += 8
+        while bit_count >= code_size:
+            code = bits & ((1 << code_size) - 1)
+            bits >>= code_size
+            bit_count -= code_size
+            if code == clear:
+                del table[end + 1:]
+                code_size = min_code_size + 1
+                previous = None
+                continue
+            if code == end:
+                return pad(out, count)
+            if previous is None:
+                if code >= len(table):
+                    raise ImageError("GIF image data is damaged")
+                entry = table[code]
+            elif code < len(table):
+                entry = table[code]
+                if len(table) < 4096:
+                    table.append(previous + entry[:1])
+            elif code == len(table):
+                entry = previous + previous[:1]
+                table.append(entry)
+            else:
+                raise ImageError("GIF image data is damaged")
+            out += entry
+            previous = entry
+            if len(table) == 1 << code_size and code_size < 12:
+                code_size += 1
+    return pad(out, count)
+
+
+def pad(indices, count):
+    """Cut or pad decoded indices to the frame size; short frames end in index 0."""
+    if len(indices) < count:
+        indices += bytes(count - len(indices))
+    return indices[:count]
+
+
+def deinterlace(indices, width, height):
+    """Put the rows of an interlaced GIF frame back in order."""
+    out = bytearray(len(indices))
+    row = 0
+    for start, step in ((0, 8), (4, 8), (2, 4), (1, 2)):
+        for y in range(start, height, step):
+            out[y * width:(y + 1) * width] = indices[row * width:(row + 1) * width]
+            row += 1
+    return out
+
+
+def palette_to_rgba(indices, palette, transparent=None, alpha=None):
+    """Look up palette indices, with one transparent index or per-entry alpha."""
+    colors = []
+    for i in range(256):
+        rgb = palette[3 * i:3 * i + 3] if 3 * i + 3 <= len(palette) else b"\0\0\0"
+        a = 0 if i == transparent else (alpha[i] if alpha and i < len(alpha) else 255)
+        colors.append(bytes(rgb) + bytes([a]))
+    return bytearray(b"".join([colors[i] for i in indices]))
+
+
+def place_frame(frame, frame_width, frame_height, left, top, width, height):
+    """Put a frame on a transparent canvas, clipping anything outside it."""
+    if (left, top, frame_width, frame_height) == (0, 0, width, height):
+        return Image(width, height, frame)
+    canvas = bytearray(width * height * 4)
+    for y in range(min(frame_height, height - top)):
+        columns = min(frame_width, width - left)
+        if columns <= 0:
+            break
+        start = ((top + y) * width + left) * 4
+        canvas[start:start + columns * 4] = frame[y * frame_width * 4:(y * frame_width + columns) * 4]
+    return Image(width, height, canvas)
+
+
+def decode_png(data):
+    """Decode a non-interlaced PNG of any color type and bit depth."""
+    offset = 8
+    header = None
+    palette = b""
+    trns = b""
+    idat = []
+    try:
+        while offset < len(data):
+            length, kind = struct.unpack_from(">I4s", data, offset)
+            body = data[offset + 8:offset + 8 + length]
+            offset += length + 12
+            if kind == b"IHDR":
+                header = struct.unpack(">IIBBBBB", body)
+            elif kind == b"PLTE":
+                palette = body
+            elif kind == b"tRNS":
+                trns = body
+            elif kind == b"IDAT":
+                idat.append(body)
+            elif kind == b"IEND":
+                break
+        raw = zlib.decompress(b"".join(idat))
+    except (struct.error, zlib.error):
+        raise ImageError("PNG is damaged")
+    if header is None:
+        raise ImageError("PNG has no header")
+    width, height, depth, color_type, _, _, interlace = header
+    if interlace:
+        raise ImageError("interlaced PNG is not supported")
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(color_type)
+    if channels is None or depth not in (1, 2, 4, 8, 16):
+        raise ImageError(f"unsupported PNG color type {color_type} at depth {depth}")
+
+    stride = (width * channels * depth + 7) // 8
+    if len(raw) < (stride + 1) * height:
+        raise ImageError("PNG is cut short")
+    rows = unfilter(raw, stride, height, max(1, channels * depth // 8))
+
+    # Reduce every row to one byte per sample
+    samples = bytearray()
+    for row in rows:
+        if depth == 16:
+            samples += row[0::2]
+        elif depth < 8:
+            samples += unpack_bits(row, depth, width * channels, color_type != 3)
+        else:
+            samples += row
+
+    count = width * height
+    if color_type == 3:
+        return Image(width, height, palette_to_rgba(samples, palette, alpha=trns))
+    pixels = bytearray(count * 4)
+    if color_type in (0, 4):
+        gray = samples[0::channels]
+        pixels[0::4] = pixels[1::4] = pixels[2::4] = gray
+        if color_type == 4:
+            pixels[3::4] = samples[1::2]
+        else:
+            pixels[3::4] = b"\xff" * count
+            if len(trns) >= 2:
+                key = struct.unpack(">H", trns[:2])[0]
+                key = key >> 8 if depth == 16 else scale_sample(key, depth)
+                for i, value in enumerate(gray):
+                    if value == key:
+                        pixels[4 * i + 3] = 0
+    else:
+        pixels[0::4] = samples[0::channels]
+        pixels[1::4] = samples[1::channels]
+        pixels[2::4] = samples[2::channels]
+        if color_type == 6:
+            pixels[3::4] = samples[3::4]
+        else:
+            pixels[3::4] = b"\xff" * count
+            if len(trns) >= 6:
+                key = bytes(value >> 8 if depth == 16 else value
+                            for value in struct.unpack(">HHH", trns[:6]))
+                for i in range(count):
+                    if pixels[4 * i:4 * i + 3] == key:
+                        pixels[4 * i + 3] = 0
+    return Image(width, height, pixels)
+
+
+def unfilter(raw, stride, height, bpp):
+    """Undo the per-row PNG filters."""
+    rows = []
+    previous = bytearray(stride)
+    offset = 0
+    for _ in range(height):
+        kind = raw[offset]
+        row = bytearray(raw[offset + 1:offset + 1 + stride])
+        offset += stride + 1
+        if kind == 1:  # Sub
+            for x in range(bpp, stride):
+                row[x] = (row[x] + row[x - bpp]) & 0xFF
+        elif kind == 2:  # Up
+            for x in range(stride):
+                row[x] = (row[x] + previous[x]) & 0xFF
+        elif kind == 3:  # Average
+            for x in range(stride):
+                left = row[x - bpp] if x >= bpp else 0
+                row[x] = (row[x] + ((left + previous[x]) >> 1)) & 0xFF
+        elif kind == 4:  # Paeth
+            for x in range(stride):
+                a = row[x - bpp] if x >= bpp else 0
+                b = previous[x]
+                c = previous[x - bpp] if x >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                row[x] = (row[x] + predictor) & 0xFF
+        elif kind != 0:
+            raise ImageError(f"unknown PNG filter {kind}")
+        rows.append(row)
+        previous = row
+    return rows
+
+
+def unpack_bits(row, depth, count, scale):
+    """Split a row of 1, 2 or 4 bit samples into bytes, scaled up to 0-255 for gray."""
+    mask = (1 << depth) - 1
+    per_byte = 8 // depth
+    out = bytearray(count)
+    for i in range(count):
+        value = (row[i // per_byte] >> (8 - depth * (i % per_byte + 1))) & mask
+        out[i] = scale_sample(value, depth) if scale else value
+    return out
+
+
+def scale_sample(value, depth):
+    """Scale a sample of a low bit depth up to 0-255."""
+    return value * 255 // ((1 << depth) - 1)
+
+
+def decode_pnm(data):
+    """Decode a binary or plain PPM (color) or PGM (gray) file."""
+    kind = data[:2]
+    fields = []
+    offset = 2
+    while len(fields) < 3:
+        while offset < len(data) and data[offset:offset + 1].isspace():
+            offset += 1
+        if data[offset:offset + 1] == b"#":
+            while offset < len(data) and data[offset] not in b"\r\n":
+                offset += 1
+            continue
+        start = offset
+        while offset < len(data) and not data[offset:offset + 1].isspace():
+            offset += 1
+        if start == offset:
+            raise ImageError("PPM header is cut short")
+        fields.append(data[start:offset])
+    try:
+        width, height, maxval = (int(field) for field in fields)
+    except ValueError:
+        raise ImageError("PPM header is damaged")
+    if not 0 < maxval < 65536:
+        raise ImageError(f"unsupported PPM maxval {maxval}")
+    channels = 3 if kind in (b"P3", b"P6") else 1
+    count = width * height * channels
+
+    if kind in (b"P5", b"P6"):
+        body = data[offset + 1:]
+        if maxval > 255:
+            body = body[0:2 * count:2]
+            maxval >>= 8
+        samples = bytearray(body[:count])
+    else:
+        samples = bytearray(min(255, int(value)) for value in data[offset:].split()[:count])
+    if len(samples) < count:
+        raise ImageError("PPM is cut short")
+    if maxval != 255:
+        samples = bytearray(min(255, value * 255 // maxval) for value in samples)
+
+    pixels = bytearray(width * height * 4)
+    if channels == 3:
+        pixels[0::4] = samples[0::3]
+        pixels[1::4] = samples[1::3]
+        pixels[2::4] = samples[2::3]
+    else:
+        pixels[0::4] = pixels[1::4] = pixels[2::4] = samples
+    pixels[3::4] = b"\xff" * (width * height)
+    return Image(width, height, pixels)
+
+
+def spans(source, target):
+    """For each target pixel, the source pixels it covers and their weights."""
+    ratio = source / target
+    result = []
+    for i in range(target):
+        start = i * ratio
+        end = start + ratio
+        weights = []
+        j = int(start)
+        while j < end and j < source:
+            weight = min(end, j + 1) - max(start, j)
+            if weight > 1e-9:
+                weights.append((j, weight / ratio))
+            j += 1
+        result.append(weights)
+    return result
+
+
+def scale_image(image, width, height):
+    """Resize an image by averaging the area each new pixel covers.
+
+    Colors are weighted by alpha, so transparent pixels do not darken the
+    edges. Scaling up repeats pixels.
+
+    Args:
+        image (Image): The image to resize.
+        width (int): The new width.
+        height (int): The new height.
+
+    Returns:
+        Image: The resized image, or the same image if it is already that size.
+    """
+    if (image.width, image.height) == (width, height):
+        return image
+    source = image.pixels
+    columns = spans(image.width, width)
+
+    # Scale each row across, keeping alpha-weighted sums
+    rows = []
+    for y in range(image.height):
+        base = y * image.width * 4
+        row = []
+        for weights in columns:
+            r = g = b = a = 0.0
+            for x, weight in weights:
+                p = base + 4 * x
+                wa = weight * source[p + 3]
+                r += source[p] * wa
+                g += source[p + 1] * wa
+                b += source[p + 2] * wa
+                a += wa
+            row.append((r, g, b, a))
+        rows.append(row)
+
+    # Then scale down the columns
+    pixels = bytearray(width * height * 4)
+    p = 0
+    for weights in spans(image.height, height):
+        for x in range(width):
+            r = g = b = a = 0.0
+            for y, weight in weights:
+                pr, pg, pb, pa = rows[y][x]
+                r += pr * weight
+                g += pg * weight
+                b += pb * weight
+                a += pa * weight
+            if a > 0:
+                pixels[p] = min(255, round(r / a))
+                pixels[p + 1] = min(255, round(g / a))
+                pixels[p + 2] = min(255, round(b / a))
+                pixels[p + 3] = min(255, round(a))
+            p += 4
+    return Image(width, height, pixels)
+
+
+def fit_image(image, width, height):
+    """Scale an image to fit inside a size without changing its shape.
+
+    The image is centered, and the bands left over on two sides are
+    transparent, so they take the matte color when it is flattened.
+
+    Args:
+        image (Image): The image to fit.
+        width (int): The width to fit inside.
+        height (int): The height to fit inside.
+
+    Returns:
+        Image: An image of exactly width by height.
+    """
+    scale = min(width / image.width, height / image.height)
+    fit_width = max(1, min(width, round(image.width * scale)))
+    fit_height = max(1, min(height, round(image.height * scale)))
+    scaled = scale_image(image, fit_width, fit_height)
+    if (fit_width, fit_height) == (width, height):
+        return scaled
+    return place_frame(scaled.pixels, fit_width, fit_height, (width - fit_width) // 2,
+                       (height - fit_height) // 2, width, height)
+
+
+def flatten(image, matte):
+    """Blend every transparent or partly transparent pixel onto a color.
+
+    Args:
+        image (Image): The image, changed in place.
+        matte (str): The background color, such as "#A0D6D8".
+
+    Returns:
+        Image: The same image, now fully opaque.
+    """
+    background = bytes.fromhex(matte.lstrip("#"))
+    pixels = image.pixels
+    for i, alpha in enumerate(pixels[3::4]):
+        if alpha != 255:
+            p = 4 * i
+            for c in range(3):
+                pixels[p + c] = (pixels[p + c] * alpha + background[c] * (255 - alpha)) // 255
+            pixels[p + 3] = 255
+    return image
+
+
+def encode_image(image):
+    """Encode an image the way Tk loads it fastest.
+
+    Opaque images become binary PPM, which Tk copies straight in; images
+    that still have transparency become RGBA PNG so it is kept.
+
+    Args:
+        image (Image): The image.
+
+    Returns:
+        tuple: (file contents, file suffix).
+    """
+    pixels = image.pixels
+    count = image.width * image.height
+    if pixels[3::4].count(255) == count:
+        rgb = bytearray(count * 3)
+        rgb[0::3] = pixels[0::4]
+        rgb[1::3] = pixels[1::4]
+        rgb[2::3] = pixels[2::4]
+        return b"P6\n%d %d\n255\n" % (image.width, image.height) + rgb, ".ppm"
+
+    stride = image.width * 4
+    raw = b"".join(b"\0" + pixels[y * stride:(y + 1) * stride] for y in range(image.height))
+    header = struct.pack(">IIBBBBB", image.width, image.height, 8, 6, 0, 0, 0)
+    return PNG_SIGNATURE + png_chunk(b"IHDR", header) + png_chunk(
+        b"IDAT", zlib.compress(raw, 6)) + png_chunk(b"IEND", b""), ".png"
+
+
+def png_chunk(kind, body):
+    """Return one PNG chunk with its length and CRC."""
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def convert_file(source, target, width, height, matte=None):
+    """Convert one image and save it, atomically, as target plus a suffix.
+
+    Runs in a worker process, so errors are returned instead of raised.
+
+    Args:
+        source (str): The image to convert.
+        target (str): The cached path without its suffix.
+        width (int): The card width.
+        height (int): The card height.
+        matte (str): A color to flatten transparency onto, or None to keep it.
+
+    Returns:
+        tuple: (cached path, None), or (None, error message).
+    """
+    try:
+        with open(source, "rb") as file:
+            image = fit_image(decode_image(file.read()), width, height)
+        return save_image(image, target, matte), None
+    except (OSError, ImageError) as e:
+        return None, f"{os.path.basename(source)}: {e}"
+
+
+def save_image(image, target, matte=None):
+    """Encode an image and save it, atomically, as target plus a suffix.
+
+    Args:
+        image (Image): The image; flattened in place if matte is given.
+        target (str): The path without its suffix.
+        matte (str): A color to flatten transparency onto, or None to keep it.
+
+    Returns:
+        str: The saved path.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    if matte is not None:
+        image = flatten(image, matte)
+    data, suffix = encode_image(image)
+    path = target + suffix
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+    return path
+
+
+def run_jobs(function, jobs, workers=None):
+    """Call a conversion function for every job, in a process pool if there are enough.
+
+    Args:
+        function (function): A module-level function, so worker processes can import it.
+        jobs (list): Argument tuples, one per call.
+        workers (int): Processes to use. Defaults to one per CPU; 1 runs in this process.
+
+    Returns:
+        list: The results, in job order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if len(jobs) >= PARALLEL_MIN and workers > 1:
+        # Spawn, since the game may already have Tk and threads running
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(min(workers, len(jobs)), mp_context=context) as pool:
+            return list(pool.map(function, *zip(*jobs)))
+    return [function(*job) for job in jobs]
+
+
+class ImageCache:
+    def __init__(self, folder=IMAGE_CACHE_PATH, width=CARD_WIDTH, height=CARD_HEIGHT,
+                 matte=BG_COLOR, workers=None):
+        """Initialize a cache of images converted to one size.
+
+        Args:
+            folder (str): Where converted images are saved.
+            width (int): The width to scale images to.
+            height (int): The height to scale images to.
+            matte (str): The color transparency is flattened onto, so every
+                image can be saved as PPM. None keeps transparency as PNG.
+            workers (int): Processes to convert with. Defaults to one per CPU;
+                1 converts in this process.
+        """
+        self.folder = folder
+        self.width = width
+        self.height = height
+        self.matte = matte
+        self.workers = workers
+        self.built = 0  # Images converted by the last build
+        self.reused = 0  # Images the last build found already converted
+        self.errors = []  # Problems from the last build
+
+    def target(self, sha1):
+        """Return the cached path for an image's content hash, without a suffix."""
+        background = self.matte.lstrip("#").lower() if self.matte else "alpha"
+        return os.path.join(self.folder,
+                            f"{sha1}_{self.width}x{self.height}_{background}_v{CACHE_VERSION}")
+
+    def lookup(self, sha1):
+        """Return the cached file for a content hash, or None if it was never built."""
+        target = self.target(sha1)
+        for suffix in CACHE_SUFFIXES:
+            if os.path.exists(target + suffix):
+                return target + suffix
+        return None
+
+    def build(self, entries):
+        """Make sure every image in a deck manifest has been converted.
+
+        Only images whose content hash is not in the cache yet are
+        converted. Enough of them at once use a process pool.
+
+        Args:
+            entries (list): Deck manifest entries, with path and sha1.
+
+        Returns:
+            dict: Original image path -> converted file, for every image
+                that could be converted.
+        """
+        sources = {}
+        missing = {}  # sha1 -> an original path with that content
+        for entry in entries:
+            cached = self.lookup(entry["sha1"])
+            if cached is None:
+                missing.setdefault(entry["sha1"], entry["path"])
+            else:
+                sources[entry["path"]] = cached
+        self.reused = len(sources)
+        self.built = 0
+        self.errors = []
+        if not missing:
+            return sources
+
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+        except OSError as e:
+            self.errors.append(f"Could not create image cache {self.folder}: {e}")
+            return sources
+        jobs = [(path, self.target(sha1), self.width, self.height, self.matte)
+                for sha1, path in missing.items()]
+        results = run_jobs(convert_file, jobs, self.workers)
+
+        converted = {}
+        for (path, *_), (cached, error) in zip(jobs, results):
+            if cached is None:
+                self.errors.append(error)
+            else:
+                converted[path] = cached
+                self.built += 1
+        # Images with the same content share one converted file
+        for entry in entries:
+            if entry["path"] not in sources:
+                cached = converted.get(missing.get(entry["sha1"]))
+                if cached is not None:
+                    sources[entry["path"]] = cached
+        return sources
+
+    def prune(self, keep):
+        """Delete converted images that no longer belong to any deck.
+
+        Args:
+            keep (iterable): Content hashes to keep.
+
+        Returns:
+            int: The number of files deleted.
+        """
+        keep = {os.path.basename(self.target(sha1)) for sha1 in keep}
+        removed = 0
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            return 0
+        for entry in entries:
+            name, suffix = os.path.splitext(entry.name)
+            if suffix in CACHE_SUFFIXES and name not in keep:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+def unusable_faces(entries, sources):
+    """Return the names of faces Tk cannot load, because they are not GIFs
+    and could not be converted.
+
+    Args:
+        entries (list): Deck manifest entries.
+        sources (dict): Original path -> converted file, from ImageCache.build.
+
+    Returns:
+        list: Face names.
+    """
+    return [entry["name"] for entry in entries
+            if entry["path"] not in sources and not entry["path"].lower().endswith(".gif")]
+
+
+def main():
+    """Build or prune the image cache for some decks."""
+    parser = argparse.ArgumentParser(description="Memory Game image cache")
+    parser.add_argument("command", choices=["build", "prune"])
+    parser.add_argument("decks", nargs="+", help="deck files in the assets folder")
+    parser.add_argument("--workers", type=int, default=None, help="processes to convert with")
+    args = parser.parse_args()
+
+    cache = ImageCache(workers=args.workers)
+    manifests = [load_manifest(deck) for deck in args.decks]
+    for manifest in manifests:
+        for error in manifest.errors:
+            print(f"{manifest.deck_file}: {error}")
+    if args.command == "prune":
+        keep = {entry["sha1"] for manifest in manifests for entry in manifest.entries}
+        print(f"removed {cache.prune(keep)} converted images")
+        return
+
+    for manifest in manifests:
+        start = time.perf_counter()
+        cache.build(manifest.entries)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{manifest.deck_file}: {cache.built} converted, {cache.reused} cached "
+              f"in {elapsed:.1f} ms")
+        for error in cache.errors:
+            print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Sydney Umezurike
+input_queue.py
+CS 5001 - Memory Game
+Queue between the window's clicks and the game.
+Clicks are queued as they arrive and applied together
+at the start of the next frame, before its single
+screen update. Clicks that cannot change anything,
+such as on a card while two are already face up, are
+dropped when they arrive, and repeated clicks on the
+same target in one frame count once, so a burst of
+clicks never turns into a burst of redraws. Key
+presses apply the clicks queued before them first.
+"""
+
+from instrumentation import Histogram
+from constants import INPUT_QUEUE_LIMIT
+
+
+class InputQueue:
+    def __init__(self, clock, apply, target, limit=INPUT_QUEUE_LIMIT):
+        """Initialize an empty queue drained by the game clock.
+
+        Args:
+            clock (GameClock): The clock whose ticks are the frames.
+            apply (function): Called with (x, y) for every accepted click.
+                Returns True if the click changed anything.
+            target (function): Called with (x, y) when a click arrives.
+                Returns what the click is on, or None if it would do
+                nothing right now, so it is dropped.
+            limit (int): The most clicks waiting at once; more are dropped.
+        """
+        self.clock = clock
+        self.apply = apply
+        self.target = target
+        self.limit = limit
+        self.events = []  # (x, y, target, time received), oldest first
+        self.targets = set()  # Targets of the queued clicks
+        self.unpresented = []  # Times clicks that changed something were received
+        self.latency = Histogram("ms")  # From a click arriving until its frame is drawn
+        self.received = 0
+        self.dropped = 0  # Clicks that would have done nothing
+        self.coalesced = 0  # Repeated clicks on a queued target
+        self.applied = 0
+        self.ignored = 0  # Applied, but changed nothing
+        clock.input = self
+
+    def push(self, x, y):
+        """Queue a click to be applied on the next frame.
+
+        This is the window's click handler, so it only does a lookup.
+
+        Args:
+            x (float): The x-coordinate of the click.
+            y (float): The y-coordinate of the click.
+
+        Returns:
+            None
+        """
+        self.received += 1
+        target = self.target(x, y)
+        if target is None or len(self.events) >= self.limit:
+            self.dropped += 1
+            return
+        if target in self.targets:
+            self.coalesced += 1
+            return
+        self.targets.add(target)
+        self.events.append((x, y, target, self.clock.now()))
+        self.clock.request_frame()
+
+    def key(self, handler):
+        """Wrap a key handler so clicks queued before the key are applied first.
+
+        Keys such as paging change what is under the mouse, so a click has
+        to be applied on the view it was aimed at.
+
+        Args:
+            handler (function): The key handler, called with no arguments.
+
+        Returns:
+            function: The wrapped handler.
+        """
+        def on_key():
+            if self.events:
+                self.drain()
+            handler()
+        return on_key
+
+    def drain(self):
+        """Apply every queued click, oldest first.
+
+        Called by the game clock once per tick, after its timers. A click
+        can still turn out to do nothing, if one before it in the same
+        frame changed the board. If one replaces the board, the rest are
+        dropped, since they were aimed at the old one.
+
+        Returns:
+            None
+        """
+        events, self.events = self.events, []
+        self.targets = set()
+        generation = self.clock.generation
+        for x, y, _, received in events:
+            if self.clock.generation != generation:
+                self.dropped += 1
+                continue
+            self.applied += 1
+            if self.apply(x, y):
+                self.unpresented.append(received)
+            else:
+                self.ignored += 1
+
+    def presented(self, now):
+        """Record the latency of every click drawn by a screen update.
+
+        Args:
+            now (float): The time of the update, in clock milliseconds.
+
+        Returns:
+            None
+        """
+        for received in self.unpresented:
+            self.latency.record(now - received)
+        self.unpresented = []
+
+    def clear(self):
+        """Drop every queued click, such as when the board is replaced.
+
+        Returns:
+            None
+        """
+        self.dropped += len(self.events)
+        self.events = []
+        self.targets = set()
+        self.unpresented = []
+
+    def stats(self):
+        """Return the click counts and latency summary as a dict."""
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "applied": self.applied,
+            "ignored": self.ignored,
+            "queued": len(self.events),
+            "latency_ms": self.latency.summary(),
+        }
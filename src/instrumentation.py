@@ -0,0 +1,232 @@
+"""
+Sydney Umezurike
+instrumentation.py
+CS 5001 - Memory Game
+Opt-in timing for the game's hot paths.
+Methods are wrapped at the class level only when
+instrumentation is turned on, so a normal game runs
+the original methods with no extra cost. Timings and
+counts go into log-scale histograms that are saved
+as JSON or CSV when the game exits.
+"""
+
+import csv
+import functools
+import json
+import math
+import time
+
+# Histogram resolution: buckets per doubling, about 9% apart
+BUCKETS_PER_OCTAVE = 8
+
+# Percentiles reported for every histogram
+PERCENTILES = (50, 90, 99)
+
+
+class Histogram:
+    __slots__ = ("unit", "counts", "count", "total", "min", "max")
+
+    def __init__(self, unit="us"):
+        """Initialize an empty histogram.
+
+        Values below 1 share the first bucket; above that every bucket is
+        1/BUCKETS_PER_OCTAVE of a doubling wide, so recording is a log and
+        an index no matter how many values are kept.
+
+        Args:
+            unit (str): The unit of the recorded values, for the report.
+        """
+        self.unit = unit
+        self.counts = {}  # Bucket number -> values in it
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value):
+        """Add one value.
+
+        Args:
+            value (float): The value, such as a time in microseconds.
+
+        Returns:
+            None
+        """
+        bucket = 0 if value < 1 else 1 + int(math.log2(value) * BUCKETS_PER_OCTAVE)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """Estimate a percentile from the buckets.
+
+        Args:
+            percent (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The upper edge of the bucket holding the percentile,
+                capped at the largest value seen.
+        """
+        if not self.count:
+            return 0.0
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.max, bucket_upper(bucket))
+        return self.max
+
+    def summary(self):
+        """Return the count, mean, min, percentiles and max as a dict."""
+        summary = {
+            "unit": self.unit,
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "min": round(self.min, 3) if self.count else 0.0,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent}"] = round(self.percentile(percent), 3)
+        summary["max"] = round(self.max, 3)
+        return summary
+
+
+def bucket_upper(bucket):
+    """Return the largest value that falls in a bucket."""
+    return 2 ** (bucket / BUCKETS_PER_OCTAVE) if bucket else 1.0
+
+
+class Instrumentation:
+    def __init__(self, path):
+        """Initialize instrumentation that will save its report to a file.
+
+        Args:
+            path (str): Where to save the report. A .csv path writes CSV,
+                anything else writes JSON.
+        """
+        self.path = path
+        self.histograms = {}  # Name -> Histogram
+        self.pending_timers = 0
+        self.patched = []  # (class, method name, original method), to undo patches
+
+    def histogram(self, name, unit="us"):
+        """Return the histogram with a name, creating it the first time.
+
+        Args:
+            name (str): The histogram name, such as "game.handle_click".
+            unit (str): The unit of its values.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(unit)
+        return self.histograms[name]
+
+    def time_method(self, cls, method_name, name=None):
+        """Replace a method on a class with one that times every call.
+
+        Args:
+            cls (type): The class to patch.
+            method_name (str): The method to time.
+            name (str): The histogram name. Defaults to "Class.method".
+
+        Returns:
+            None
+        """
+        original = getattr(cls, method_name)
+        histogram = self.histogram(name or f"{cls.__name__}.{method_name}")
+        clock = time.perf_counter_ns
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                histogram.record((clock() - start) / 1000)
+
+        self._patch(cls, method_name, original, timed)
+
+    def track_renderer(self, renderer_class):
+        """Count pending timers and sample live objects and canvas items.
+
+        Timers are counted by wrapping ontimer, and the counts are sampled
+        every time the screen is updated.
+
+        Args:
+            renderer_class (type): The renderer class the game uses.
+
+        Returns:
+            None
+        """
+        original_ontimer = renderer_class.ontimer
+        original_update = renderer_class.update
+        pending = self.histogram("timers.pending", "timers")
+        objects = self.histogram("renderer.objects", "objects")
+        items = self.histogram("renderer.items", "items")
+
+        @functools.wraps(original_ontimer)
+        def ontimer(renderer, callback, delay):
+            self.pending_timers += 1
+
+            def run():
+                self.pending_timers -= 1
+                callback()
+            return original_ontimer(renderer, run, delay)
+
+        @functools.wraps(original_update)
+        def update(renderer):
+            result = original_update(renderer)
+            pending.record(self.pending_timers)
+            objects.record(renderer.object_count())
+            items.record(renderer.item_count())
+            return result
+
+        self._patch(renderer_class, "ontimer", original_ontimer, ontimer)
+        self._patch(renderer_class, "update", original_update, update)
+
+    def _patch(self, cls, method_name, original, replacement):
+        self.patched.append((cls, method_name, original))
+        setattr(cls, method_name, replacement)
+
+    def uninstall(self):
+        """Put every patched method back.
+
+        Returns:
+            None
+        """
+        for cls, method_name, original in reversed(self.patched):
+            setattr(cls, method_name, original)
+        self.patched = []
+
+    def report(self):
+        """Return every histogram's summary, by name."""
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self):
+        """Save the report as JSON or CSV.
+
+        Failing to save is reported but never raises, since this runs at exit.
+
+        Returns:
+            None
+        """
+        report = self.report()
+        try:
+            with open(self.path, "w", newline="") as file:
+                if self.path.lower().endswith(".csv"):
+                    columns = ["name", "unit", "count", "mean", "min"]
+                    columns += [f"p{percent}" for percent in PERCENTILES] + ["max"]
+                    writer = csv.DictWriter(file, fieldnames=columns)
+                    writer.writeheader()
+                    for name, summary in report.items():
+                        writer.writerow({"name": name, **summary})
+                else:
+                    json.dump(report, file, indent=2)
+        except OSError as e:
+            print(f"Could not save instrumentation report {self.path}: {e}")
@@ -0,0 +1,158 @@
+"""
+Sydney Umezurike
+layout.py
+CS 5001 - Memory Game
+Layout engine for the game screen.
+Works out where the board, status bar, leaderboard
+and buttons go from the window size, and fits the
+card grid for any number of cards. When the grid has
+more rows than fit, only a window of rows is shown
+and the player pages through the rest.
+"""
+
+import math
+from spatial_index import SpatialIndex
+from constants import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, CARD_WIDTH, CARD_HEIGHT, CARD_SPACING,
+    LAYOUT_MARGIN, PANEL_WIDTH, STATUS_HEIGHT, BUTTON_SIZE, MIN_CARD_COUNT
+)
+
+
+def nearest_card_count(count, max_count=None):
+    """Round a requested number of cards to one the game can deal.
+
+    Boards need an even number of cards, at least MIN_CARD_COUNT, and
+    no more than two per face in the deck.
+
+    Args:
+        count (int): The requested number of cards.
+        max_count (int): The most cards the deck can deal, if known.
+
+    Returns:
+        int: The closest valid card count.
+    """
+    count = max(MIN_CARD_COUNT, count - count % 2)
+    if max_count is not None:
+        count = min(count, max(MIN_CARD_COUNT, max_count - max_count % 2))
+    return count
+
+
+class BoardLayout:
+    def __init__(self, card_count, window_width=SCREEN_WIDTH, window_height=SCREEN_HEIGHT,
+                 card_width=CARD_WIDTH, card_height=CARD_HEIGHT, spacing=CARD_SPACING):
+        """Lay out the screen for a board.
+
+        The leaderboard panel runs down the right side with the buttons at
+        its foot, the status bar sits under the board, and the board gets
+        the rest. The grid is about as tall as it is wide when it fits, and
+        is centered in the board.
+
+        Args:
+            card_count (int): The number of cards on the board.
+            window_width (int): The window width in pixels.
+            window_height (int): The window height in pixels.
+            card_width (int): The width of a card.
+            card_height (int): The height of a card.
+            spacing (int): The gap between neighbouring cards.
+        """
+        self.card_count = card_count
+        self.window_size = (window_width, window_height)
+        self.card_width = card_width
+        self.card_height = card_height
+        self.spacing = spacing
+        self.pitch_x = card_width + spacing
+        self.pitch_y = card_height + spacing
+
+        # Outer edges, with the origin in the middle of the window
+        left = -window_width / 2 + LAYOUT_MARGIN
+        right = window_width / 2 - LAYOUT_MARGIN
+        top = window_height / 2 - LAYOUT_MARGIN
+        bottom = -window_height / 2 + LAYOUT_MARGIN
+
+        # Leaderboard panel on the right, buttons below it
+        panel_left = right - PANEL_WIDTH
+        self.panel = (panel_left, top, PANEL_WIDTH, top - (bottom + STATUS_HEIGHT + LAYOUT_MARGIN))
+        button_y = bottom + STATUS_HEIGHT / 2
+        self.load_button = (panel_left + BUTTON_SIZE / 2 + LAYOUT_MARGIN / 2, button_y)
+        self.quit_button = (right - BUTTON_SIZE / 2 - LAYOUT_MARGIN / 2, button_y)
+
+        # Board and status bar share the rest of the width
+        board_right = panel_left - LAYOUT_MARGIN
+        board_bottom = bottom + STATUS_HEIGHT + LAYOUT_MARGIN
+        self.board = (left, top, board_right - left, top - board_bottom)
+        self.status = (left, bottom + STATUS_HEIGHT, board_right - left, STATUS_HEIGHT)
+
+        # Fit the grid inside the board, half a gap in from the border
+        inner_width = board_right - left - spacing
+        inner_height = top - board_bottom - spacing
+        fit_columns = max(1, int((inner_width + spacing) // self.pitch_x))
+        fit_rows = max(1, int((inner_height + spacing) // self.pitch_y))
+        square = math.ceil(math.sqrt(max(card_count, 1) * self.pitch_y / self.pitch_x))
+        self.columns = max(1, min(fit_columns, max(square, math.ceil(card_count / fit_rows))))
+        self.rows = math.ceil(card_count / self.columns) if card_count else 0
+        self.visible_rows = max(1, min(self.rows, fit_rows))
+
+        grid_width = self.columns * self.pitch_x - spacing
+        self.start_x = (left + board_right) / 2 - grid_width / 2 + card_width / 2
+        self.start_y = top - spacing / 2 - card_height / 2
+
+    @property
+    def paged(self):
+        """True if the board has more rows than fit on screen."""
+        return self.rows > self.visible_rows
+
+    @property
+    def slots(self):
+        """The most cards on screen at once."""
+        return min(self.card_count, self.columns * self.visible_rows)
+
+    def clamp_row(self, first_row):
+        """Return the nearest first row that keeps the view full.
+
+        Args:
+            first_row (int): The requested first visible row.
+
+        Returns:
+            int: A first row between 0 and the last full page.
+        """
+        return max(0, min(first_row, self.rows - self.visible_rows))
+
+    def visible_cells(self, first_row=0):
+        """Return the indices of the cards on screen.
+
+        Args:
+            first_row (int): The first visible row.
+
+        Returns:
+            range: The card indices, in board order.
+        """
+        first = first_row * self.columns
+        return range(first, min(self.card_count, first + self.columns * self.visible_rows))
+
+    def hit_index(self, first_row=0):
+        """Build the click index for the view starting at a row.
+
+        The grid is shifted up so first_row sits at the top of the board,
+        which makes cell_center give each visible card's screen position.
+
+        Args:
+            first_row (int): The first visible row.
+
+        Returns:
+            SpatialIndex: The index, with no button regions yet.
+        """
+        return SpatialIndex(self.card_count, self.columns, self.start_x,
+                            self.start_y + first_row * self.pitch_y,
+                            self.card_width, self.card_height, self.spacing)
+
+    def button_region(self, center):
+        """Return the clickable ((left, right), (bottom, top)) area of a button."""
+        x, y = center
+        half = BUTTON_SIZE / 2
+        return ((x - half, x + half), (y - half, y + half))
+
+    def pager(self):
+        """Return the centers of the page up and page down arrows in the status bar."""
+        left, top, width, height = self.status
+        y = top - height / 2
+        return (left + width - 60, y), (left + width - 25, y)
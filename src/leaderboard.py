@@ -6,91 +6,138 @@ This file contains methods for managing and
 displaying the leaderboard for the memory game.
 It draws the leaderboard's border, updates 
 scores, and displays the leaderboard on the screen.
+Players are ranked by efficiency, the moves a perfect
+memory player would expect to need over the moves
+they took, so boards of any size can be compared.
+After a game the player's standing comes from the
+streaming summaries, without reading the history.
 """
 
 import os
-import turtle
 from constants import ASSETS_PATH
+from layout import BoardLayout
+from overlay import OverlayLayer
+from score_analytics import MOVES, EFFICIENCY, share_beaten
+from score_store import ScoreStore
+from solver import ExpectedMovesTable
+
+TITLE_FONT = ("Arial", 16, "bold")
+ROW_FONT = ("Arial", 14)
+STANDING_FONT = ("Arial", 12)
+MAX_ROWS = 6  # Number of scores kept on the leaderboard
+
+def format_score(name, moves, card_count, efficiency):
+    """Return the leaderboard text for one result.
+
+    The board size is shown with the moves, since neither the moves nor
+    the efficiency mean much without it.
+
+    Args:
+        name (str): The player's name.
+        moves (int): The number of moves taken.
+        card_count (int): The number of cards on the board, 0 if unknown.
+        efficiency (float): The efficiency score, or None.
+
+    Returns:
+        str: The row text.
+    """
+    text = f"{name}: {moves} moves"
+    if card_count:
+        text += f", {card_count} cards"
+    if efficiency is not None:
+        text += f" ({efficiency:.0%})"
+    return text
+
 
 class Leaderboard:
-    def __init__(self, screen):
+    def __init__(self, renderer, store=None):
         """Initialize the leaderboard.
 
         Args:
-            screen: The turtle screen to draw on.
+            renderer (Renderer): The renderer to draw with.
+            store (ScoreStore): The score store to use. Defaults to one
+                opened in the assets folder on first use.
         """
-        self.screen = screen
+        self.renderer = renderer
         self.leaderboard_path = os.path.join(ASSETS_PATH, "leaderboard.txt")
+        self.layer = OverlayLayer(renderer)
+        self.layout = BoardLayout(0)
+        self._store = store
+        self.expected_moves = None
+
+    @property
+    def store(self):
+        """The score store, opened on first use.
+
+        The old leaderboard.txt file is migrated into it the first time,
+        and the expected moves table and the streaming summaries are
+        loaded with it so results saved without an efficiency can be
+        scored. Nothing is solved or scanned at the end of a game.
+
+        Returns:
+            ScoreStore: The score store.
+        """
+        if self._store is None:
+            self._store = ScoreStore(legacy_path=self.leaderboard_path)
+        if self.expected_moves is None:
+            self.expected_moves = ExpectedMovesTable()
+            self._store.fill_efficiency(self.expected_moves.efficiency)
+            self._store.summary("all", EFFICIENCY)  # Load the summaries now, not at the end of a game
+        return self._store
 
-    def draw_border(self):
+    def draw_border(self, layout=None):
         """Draw the leaderboard border.
 
         This method draws the border for the leaderboard area on the screen.
         
+        Args:
+            layout (BoardLayout): The screen layout to draw with. Defaults
+                to the last one used.
+        
         Returns:
             None
         """
-        border = turtle.Turtle()
-        border.hideturtle()
-        border.speed(0)
-        border.penup()
-        border.goto(100, 400)  # Start position for the border
-        border.pendown()
-        border.pensize(3)
-        border.color("pink")
-        for _ in range(2):
-            border.forward(250)  # Width of leaderboard
-            border.right(90)
-            border.forward(600)  # Height of leaderboard
-            border.right(90)
-
+        if layout is not None:
+            self.layout = layout
+        left, top, width, height = self.layout.panel
+        self.layer.set_box("border", left, top, width, height, color="pink")
         # Write "Leaders:" inside the border
-        leader = turtle.Turtle()
-        leader.hideturtle()
-        leader.speed(0)
-        leader.penup()
-        leader.goto(120, 350)  # Adjusted position inside the border
-        leader.color("black")
-        leader.write("Leaders:", font=("Arial", 16, "bold"))
-
-    def update_scores(self, player_name, moves):
+        self.layer.set_text("title", left + 20, top - 50, "Leaders:", TITLE_FONT)
+        self.layer.flush()
+
+    def reset(self):
+        """Forget drawn items after the screen has been cleared.
+
+        Returns:
+            None
+        """
+        self.layer.reset()
+
+    def update_scores(self, player_name, moves, deck="", card_count=0):
         """Update leaderboard with current player's score.
 
-        This method reads the existing scores, adds the new player's score,
-        sorts the scores, and writes the top 6 scores back to the leaderboard file.
+        This method saves the player's score in the score store, which keeps
+        every result and takes a file lock for the write, along with its
+        efficiency from the expected moves table, then refreshes the
+        display with the top 6 scores and the player's standing.
         
         Args:
             player_name (str): The name of the player.
             moves (int): The number of moves taken by the player.
+            deck (str): The deck file the game was played with.
+            card_count (int): The number of cards on the board.
         
         Returns:
             None
         """
         try:
-            # Read existing scores from the leaderboard file
-            scores = []
-            if os.path.exists(self.leaderboard_path):
-                with open(self.leaderboard_path, 'r') as file:
-                    for line in file:
-                        name, score = line.strip().split(',')
-                        scores.append((name, int(score)))
-            
-            # Add the current player's score
-            scores.append((player_name, moves))
-            
-            # Sort the scores in ascending order based on the number of moves
-            scores.sort(key=lambda x: x[1])
-            
-            # Keep only the top 6 scores
-            scores = scores[:6]
-            
-            # Write the updated scores back to the file
-            with open(self.leaderboard_path, 'w') as file:
-                for name, score in scores:
-                    file.write(f"{name},{score}\n")
+            store = self.store
+            efficiency = self.expected_moves.efficiency(moves, card_count)
+            store.add_result(player_name, moves, deck, card_count, efficiency)
             
             # Update the leaderboard display
             self.display_scores()
+            self.display_standing(player_name, moves, card_count, efficiency)
             
         except Exception as e:
             print(f"Error updating leaderboard: {e}")
@@ -98,30 +145,63 @@ class Leaderboard:
     def display_scores(self):
         """Display the leaderboard scores.
 
-        This method clears the previous leaderboard scores and displays the current top scores.
+        Each row is a persistent item that is only redrawn when its text
+        changes, and rows that are no longer needed are emptied.
         
         Returns:
             None
         """
         try:
-            # Clear the previous leaderboard display
-            leader = turtle.Turtle()
-            leader.hideturtle()
-            leader.speed(0)
-            leader.penup()
-            leader.goto(120, 350)
-            leader.color("black")
-            leader.write("Leaders:", font=("Arial", 16, "bold"))
-            
-            # Display the current leaderboard scores
-            if os.path.exists(self.leaderboard_path):
-                with open(self.leaderboard_path, 'r') as file:
-                    y = 300  # Starting position for displaying scores
-                    for line in file:
-                        name, moves = line.strip().split(',')
-                        leader.goto(120, y)
-                        leader.write(f"{name}: {moves} moves", font=("Arial", 14))
-                        y -= 30  # Space between entries
+            scores = [format_score(*row) for row in self.store.top_efficiency(MAX_ROWS)]
+
+            left, top, width, height = self.layout.panel
+            self.layer.set_text("title", left + 20, top - 50, "Leaders:", TITLE_FONT)
+            y = top - 100  # Starting position for displaying scores
+            for row in range(MAX_ROWS):
+                text = scores[row] if row < len(scores) else ""
+                self.layer.set_text(f"row{row}", left + 20, y, text, ROW_FONT)
+                y -= 30  # Space between entries
+            self.layer.flush()
                         
         except Exception as e:
             print(f"Error displaying leaderboard: {e}")
+
+    def display_standing(self, player_name, moves, card_count, efficiency):
+        """Show how a finished game compares with every saved result.
+
+        The share of games beaten comes from the summary of boards with
+        the same number of cards, and the player's line from their own
+        summary, so this costs the same however many results are saved.
+
+        Args:
+            player_name (str): The name of the player.
+            moves (int): The number of moves the game took.
+            card_count (int): The number of cards on the board.
+            efficiency (float): The game's efficiency score, or None.
+
+        Returns:
+            None
+        """
+        try:
+            lines = []
+            if card_count:
+                beaten = share_beaten(self.store.summary(f"count:{card_count}", MOVES), moves)
+                if beaten is None:
+                    lines.append(f"First {card_count}-card game!")
+                else:
+                    lines.append(f"Beat {beaten:.0%} of {card_count}-card games")
+            if efficiency is not None:
+                player = self.store.summary(f"player:{player_name}", EFFICIENCY)
+                games = "game" if player.count == 1 else "games"
+                lines.append(f"{player_name}: {player.count} {games}, avg {player.mean:.0%}")
+
+            left, top, width, height = self.layout.panel
+            y = top - 100 - 30 * MAX_ROWS  # Below the score rows
+            for row in range(2):
+                text = lines[row] if row < len(lines) else ""
+                self.layer.set_text(f"standing{row}", left + 20, y, text, STANDING_FONT)
+                y -= 25
+            self.layer.flush()
+
+        except Exception as e:
+            print(f"Error displaying standing: {e}")
@@ -10,93 +10,187 @@ interactions like starting the
 game and displaying results.
 """
 
-import turtle
-import time
+# Imported first so the startup clock starts before everything else loads
+from startup import StartupTimer, AssetPreloader
+import argparse
+import atexit
 import os
+import random
 from game_logic import MemoryGameLogic
 from leaderboard import Leaderboard
-from ui_components import GameUI
+from ui_components import GameUI, QUIT_BUTTON_NAME, LOAD_BUTTON_NAME, PAGE_UP_NAME, PAGE_DOWN_NAME
+from asset_cache import get_asset_cache
+from asset_pack import open_pack
+from image_cache import ImageCache, unusable_faces
+from deck_manifest import load_manifest, is_streamed_deck, sample_deck, describe_image, DeckError
+from spatial_index import CARD_HIT, REGION_HIT
+from layout import BoardLayout, nearest_card_count
+from renderer import TurtleRenderer
+from instrumentation import Instrumentation
+from scheduler import GameClock
+from input_queue import InputQueue
+from flip_animation import FlipFrames, FlipAnimator
+from replay import ReplayWriter, replay_path
+from session import SessionBoard, SessionWriter, SessionError, read_session
 from constants import (
     ASSETS_PATH, SCREEN_WIDTH, SCREEN_HEIGHT, BG_COLOR, INITIAL_BG_COLOR,
-    VALID_CARD_COUNTS, DEFAULT_CARD_COUNT, WARNING_DURATION,
-    SPLASH_SCREEN_DURATION, END_CREDITS_DURATION
+    DEFAULT_CARD_COUNT, EAGER_FACE_LIMIT, WARNING_DURATION, CARD_FLIP_DURATION,
+    SPLASH_SCREEN_DURATION, END_CREDITS_DURATION, QUIT_MESSAGE_DURATION, STARTUP_TICK_MS, FRAME_MS,
+    PRELOAD_PER_TICK, STARTUP_REPORT_ENV, PROFILE_ENV, RESIZE_DELAY_MS, CARD_BACK,
+    QUIT_BUTTON, LOAD_BUTTON, WINNER_IMAGE, QUIT_MESSAGE, CARD_WARNING, FILE_ERROR,
+    DEFAULT_DECK, MIN_CARD_COUNT, REPLAYS_PATH, SESSION_PATH, PACK_PATH, IMAGE_CACHE_PATH
 )
 
+startup_timer = StartupTimer()
+startup_timer.mark("import")
+
 class MemoryGame:
-    def __init__(self):
+    def __init__(self, renderer=None, assets_path=ASSETS_PATH, cache_path=IMAGE_CACHE_PATH,
+                 score_store=None):
         """
         Initialize the game screen and components.
         
         Sets up the screen, initializes UI components, leaderboard, and game variables.
+        
+        Args:
+            renderer (Renderer): The renderer to draw with. Defaults to a
+                TurtleRenderer; pass a NullRenderer to run without a display.
+            assets_path (str): The folder decks are loaded from. Their manifests are saved there too.
+            cache_path (str): The folder converted card images are saved in.
+            score_store (ScoreStore): The score store the leaderboard uses. Defaults
+                to the one in the assets folder.
         """
         # Set up the screen
-        self.screen = turtle.Screen()
-        self.screen.title("CS5001 Memory Game")
-        self.screen.bgcolor(INITIAL_BG_COLOR)
-        self.screen.setup(width=SCREEN_WIDTH, height=SCREEN_HEIGHT)
-        self.screen.tracer(0)
+        self.renderer = renderer if renderer is not None else TurtleRenderer()
+        self.renderer.setup("CS5001 Memory Game", SCREEN_WIDTH, SCREEN_HEIGHT, INITIAL_BG_COLOR)
+        
+        # Every delayed action and screen update goes through the game clock
+        self.clock = GameClock(self.renderer)
+        self.resize_timer = None  # Lays the board out again once resizing stops
+        self.renderer.onresize(self.window_resized)
+        
+        # Clicks wait in a queue and are applied once per frame
+        self.input_queue = InputQueue(self.clock, self.handle_click, self.click_target)
         
         # Initialize UI and leaderboard
-        self.ui = GameUI(self.screen)
-        self.leaderboard = Leaderboard(self.screen)
+        self.assets = get_asset_cache(self.renderer)
+        self.assets_path = assets_path
+        self.cache_path = cache_path
+        self.image_cache = ImageCache(cache_path)  # Faces converted and scaled to the card size
+        self.flip_frames = FlipFrames(os.path.join(cache_path, "flip"))  # Narrowed faces for the flip animation
+        self.animator = FlipAnimator(self.clock, self.renderer, self.assets, self.flip_frames)
+        self.ui = GameUI(self.renderer, self.clock)
+        self.leaderboard = Leaderboard(self.renderer, score_store)
         
         # Initialize game
         self.player_name = ""
         self.card_count = DEFAULT_CARD_COUNT
         self.matches = 0
         self.guesses = 0
-        self.cards = []
+        self.cards = {}  # Card index -> sprite, only for cards on screen
+        self.sprite_pool = []  # One sprite per visible slot, reused when paging
+        self.layout = None  # Where everything goes for this board and window
+        self.first_row = 0  # First board row on screen
+        self.logic = None  # Rules and match bookkeeping for the current board
+        self.hit_index = None
         self.selected_cards = []
         self.game_active = True
         self.current_deck = 'default_deck.txt'
+        self.deck_manifest = None
+        self.card_faces = []
+        self.deck_rejected = False  # Show the file error once the board is drawn
+        self.pack = None  # AssetPack the decks and images come from, if one is open
+        self.seed = None  # Seed the current board was shuffled with
+        self.replay = None  # ReplayWriter recording the current board
+        self.replays_path = REPLAYS_PATH  # Set to None to stop saving replays
+        self.session_path = SESSION_PATH  # Set to None to stop saving session snapshots
+        self.session_writer = None  # SessionWriter thread, started with the first board
+        self.session_board = None  # SessionBoard for the current board
+        
+        # Startup state
+        self.startup_timer = None
+        self.splash = None
+        self.preloader = None
+        self.splash_over = False
+        self.assets_ready = False
 
     def load_deck(self):
         """
         Load the card images from the selected deck configuration.
         
-        Checks if the deck file exists, reads the images, and adds them as shapes.
-        If there is an issue loading the deck, it defaults to the default deck.
+        Uses the deck's cached manifest, so only images that changed since the
+        last load are checked again. Huge decks are sampled instead, so only the
+        faces this board uses are checked. Faces are loaded from the image cache,
+        converting any that are new or changed. Every problem with the deck is
+        reported at once, and if there are any it falls back to the default deck.
+        A deck with too few faces to deal MIN_CARD_COUNT cards is rejected too.
         
         Returns:
-            bool: True if deck loading is successful, False if there is an error.
+            bool: True if deck loading is successful.
+        
+        Raises:
+            DeckError: If the default deck cannot be loaded either.
         """
-        try:
-            deck_path = os.path.join(ASSETS_PATH, self.current_deck)
-            
-            if not os.path.exists(deck_path):
-                # If deck not found, default to the default deck
-                if self.current_deck != 'default_deck.txt':
-                    print(f"Error: Could not find deck file {self.current_deck}. Using default deck.")
-                    self.current_deck = 'default_deck.txt'
-                    return self.load_deck()
-                raise FileNotFoundError(f"Default deck not found!")
-                    
-            with open(deck_path, 'r') as file:
-                self.card_faces = [line.strip() for line in file if line.strip()]
-                
-                # Verify card images exist
-                for card_face in self.card_faces:
-                    card_path = os.path.join(ASSETS_PATH, card_face)
-                    if not os.path.exists(card_path):
-                        if self.current_deck != 'default_deck.txt':
-                            print(f"Error: Could not find card image {card_face}. Using default deck.")
-                            self.current_deck = 'default_deck.txt'
-                            return self.load_deck()
-                        raise FileNotFoundError(f"Card image not found: {card_face}")
-                
-                for card_face in self.card_faces:
-                    self.screen.addshape(os.path.join(ASSETS_PATH, card_face))
-                        
-        except Exception as e:
-            print(f"Error loading deck: {e}")
-            if self.current_deck != 'default_deck.txt':
-                print("Using default deck.")
-                self.current_deck = 'default_deck.txt'
-                return self.load_deck()
-            raise
+        manifest, sources = self.check_deck(self.current_deck)
+        if manifest.errors:
+            for error in manifest.errors:
+                print(f"Error loading deck: {error}")
+            if self.current_deck == DEFAULT_DECK:
+                raise DeckError(self.current_deck, manifest.errors)
+            print("Using default deck.")
+            self.current_deck = DEFAULT_DECK
+            self.deck_rejected = True
+            manifest, sources = self.check_deck(self.current_deck)
+            if manifest.errors:
+                raise DeckError(self.current_deck, manifest.errors)
+        
+        self.assets.add_sources(sources)
+        self.deck_manifest = manifest
+        self.card_faces = manifest.faces
+        # Already registered faces are cache hits and are not decoded again.
+        # Large decks skip this and register faces as they are flipped.
+        if len(manifest.paths) <= EAGER_FACE_LIMIT:
+            for card_path in manifest.paths:
+                self.assets.register(card_path)
                 
         return True
 
+    def check_deck(self, deck_file):
+        """
+        Load a deck's manifest and make sure its faces are in the image cache.
+        
+        Faces that failed to convert are still usable if they are GIFs, which
+        Tk can load directly; any other format is added to the manifest's errors.
+        A huge deck file or a folder of images is streamed once to sample the
+        faces for this board from its seed, and only those are checked and
+        converted, so loading takes as long for a 100,000 face deck as for a
+        small one. A deck in the asset pack was checked and converted when
+        the pack was built, so its manifest comes straight from the pack index.
+        
+        Args:
+            deck_file (str): The deck file or folder name in the assets folder.
+        
+        Returns:
+            tuple: (DeckManifest, dict of face path -> converted file).
+        """
+        pairs = MIN_CARD_COUNT // 2
+        if self.pack is not None and self.pack.has_deck(deck_file):
+            return self.pack.manifest(deck_file).require_faces(pairs), {}
+        if is_streamed_deck(deck_file, self.assets_path):
+            manifest = sample_deck(deck_file, self.card_count // 2, self.seed, self.assets_path)
+            for problem in manifest.skipped:
+                print(f"Skipping card: {problem}")
+        else:
+            manifest = load_manifest(deck_file, self.assets_path)
+        if manifest.require_faces(pairs).errors:
+            return manifest, {}
+        sources = self.image_cache.build(manifest.entries)
+        for error in self.image_cache.errors:
+            print(f"Could not convert card image {error}")
+        for name in unusable_faces(manifest.entries, sources):
+            manifest.errors.append(f"Card image {name} could not be converted")
+        return manifest, sources
+
     def load_new_deck(self):
         """
         Load a new deck configuration file from user input.
@@ -108,17 +202,20 @@ class MemoryGame:
             None
         """
         try:
-            message = "Please add your config file to the assets folder.\nEnter the name of your config file (e.g., custom_deck.txt):"
-            deck_file = self.screen.textinput("Load New Deck", message)
+            message = ("Please add your config file or a folder of images to the assets folder.\n"
+                       "Enter the name of your config file or folder (e.g., custom_deck.txt):")
+            deck_file = self.renderer.textinput("Load New Deck", message)
             
             if deck_file:
-                deck_path = os.path.join(ASSETS_PATH, deck_file)
-                if os.path.exists(deck_path):
+                deck_path = os.path.join(self.assets_path, deck_file)
+                if os.path.exists(deck_path) or (self.pack is not None
+                                                 and self.pack.has_deck(deck_file)):
                     self.current_deck = deck_file
                     self.start_reload()
                 else:
                     print(f"Error: Could not find {deck_file} in assets folder. Using default deck.")
                     self.current_deck = 'default_deck.txt'
+                    self.deck_rejected = True
                     self.start_reload()
                     
         except Exception as e:
@@ -131,147 +228,493 @@ class MemoryGame:
         Reset the game and reload the game board.
         
         Clears the screen, resets game variables, and sets the game back up.
+        Timers left over from the old board are dropped, so a flip-back or
+        win check can never fire on the new board.
         
         Returns:
             None
         """
-        self.screen.clear()
-        self.screen.bgcolor(BG_COLOR)
+        self.clock.new_generation()
+        self.end_replay()
+        self.renderer.clear()
+        self.renderer.bgcolor(BG_COLOR)
         self.matches = 0
         self.guesses = 0
         self.selected_cards = []
-        self.cards = []
+        self.cards = {}
+        self.sprite_pool = []
+        self.logic = None
         self.setup_game()
 
     def setup_game(self):
         """
         Set up the game board and UI components.
         
-        Draws the game border, leaderboard, status bar, and card buttons, then sets up click handling.
+        Deals the board, lays the screen out for the board and the current window size,
+        draws the game border, leaderboard, status bar, cards and buttons, then sets up
+        click and key handling.
         
         Returns:
             None
         """
         try:
-            self.screen.clear()
-            self.screen.bgcolor(BG_COLOR)
+            self.renderer.clear()
+            self.renderer.bgcolor(BG_COLOR)
+            self.ui.reset()
+            self.leaderboard.reset()
             
-            # Draw components
-            self.ui.draw_game_border()
-            self.leaderboard.draw_border()
-            self.leaderboard.display_scores()
-            self.ui.draw_status_bar(self.guesses, self.matches)
-            self.create_cards()
-            self.ui.create_buttons()
-            
-            # Set up click handling
-            self.screen.onclick(self.handle_click)
-            
-            self.screen.update()
+            # Deal first, since the layout depends on how many cards the deck allows
+            self.deal_cards()
+            self.prepare_flips(self.logic.card_images)
+            self.build_board(0)
+            manifest_id = self.deck_manifest.manifest_id if self.deck_manifest else None
+            self.start_session(manifest_id)
+            if self.deck_rejected:
+                self.show_file_error()
             
         except Exception as e:
             print(f"Error setting up game: {e}")
 
-    def create_cards(self):
+    def show_file_error(self):
+        """
+        Show the file error over the board for WARNING_DURATION.
+        
+        Returns:
+            None
+        """
+        self.deck_rejected = False
+        file_error = self.ui.show_file_error()
+        
+        def hide_file_error():
+            self.renderer.hide(file_error)
+            self.clock.request_update()
+        self.clock.schedule(WARNING_DURATION * 1000, hide_file_error)
+
+    def build_board(self, first_row):
         """
-        Create and position the cards on the game board.
+        Lay out and draw a board that has already been dealt.
         
-        Loads the deck, shuffles card faces, and arranges them 
-        in a grid. Each card is created as a turtle
-        with its back facing up.
+        Lays the screen out for the board and the current window size, draws the
+        game border, leaderboard, status bar, cards and buttons, then sets up
+        click and key handling.
+        
+        Args:
+            first_row (int): The first board row to show.
         
         Returns:
             None
         """
-        import random
+        self.layout = BoardLayout(self.card_count, *self.renderer.window_size())
+        
+        # Draw components
+        self.ui.draw_game_border(self.layout)
+        self.leaderboard.draw_border(self.layout)
+        self.leaderboard.display_scores()
+        self.ui.draw_status_bar(self.guesses, self.matches)
+        self.create_cards()
+        self.ui.create_buttons()
+        self.show_rows(first_row)
+        
+        # Set up click and key handling
+        key = self.input_queue.key
+        self.renderer.onclick(self.input_queue.push)
+        self.renderer.onkey(key(lambda: self.scroll(-1)), "Up")
+        self.renderer.onkey(key(lambda: self.scroll(1)), "Down")
+        self.renderer.onkey(key(lambda: self.scroll(-self.layout.visible_rows)), "Prior")
+        self.renderer.onkey(key(lambda: self.scroll(self.layout.visible_rows)), "Next")
+        
+        self.clock.request_update()
+
+    def deal_cards(self):
+        """
+        Load the deck and shuffle the pairs for a new board.
+        
+        If the deck does not have enough faces for the requested number
+        of cards, the board is made as large as the deck allows.
         
-        # Load the deck first
+        Returns:
+            None
+        """
+        # Pick the seed first, since huge decks are sampled from it while loading
+        self.seed = random.getrandbits(63)
         self.load_deck()
+        count = nearest_card_count(self.card_count, 2 * len(self.card_faces))
+        if count != self.card_count:
+            print(f"{self.current_deck} has {len(self.card_faces)} faces, "
+                  f"playing with {count} cards.")
+            self.card_count = count
         
-        # Create shuffled pairs of cards
+        # Create shuffled pairs of cards from a recorded seed, so replays can rebuild the board
+        rng = random.Random(self.seed)
         pairs_needed = self.card_count // 2
-        card_faces = random.sample(self.card_faces, pairs_needed) * 2
-        random.shuffle(card_faces)
+        face_paths = [os.path.join(self.assets_path, face)
+                      for face in rng.sample(self.card_faces, pairs_needed)]
+        self.logic = MemoryGameLogic(face_paths, rng)
+        self.start_replay()
+        
+        # Keep this board's faces registered, re-registering any that were evicted.
+        # Boards with many faces register them as they are flipped instead.
+        board_faces = set(face_paths)
+        self.assets.retain(board_faces)
+        if len(board_faces) <= EAGER_FACE_LIMIT:
+            for face_path in board_faces:
+                self.assets.register(face_path)
 
-        card_back = os.path.join(ASSETS_PATH, "CardBack.gif")
-        self.screen.addshape(card_back)  
+    def prepare_flips(self, face_paths):
+        """
+        Make sure the board's faces and the card back have flip frames, and register them.
         
-        cols = 4
-        for i in range(self.card_count):
-            row = i // cols
-            col = i % cols
-            
-            card = turtle.Turtle()
-            card.hideturtle()
-            card.speed(0)
-            card.penup()
-            card.shape(card_back)
-            card.face = os.path.join(ASSETS_PATH, card_faces[i])
-            card.is_flipped = False
-            card.goto(-550 + col * (100 + 50),
-                     300 - row * (150 + 50))
-            card.showturtle()
-            self.cards.append(card)
+        Frames are only converted the first time a face is seen; after that
+        they come from the image cache. Boards with more faces than
+        EAGER_FACE_LIMIT flip without the animation, unless their frames
+        were built ahead with flip_animation.py.
+        
+        Args:
+            face_paths (iterable): The board's face image paths.
+        
+        Returns:
+            None
+        """
+        board_faces = set(face_paths)
+        if len(board_faces) > EAGER_FACE_LIMIT:
+            return
+        paths = [os.path.join(ASSETS_PATH, CARD_BACK)] + sorted(board_faces)
+        if self.pack is not None:
+            # Frames in the pack need no hashing or converting
+            self.flip_frames.files.update(self.pack.flip_frames(paths, self.flip_frames.widths))
+        self.flip_frames.build(paths)
+        for error in self.flip_frames.errors:
+            print(f"Could not make flip frames for {error}")
+        for path in paths:
+            self.animator.prepare(path)
+
+    def create_cards(self):
+        """
+        Create the card sprites for the visible part of the board.
+        
+        There is one sprite per slot on screen, however big the board is.
+        The rest of the board only exists in the compact logic state, and
+        paging points the same sprites at other cards.
+        
+        Returns:
+            None
+        """
+        card_back = os.path.join(ASSETS_PATH, CARD_BACK)
+        if card_back not in self.assets.entries:
+            self.convert_card_back()
+        self.assets.register(card_back, pinned=True)
+        self.sprite_pool = [self.renderer.create_sprite(card_back, visible=False)
+                            for _ in range(self.layout.slots)]
+
+    def convert_card_back(self):
+        """
+        Make sure the card back is in the image cache, scaled to the card size.
+        
+        The card back is registered from its converted file like the faces.
+        An asset pack already holds it converted.
+        
+        Returns:
+            None
+        """
+        card_back = os.path.join(ASSETS_PATH, CARD_BACK)
+        if self.pack is not None and self.pack.image_data(card_back) is not None:
+            return
+        try:
+            self.assets.add_sources(self.image_cache.build([describe_image(card_back)]))
+        except OSError as e:
+            print(f"Could not read the card back: {e}")
+            return
+        for error in self.image_cache.errors:
+            print(f"Could not convert card image {error}")
+
+    def window_resized(self, width, height):
+        """
+        Lay the board out again once the window stops changing size.
+        
+        Dragging a window edge sends a resize for every step, so the board
+        is only rebuilt once none has come for RESIZE_DELAY_MS.
+        
+        Args:
+            width (int): The new window width in pixels.
+            height (int): The new window height in pixels.
+        
+        Returns:
+            None
+        """
+        if self.resize_timer is not None:
+            self.resize_timer.cancel()
+        self.resize_timer = self.clock.schedule(RESIZE_DELAY_MS, self.relayout)
+
+    def relayout(self):
+        """
+        Rebuild the board view for the current window size.
+        
+        The cards, the selection and the score are kept. Everything is drawn
+        again where the new layout puts it, and the card that was at the top
+        left stays in view.
+        
+        Returns:
+            None
+        """
+        self.resize_timer = None
+        if self.layout is None or self.logic is None or not self.game_active:
+            return
+        if self.renderer.window_size() == self.layout.window_size:
+            return
+        top_card = self.first_row * self.layout.columns
+        columns = BoardLayout(self.card_count, *self.renderer.window_size()).columns
+        self.renderer.clear()
+        self.renderer.bgcolor(BG_COLOR)
+        self.ui.reset()
+        self.leaderboard.reset()
+        self.build_board(top_card // columns)
+        self.save_session()
+
+    def show_rows(self, first_row):
+        """
+        Show the board starting from a row.
+        
+        Moves the pooled sprites onto the cards in view, each showing its
+        back, its face while it is selected, or nothing once it is matched.
+        The click index is rebuilt for the new positions and the change is
+        recorded in the replay.
+        
+        Args:
+            first_row (int): The first board row to show.
+        
+        Returns:
+            None
+        """
+        self.first_row = self.layout.clamp_row(first_row)
+        self.animator.clear()  # Every sprite is given its shape again below
+        
+        # Build the click index for this view, covering cards and buttons
+        self.hit_index = self.layout.hit_index(self.first_row)
+        for name, (x_range, y_range) in self.ui.button_regions().items():
+            self.hit_index.add_region(name, x_range, y_range)
+        if self.replay is not None:
+            self.replay.layout(self.hit_index.columns, self.hit_index.start_x,
+                               self.hit_index.start_y)
+        
+        card_back = os.path.join(ASSETS_PATH, CARD_BACK)
+        self.cards = {}
+        visible = self.layout.visible_cells(self.first_row)
+        for slot, sprite in enumerate(self.sprite_pool):
+            index = visible[slot] if slot < len(visible) else None
+            if index is None or (self.logic.is_matched(index)
+                                 and index not in self.selected_cards):
+                self.renderer.hide(sprite)
+                continue
+            if index in self.selected_cards:
+                self.renderer.set_shape(sprite, self.logic.board.image(index))
+            else:
+                self.renderer.set_shape(sprite, card_back)
+            self.renderer.move_sprite(sprite, *self.hit_index.cell_center(index))
+            self.renderer.show(sprite)
+            self.cards[index] = sprite
+        self.ui.update_page(self.first_row)
+
+    def scroll(self, rows):
+        """
+        Page a board that is too tall for the window up or down.
+        
+        Args:
+            rows (int): How many rows to move; negative moves up.
+        
+        Returns:
+            None
+        """
+        if self.layout is None or not self.game_active:
+            return
+        first_row = self.layout.clamp_row(self.first_row + rows)
+        if first_row != self.first_row:
+            self.show_rows(first_row)
+            self.save_session()
+            self.clock.request_update()
+
+    def start_replay(self):
+        """
+        Start recording a replay of the new board.
+        
+        The replay holds the board's seed and deck, so the replay engine can
+        deal the same board again and check the score.
+        
+        Returns:
+            None
+        """
+        self.end_replay()
+        if self.replays_path is None:
+            return
+        manifest_id = self.deck_manifest.manifest_id if self.deck_manifest else None
+        self.replay = ReplayWriter(replay_path(self.seed, self.replays_path), self.seed,
+                                   self.current_deck, manifest_id, self.card_count,
+                                   self.player_name, self.renderer.clock)
+
+    def end_replay(self):
+        """
+        Save and close the current replay, if one is being recorded.
+        
+        Returns:
+            None
+        """
+        if self.replay is not None:
+            self.replay.close()
+            self.replay = None
+
+    def start_session(self, manifest_id):
+        """
+        Start saving snapshots of the current board, so it can be resumed.
+        
+        The parts of the snapshot that never change are encoded here, once per
+        board, and the first snapshot is saved straight away.
+        
+        Args:
+            manifest_id (str): The deck manifest's id, or None if unknown.
+        
+        Returns:
+            None
+        """
+        self.session_board = None
+        if self.session_path is None:
+            return
+        if self.session_writer is None:
+            self.session_writer = SessionWriter(self.session_path)
+            self.session_writer.start()
+            atexit.register(self.session_writer.close)  # Finish the last write on exit
+        self.session_board = SessionBoard(self.seed, self.current_deck, manifest_id,
+                                          self.player_name, self.logic.board, self.assets.sources)
+        self.save_session()
+
+    def save_session(self):
+        """
+        Save a snapshot of the board after a move.
+        
+        The snapshot is only handed to the writer thread, which replaces any
+        snapshot it has not written yet, so a click never waits for the disk.
+        
+        Returns:
+            None
+        """
+        if self.session_board is not None:
+            self.session_writer.save(self.session_board.snapshot(
+                self.guesses, self.first_row, self.selected_cards))
+
+    def end_session(self):
+        """
+        Stop saving snapshots and delete the saved one, once the board is over.
+        
+        Returns:
+            None
+        """
+        if self.session_board is not None:
+            self.session_board = None
+            self.session_writer.discard()
+
+    def click_target(self, x, y):
+        """
+        Find what a click is on, as it arrives, so clicks that would do nothing are dropped.
+        
+        A card click does nothing while two cards are face up waiting to be
+        compared, or if the card is already face up or matched.
+        
+        Args:
+            x (int): The x-coordinate of the mouse click.
+            y (int): The y-coordinate of the mouse click.
+        
+        Returns:
+            tuple: The (kind, target) hit, or None if the click would do nothing.
+        """
+        hit = self.hit_index.lookup(x, y) if self.hit_index else None
+        if hit is not None and hit[0] == CARD_HIT:
+            index = hit[1]
+            if (index not in self.cards or len(self.selected_cards) >= 2
+                    or index in self.selected_cards or self.logic.is_matched(index)):
+                return None
+        return hit
 
     def handle_click(self, x, y):
         """
         Handle user clicks on cards and buttons.
         
         Checks if the click occurred on the quit button, load new deck button, or a card. 
-        If on a card, it flips the card and checks for matches.
+        If on a card, it flips the card and checks for matches. Clicks from the window
+        come here through the input queue, once per frame.
         
         Args:
             x (int): The x-coordinate of the mouse click.
             y (int): The y-coordinate of the mouse click.
         
         Returns:
-            None
+            bool: True if the click changed anything, so the screen needs updating.
         """
-        if y < -220 and y > -320:
-            if 250 < x < 350:
+        if self.replay is not None:
+            self.replay.click(x, y)
+        hit = self.hit_index.lookup(x, y) if self.hit_index else None
+        if hit is None:
+            return False
+        kind, target = hit
+        if kind == REGION_HIT:
+            if target == QUIT_BUTTON_NAME:
                 self.show_quit_message()
-            elif 120 < x < 220:
+            elif target == LOAD_BUTTON_NAME:
                 self.load_new_deck()
-        else:
-            for card in self.cards:
-                card_x, card_y = card.pos()
-                if (abs(card_x - x) < 50 and abs(card_y - y) < 75):
-                    self.flip_card(card)
-                    break
+            elif target == PAGE_UP_NAME:
+                self.scroll(-self.layout.visible_rows)
+            elif target == PAGE_DOWN_NAME:
+                self.scroll(self.layout.visible_rows)
+        elif kind != CARD_HIT or target not in self.cards or not self.flip_card(target):
+            return False  # An ignored click has nothing new to draw
         
-        self.screen.update()
+        self.clock.request_update()
+        return True
 
-    def flip_card(self, card):
+    def flip_card(self, index):
         """
         Flip the selected card and check for matches.
         
-        Flips the card and checks if two cards are flipped. If the two cards match, they stay flipped.
-        If they don't match, they are flipped back.
+        Flips the card and checks if two cards are flipped. If the two cards match, they are
+        removed and the game checks for a win; if they don't match, they are flipped back.
+        Either way it happens in one game clock timer after CARD_FLIP_DURATION.
         
         Args:
-            card: The card that was clicked.
+            index (int): The index of the card that was clicked.
         
         Returns:
-            None
+            bool: True if the card was flipped, False if the click was ignored.
         """
-        if len(self.selected_cards) >= 2 or card in self.selected_cards:
-            return
+        if (len(self.selected_cards) >= 2 or index in self.selected_cards
+                or self.logic.is_matched(index)):
+            return False
         
-        card.shape(card.face)
-        card.is_flipped = True
-        self.selected_cards.append(card)
+        if self.replay is not None:
+            self.replay.flip(index)
+        image = self.logic.reveal(index)
+        self.assets.register(image)  # A cache hit unless the board is too big to preload
+        self.animator.flip(self.cards[index], os.path.join(ASSETS_PATH, CARD_BACK), image)
+        self.selected_cards.append(index)
         
         # If two cards have been selected, check for a match
         if len(self.selected_cards) == 2:
             self.guesses += 1
-            if self.selected_cards[0].face == self.selected_cards[1].face:
-                self.matches += 1
-                self.screen.ontimer(lambda: self.remove_matched_cards(), 1000)
-                self.screen.ontimer(self.check_win, 1100)
+            if self.logic.check_indices(*self.selected_cards):
+                self.matches = self.logic.matched_pairs()
+                self.clock.schedule(CARD_FLIP_DURATION * 1000, self.finish_match)
             else:
-                self.screen.ontimer(self.flip_back_cards, 1000)
+                self.clock.schedule(CARD_FLIP_DURATION * 1000, self.flip_back_cards)
             
             self.ui.update_status(self.guesses, self.matches)
+        self.save_session()
+        return True
+
+    def finish_match(self):
+        """
+        Remove the matched pair and check if that was the last one.
+        
+        Returns:
+            None
+        """
+        self.remove_matched_cards()
+        self.check_win()
 
     def remove_matched_cards(self):
         """
@@ -282,9 +725,12 @@ class MemoryGame:
         Returns:
             None
         """
-        for card in self.selected_cards:
-            card.hideturtle()
+        for index in self.selected_cards:
+            if index in self.cards:  # The pair may have been paged out of view
+                self.renderer.hide(self.cards[index])
         self.selected_cards = []
+        self.save_session()
+        self.clock.request_update()
 
     def flip_back_cards(self):
         """
@@ -295,12 +741,14 @@ class MemoryGame:
         Returns:
             None
         """
-        card_back = os.path.join(ASSETS_PATH, "CardBack.gif")
-        for card in self.selected_cards:
-            card.shape(card_back)
-            card.is_flipped = False
+        card_back = os.path.join(ASSETS_PATH, CARD_BACK)
+        for index in self.selected_cards:
+            self.logic.hide(index)
+            if index in self.cards:
+                self.animator.flip(self.cards[index], self.logic.board.image(index), card_back)
         self.selected_cards = []
-        self.screen.update()
+        self.save_session()
+        self.clock.request_update()
 
     def check_win(self):
         """
@@ -311,10 +759,16 @@ class MemoryGame:
         Returns:
             None
         """
-        if self.matches == self.card_count // 2:
-            self.leaderboard.update_scores(self.player_name, self.guesses)
-            winner = self.ui.show_winner()
-            self.screen.ontimer(lambda: self.show_end_credits(), 2000)
+        if self.logic is not None and self.logic.check_all_matched():
+            self.leaderboard.update_scores(self.player_name, self.guesses,
+                                           self.current_deck, self.card_count)
+            if self.replay is not None:
+                self.replay.win(self.guesses)
+            self.end_replay()
+            self.end_session()
+            self.ui.show_winner()
+            self.clock.new_generation()
+            self.clock.schedule(2000, self.show_end_credits)
 
     def show_end_credits(self):
         """
@@ -327,19 +781,17 @@ class MemoryGame:
         """
         try:
             #Make end credits fullscreen
-            canvas = self.screen.getcanvas()
-            root = canvas.winfo_toplevel()
-            root.attributes('-fullscreen', True)
+            self.renderer.fullscreen()
             
-            self.screen.clear()
-            self.screen.bgcolor("black")
+            self.renderer.clear()
+            self.renderer.bgcolor("black")
             
             credits_path = os.path.join(ASSETS_PATH, "EndCredits.gif")
-            self.screen.bgpic(credits_path)
-            self.screen.update()
+            self.renderer.bgpic(credits_path)
+            self.clock.request_update()
             
             # Wait 5 seconds then close game
-            self.screen.ontimer(lambda: self.screen.bye(), 5000)
+            self.clock.schedule(END_CREDITS_DURATION * 1000, self.renderer.bye)
             
         except Exception as e:
             print(f"Error showing end credits: {e}")
@@ -353,8 +805,12 @@ class MemoryGame:
         Returns:
             None
         """
-        quit_msg = self.ui.show_quit_message()
-        self.screen.ontimer(lambda: self.show_end_credits(), 3000)
+        if self.replay is not None:
+            self.replay.quit()
+        self.end_replay()
+        self.ui.show_quit_message()
+        self.clock.new_generation()  # Drops a flip-back still waiting on the board
+        self.clock.schedule(QUIT_MESSAGE_DURATION * 1000, self.show_end_credits)
 
     def get_player_name(self):
         """
@@ -365,34 +821,38 @@ class MemoryGame:
         Returns:
             bool: True if a name is entered, False otherwise.
         """
-        name = self.screen.textinput("Player Name", "Enter your name:")
+        name = self.renderer.textinput("Player Name", "Enter your name:")
         if name:
             self.player_name = name.strip()
             return True
         return False
 
-    def get_card_count(self):
+    def get_card_count(self, callback=None):
         """
         Ask the player for the number of cards to play with.
         
-        Requests and validates the number of cards to be used in the game (8, 10, or 12).
+        Requests and validates the number of cards to be used in the game. Any even
+        number from MIN_CARD_COUNT up works; boards too big for the window are paged.
+        If the count has to be rounded, the warning stays up for WARNING_DURATION
+        on an event loop timer instead of blocking.
+        
+        Args:
+            callback (function): Called with no arguments once the count is settled.
         
         Returns:
             None
         """
+        warning = None
         try:
-            count_str = self.screen.textinput("Card Count", 
-                "Enter number of cards (8, 10, or 12):")
+            count_str = self.renderer.textinput("Card Count", 
+                "Enter an even number of cards (8, 10, 12 or more):")
             
             if count_str:
                 count = int(count_str)
                 
-                if count not in VALID_CARD_COUNTS:
+                if count != nearest_card_count(count):
                     warning = self.ui.show_warning()
-                    time.sleep(WARNING_DURATION)
-                    warning.hideturtle()
-                    
-                    count = min(VALID_CARD_COUNTS, key=lambda x: abs(x - count))
+                    count = nearest_card_count(count)
                 
                 self.card_count = count
                 
@@ -402,21 +862,272 @@ class MemoryGame:
             print(f"Error getting card count: {e}")
             self.card_count = DEFAULT_CARD_COUNT
 
+        if warning is not None:
+            def hide_warning():
+                self.renderer.hide(warning)
+                if callback:
+                    callback()
+            self.clock.schedule(WARNING_DURATION * 1000, hide_warning)
+        elif callback:
+            callback()
+
+    def use_pack(self, pack):
+        """
+        Take decks and images from an asset pack before the loose files.
+        
+        Every shape the pack holds is registered from its mapped bytes,
+        including the UI images, and its decks are loaded from its index.
+        Anything else still comes from the assets folder.
+        
+        Args:
+            pack (AssetPack): The open pack, or None to use only the loose files.
+        
+        Returns:
+            None
+        """
+        self.pack = pack
+        self.assets.use_pack(pack)
+
+    def startup_images(self):
+        """
+        List the UI images to preload while the splash screen is showing.
+        
+        Returns:
+            list: Paths to the card back, button and message images.
+        """
+        return [os.path.join(ASSETS_PATH, name) for name in (
+            CARD_BACK, QUIT_BUTTON, LOAD_BUTTON, WINNER_IMAGE, QUIT_MESSAGE, CARD_WARNING, FILE_ERROR
+        )]
+
+    def start(self, timer):
+        """
+        Show the splash screen and preload assets behind it.
+        
+        The deck and image files are read on a background thread, and the
+        shapes are registered a few at a time on event loop ticks. Once the
+        splash has been up for SPLASH_SCREEN_DURATION and everything is
+        loaded, the player is asked for their name and card count.
+        
+        Args:
+            timer (StartupTimer): Records how long each startup stage took.
+        
+        Returns:
+            None
+        """
+        self.startup_timer = timer
+        self.splash = self.ui.show_splash_screen()
+        timer.mark("first_frame")
+        
+        self.preloader = AssetPreloader(self.current_deck, self.startup_images(), self.pack,
+                                        self.assets_path, self.cache_path)
+        self.preloader.start()
+        self.clock.schedule(SPLASH_SCREEN_DURATION * 1000, self.end_splash)
+        self.clock.schedule(STARTUP_TICK_MS, self.preload_tick)
+
+    def end_splash(self):
+        """
+        Note that the splash screen has been up for long enough.
+        
+        Returns:
+            None
+        """
+        self.splash_over = True
+
+    def preload_tick(self):
+        """
+        Register some preloaded shapes, then finish startup once ready.
+        
+        Returns:
+            None
+        """
+        try:
+            done = self.preloader.pump(self.assets, PRELOAD_PER_TICK)
+            if done and not self.assets_ready:
+                self.assets_ready = True
+                self.startup_timer.mark("assets_ready")
+                for error in self.preloader.errors:
+                    print(f"Error preloading assets: {error}")
+            if done and self.splash_over:
+                self.finish_startup()
+            else:
+                self.clock.schedule(STARTUP_TICK_MS, self.preload_tick)
+        except Exception as e:
+            print(f"Error preloading assets: {e}")
+            self.finish_startup()
+
+    def finish_startup(self):
+        """
+        Hide the splash screen, ask for the player's details and build the board.
+        
+        Returns:
+            None
+        """
+        try:
+            if self.splash is not None:
+                self.renderer.hide(self.splash)
+            self.renderer.clear()
+            self.renderer.bgcolor(BG_COLOR)
+            
+            if self.get_player_name():
+                self.startup_timer.mark("prompts_done")
+                self.get_card_count(callback=self.board_ready)
+            else:
+                self.renderer.bye()
+                
+        except Exception as e:
+            print(f"Error in startup: {e}")
+
+    def board_ready(self):
+        """
+        Set up the board and report the startup timings.
+        
+        Returns:
+            None
+        """
+        self.setup_game()
+        self.startup_timer.mark("board_ready")
+        self.startup_timer.report(os.environ.get(STARTUP_REPORT_ENV))
+
+    def resume(self, session, timer):
+        """
+        Rebuild a saved board straight away, skipping the splash screen and prompts.
+        
+        The snapshot already holds the player, the faces and where every card is,
+        so the deck is not loaded or checked again; the faces are only registered,
+        from the image cache files saved with them. A pair that was waiting to
+        flip back is turned face down. A board with every pair matched is scored
+        and won straight away. Resumed boards are not recorded as replays,
+        since the replay engine can only check a board played from the start.
+        If the board cannot be rebuilt, a new game is started instead.
+        
+        Args:
+            session (Session): The snapshot to resume.
+            timer (StartupTimer): Records how long it took until the board was playable.
+        
+        Returns:
+            None
+        """
+        self.startup_timer = timer
+        try:
+            self.player_name = session.player_name
+            self.current_deck = session.deck
+            self.card_count = session.card_count
+            self.seed = session.seed
+            self.guesses = session.guesses
+            self.assets.add_sources(session.sources)
+            self.logic = MemoryGameLogic.from_board(session.board())
+            self.matches = self.logic.matched_pairs()
+            selected = [index for index in session.selected if not self.logic.is_matched(index)]
+            self.selected_cards = selected if len(selected) == 1 else []
+            for index in self.selected_cards:
+                self.logic.reveal(index)
+            
+            board_faces = set(self.logic.card_images)
+            self.assets.retain(board_faces)
+            if len(board_faces) <= EAGER_FACE_LIMIT:
+                for face_path in board_faces:
+                    self.assets.register(face_path)
+            self.prepare_flips(board_faces)
+            timer.mark("session_loaded")
+            
+            self.renderer.clear()
+            self.renderer.bgcolor(BG_COLOR)
+            self.ui.reset()
+            self.leaderboard.reset()
+            self.build_board(session.first_row)
+            self.start_session(session.manifest_id)
+            
+            # A board saved after its last match, but closed before the win was scored
+            self.check_win()
+            
+        except Exception as e:
+            print(f"Could not resume the last game: {e}")
+            self.logic = None
+            self.guesses = self.matches = 0
+            self.selected_cards = []
+            self.renderer.clear()
+            self.start(timer)
+            return
+        timer.mark("board_ready")
+        timer.report(os.environ.get(STARTUP_REPORT_ENV))
+
+def enable_instrumentation(path, renderer_class=TurtleRenderer):
+    """
+    Time the game's hot paths and save the histograms when the game exits.
+    
+    The methods are only wrapped when this is called, so a normal game
+    runs without any timing code.
+    
+    Args:
+        path (str): The .json or .csv file to save the report to.
+        renderer_class (type): The renderer class whose updates and timers are tracked.
+    
+    Returns:
+        Instrumentation: The instrumentation, already installed.
+    """
+    instrumentation = Instrumentation(path)
+    instrumentation.time_method(MemoryGame, "handle_click", "game.handle_click")
+    instrumentation.time_method(MemoryGame, "flip_card", "game.flip_card")
+    instrumentation.time_method(InputQueue, "drain", "input.drain")
+    instrumentation.time_method(FlipAnimator, "frame", "flip.frame")
+    instrumentation.time_method(MemoryGame, "load_deck", "game.load_deck")
+    instrumentation.time_method(GameUI, "update_status", "ui.update_status")
+    instrumentation.time_method(Leaderboard, "display_scores", "leaderboard.display_scores")
+    instrumentation.time_method(renderer_class, "update", "screen.update")
+    # Wraps the timed update, so sampling the counts is not part of its time
+    instrumentation.track_renderer(renderer_class)
+    atexit.register(instrumentation.dump)
+    return instrumentation
+
+def load_session(path):
+    """
+    Read the session snapshot to resume.
+    
+    Args:
+        path (str): The snapshot file.
+    
+    Returns:
+        Session: The snapshot, or None if there is no usable one.
+    """
+    try:
+        session = read_session(path)
+        startup_timer.mark("session_read")
+        return session
+    except FileNotFoundError:
+        print("No unfinished game to resume, starting a new one.")
+    except (OSError, SessionError) as e:
+        print(f"Could not resume the last game: {e}")
+    return None
+
 def main():
     """Run the main game sequence."""
+    parser = argparse.ArgumentParser(description="CS5001 Memory Game")
+    parser.add_argument("--profile", metavar="PATH",
+                        help=f"time the hot paths and save the histograms to a .json or .csv file "
+                             f"(or set {PROFILE_ENV})")
+    parser.add_argument("--resume", nargs="?", const=SESSION_PATH, metavar="PATH",
+                        help="continue the unfinished board from the last game, skipping the "
+                             "splash screen and prompts")
+    parser.add_argument("--fps", type=float, default=1000 / FRAME_MS,
+                        help="the most screen updates per second (default %(default).0f)")
+    parser.add_argument("--pack", nargs="?", const=PACK_PATH, metavar="PATH",
+                        help="load the decks and images from an asset pack built by asset_pack.py")
+    args = parser.parse_args()
+    profile_path = args.profile or os.environ.get(PROFILE_ENV)
+    if profile_path:
+        enable_instrumentation(profile_path)
+    
     try:
+        session = load_session(args.resume) if args.resume else None
         game = MemoryGame()
-        
-        splash = game.ui.show_splash_screen()
-        time.sleep(SPLASH_SCREEN_DURATION)
-        splash.hideturtle()
-        game.screen.clear()
-        game.screen.bgcolor(BG_COLOR)
-        
-        if game.get_player_name():
-            game.get_card_count()
-            game.setup_game()
-            game.screen.mainloop()
+        game.clock.frame_ms = 1000 / max(args.fps, 1)
+        if args.pack:
+            game.use_pack(open_pack(args.pack))
+        if session is not None:
+            game.resume(session, startup_timer)
+        else:
+            game.start(startup_timer)
+        game.renderer.mainloop()
             
     except Exception as e:
         print(f"Error in main: {e}")
@@ -0,0 +1,134 @@
+"""
+Sydney Umezurike
+overlay.py
+CS 5001 - Memory Game
+Retained drawing layer for text and outlines.
+Keeps one persistent pen per item, such as the
+status text or a leaderboard row, and only redraws
+the items whose contents changed.
+"""
+
+
+class OverlayItem:
+    __slots__ = ("kind", "params", "pen", "dirty")
+
+    def __init__(self, kind, params):
+        """Initialize an item that has not been drawn yet.
+
+        Args:
+            kind (str): "text" or "box".
+            params (tuple): Everything needed to draw the item.
+        """
+        self.kind = kind
+        self.params = params
+        self.pen = None  # The renderer pen that owns this item's drawings
+        self.dirty = True
+
+
+class OverlayLayer:
+    def __init__(self, renderer):
+        """Initialize an empty layer.
+
+        Args:
+            renderer (Renderer): The renderer to draw with.
+        """
+        self.renderer = renderer
+        self.items = {}  # Item key -> OverlayItem
+
+    def set_text(self, key, x, y, text, font, color="black"):
+        """Set the contents of a text item.
+
+        Nothing is redrawn until flush, and unchanged text is never redrawn.
+
+        Args:
+            key (str): The name of the item, such as "status".
+            x (int): The x-coordinate of the text.
+            y (int): The y-coordinate of the text.
+            text (str): The text to show. An empty string hides the item.
+            font (tuple): The turtle font.
+            color (str): The text color.
+
+        Returns:
+            None
+        """
+        self._set(key, "text", (x, y, text, font, color))
+
+    def set_box(self, key, x, y, width, height, color="black", pensize=3):
+        """Set an outlined rectangle, drawn down and to the right of (x, y).
+
+        Args:
+            key (str): The name of the item.
+            x (int): The x-coordinate of the top left corner.
+            y (int): The y-coordinate of the top left corner.
+            width (int): The width of the box.
+            height (int): The height of the box.
+            color (str): The outline color.
+            pensize (int): The outline width.
+
+        Returns:
+            None
+        """
+        self._set(key, "box", (x, y, width, height, color, pensize))
+
+    def flush(self):
+        """Redraw every dirty item in place.
+
+        Each item's pen clears only its own drawings before drawing again,
+        so the number of canvas items stays the same after every update.
+
+        Returns:
+            None
+        """
+        for item in self.items.values():
+            if item.dirty:
+                self._draw(item)
+                item.dirty = False
+
+    def reset(self):
+        """Forget every item after the screen has been cleared.
+
+        Clearing the renderer deletes all pens and drawings, so items are
+        recreated the next time they are set.
+
+        Returns:
+            None
+        """
+        self.items = {}
+
+    def _set(self, key, kind, params):
+        """Store new contents for an item and mark it dirty if they changed.
+
+        Args:
+            key (str): The name of the item.
+            kind (str): "text" or "box".
+            params (tuple): Everything needed to draw the item.
+
+        Returns:
+            None
+        """
+        item = self.items.get(key)
+        if item is None:
+            self.items[key] = OverlayItem(kind, params)
+        elif item.params != params or item.kind != kind:
+            item.kind = kind
+            item.params = params
+            item.dirty = True
+
+    def _draw(self, item):
+        """Draw one item with its own pen.
+
+        Args:
+            item (OverlayItem): The item to draw.
+
+        Returns:
+            None
+        """
+        if item.pen is None:
+            item.pen = self.renderer.create_pen()
+        self.renderer.clear_pen(item.pen)  # Removes only this item's old text or outline
+        if item.kind == "text":
+            x, y, text, font, color = item.params
+            if text:
+                self.renderer.write(item.pen, x, y, text, font, color)
+        else:
+            self.renderer.draw_box(item.pen, *item.params)
@@ -0,0 +1,551 @@
+"""
+Sydney Umezurike
+renderer.py
+CS 5001 - Memory Game
+Renderer backends for the Memory Game.
+Every drawing, input and timer call the game makes
+goes through a renderer, so the same game code can
+draw with turtle, run headless with the null backend,
+or log its draw calls with the recording backend.
+"""
+
+import heapq
+import itertools
+import time
+
+
+class Renderer:
+    """The interface every backend implements.
+
+    Sprites are image objects that can be moved, shown and hidden, such as
+    cards and buttons. Pens own the text and outlines they draw and can
+    clear them again, such as the status text.
+    """
+
+    # Screen
+    def setup(self, title, width, height, bgcolor):
+        """Open the window with a title, size and background color."""
+        raise NotImplementedError
+
+    def bgcolor(self, color):
+        """Set the background color."""
+        raise NotImplementedError
+
+    def bgpic(self, path):
+        """Show an image as the background."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Delete every sprite, pen and drawing, and the click and key handlers."""
+        raise NotImplementedError
+
+    def update(self):
+        """Push pending drawing to the display."""
+        raise NotImplementedError
+
+    def fullscreen(self):
+        """Make the window fill the screen."""
+        raise NotImplementedError
+
+    def bye(self):
+        """Close the window."""
+        raise NotImplementedError
+
+    def mainloop(self):
+        """Run the event loop until the window is closed."""
+        raise NotImplementedError
+
+    def window_size(self):
+        """Return the (width, height) of the window in pixels."""
+        raise NotImplementedError
+
+    # Input and timers
+    def onclick(self, handler):
+        """Call handler(x, y) on every mouse click."""
+        raise NotImplementedError
+
+    def onkey(self, handler, key):
+        """Call handler() when a key, such as "Up", is pressed."""
+        raise NotImplementedError
+
+    def onresize(self, handler):
+        """Call handler(width, height) when the window changes size. Kept by clear."""
+        raise NotImplementedError
+
+    def ontimer(self, callback, delay):
+        """Call callback once after delay milliseconds."""
+        raise NotImplementedError
+
+    def textinput(self, title, prompt):
+        """Ask the player for a line of text. Returns None if cancelled."""
+        raise NotImplementedError
+
+    def clock(self):
+        """Return the time in milliseconds on the clock timers run on."""
+        raise NotImplementedError
+
+    # Shapes
+    def add_shape(self, name, data=None):
+        """Register an image shape from a file name, or from base64 data."""
+        raise NotImplementedError
+
+    def remove_shape(self, name):
+        """Unregister an image shape."""
+        raise NotImplementedError
+
+    # Sprites
+    def create_sprite(self, shape, x=0, y=0, visible=True):
+        """Create an image sprite at (x, y) and return it."""
+        raise NotImplementedError
+
+    def set_shape(self, sprite, shape):
+        """Change the image a sprite shows."""
+        raise NotImplementedError
+
+    def move_sprite(self, sprite, x, y):
+        """Move a sprite to (x, y)."""
+        raise NotImplementedError
+
+    def show(self, sprite):
+        """Show a sprite."""
+        raise NotImplementedError
+
+    def hide(self, sprite):
+        """Hide a sprite."""
+        raise NotImplementedError
+
+    # Pens
+    def create_pen(self):
+        """Create a pen for text and outlines and return it."""
+        raise NotImplementedError
+
+    def clear_pen(self, pen):
+        """Delete everything a pen has drawn."""
+        raise NotImplementedError
+
+    def write(self, pen, x, y, text, font, color="black"):
+        """Write text at (x, y) with a pen."""
+        raise NotImplementedError
+
+    def draw_box(self, pen, x, y, width, height, color="black", pensize=3):
+        """Draw an outlined rectangle down and to the right of (x, y)."""
+        raise NotImplementedError
+
+    # Introspection
+    def object_count(self):
+        """Return the number of live sprites and pens."""
+        raise NotImplementedError
+
+    def item_count(self):
+        """Return the number of canvas items, or the backend's equivalent."""
+        raise NotImplementedError
+
+
+class TurtleRenderer(Renderer):
+    def __init__(self):
+        """Open the turtle screen.
+
+        turtle (and with it Tk) is only imported when this backend is created.
+        """
+        import turtle
+        self.turtle = turtle
+        self.screen = turtle.Screen()
+
+    def setup(self, title, width, height, bgcolor):
+        self.screen.title(title)
+        self.screen.bgcolor(bgcolor)
+        self.screen.setup(width=width, height=height)
+        self.screen.tracer(0)
+
+    def bgcolor(self, color):
+        self.screen.bgcolor(color)
+
+    def bgpic(self, path):
+        self.screen.bgpic(path)
+
+    def clear(self):
+        self.screen.clear()
+        self.screen.tracer(0)  # clear turns tracing back on; the game clock decides when to redraw
+
+    def update(self):
+        self.screen.update()
+
+    def fullscreen(self):
+        root = self.screen.getcanvas().winfo_toplevel()
+        root.attributes('-fullscreen', True)
+
+    def bye(self):
+        self.screen.bye()
+
+    def mainloop(self):
+        self.screen.mainloop()
+
+    def window_size(self):
+        return (self.screen.window_width(), self.screen.window_height())
+
+    def onclick(self, handler):
+        self.screen.onclick(handler)
+
+    def onkey(self, handler, key):
+        self.screen.onkey(handler, key)
+        self.screen.listen()
+
+    def onresize(self, handler):
+        # Added to turtle's own binding, which keeps the scroll region in step
+        self.screen.getcanvas().bind(
+            "<Configure>", lambda event: handler(event.width, event.height), add="+")
+
+    def ontimer(self, callback, delay):
+        self.screen.ontimer(callback, delay)
+
+    def textinput(self, title, prompt):
+        return self.screen.textinput(title, prompt)
+
+    def clock(self):
+        return time.monotonic() * 1000
+
+    def add_shape(self, name, data=None):
+        if data is None:
+            self.screen.addshape(name)
+        else:
+            import tkinter
+            image = tkinter.PhotoImage(data=data, master=self.screen.getcanvas())
+            self.screen.addshape(name, self.turtle.Shape("image", image))
+
+    def remove_shape(self, name):
+        # turtle has no public way to unregister a shape
+        self.screen._shapes.pop(name, None)
+
+    def create_sprite(self, shape, x=0, y=0, visible=True):
+        sprite = self.turtle.Turtle()
+        sprite.hideturtle()
+        sprite.speed(0)
+        sprite.penup()
+        sprite.shape(shape)
+        sprite.goto(x, y)
+        if visible:
+            sprite.showturtle()
+        return sprite
+
+    def set_shape(self, sprite, shape):
+        sprite.shape(shape)
+
+    def move_sprite(self, sprite, x, y):
+        sprite.goto(x, y)
+
+    def show(self, sprite):
+        sprite.showturtle()
+
+    def hide(self, sprite):
+        sprite.hideturtle()
+
+    def create_pen(self):
+        pen = self.turtle.Turtle()
+        pen.hideturtle()
+        pen.speed(0)
+        pen.penup()
+        return pen
+
+    def clear_pen(self, pen):
+        pen.clear()
+
+    def write(self, pen, x, y, text, font, color="black"):
+        pen.goto(x, y)
+        pen.color(color)
+        pen.write(text, font=font)
+
+    def draw_box(self, pen, x, y, width, height, color="black", pensize=3):
+        pen.goto(x, y)
+        pen.setheading(0)
+        pen.pendown()
+        pen.pensize(pensize)
+        pen.color(color)
+        for _ in range(2):
+            pen.forward(width)
+            pen.right(90)
+            pen.forward(height)
+            pen.right(90)
+        pen.penup()
+
+    def object_count(self):
+        return len(self.screen.turtles())
+
+    def item_count(self):
+        canvas = self.screen.getcanvas()
+        return len(canvas.find_all()) if hasattr(canvas, "find_all") else 0
+
+
+class Sprite:
+    __slots__ = ("shape", "x", "y", "visible")
+
+    def __init__(self, shape, x, y, visible):
+        """A headless sprite that only remembers its state."""
+        self.shape = shape
+        self.x = x
+        self.y = y
+        self.visible = visible
+
+    def pos(self):
+        return (self.x, self.y)
+
+
+class Pen:
+    __slots__ = ("items",)
+
+    def __init__(self):
+        """A headless pen that only counts what it has drawn."""
+        self.items = 0
+
+
+class NullRenderer(Renderer):
+    def __init__(self, inputs=()):
+        """Initialize a renderer that draws nothing.
+
+        Timers run on a virtual clock, so a whole game can be played at
+        CPU speed with advance or run_until_idle.
+
+        Args:
+            inputs (iterable): Answers returned by textinput, in order.
+        """
+        self.inputs = list(inputs)
+        self.shapes = set()
+        self.sprites = []
+        self.pens = []
+        self.items = 0
+        self.click_handler = None
+        self.key_handlers = {}
+        self.resize_handler = None
+        self.width = 800
+        self.height = 600
+        self.now = 0  # Virtual time in ms
+        self.timers = []  # Heap of (due time, order, callback)
+        self.order = itertools.count()
+        self.closed = False
+
+    def setup(self, title, width, height, bgcolor):
+        self.width = width
+        self.height = height
+
+    def bgcolor(self, color):
+        pass
+
+    def bgpic(self, path):
+        pass
+
+    def clear(self):
+        self.sprites = []
+        self.pens = []
+        self.items = 0
+        self.click_handler = None
+        self.key_handlers = {}
+
+    def update(self):
+        pass
+
+    def fullscreen(self):
+        pass
+
+    def bye(self):
+        self.closed = True
+        self.timers = []
+
+    def mainloop(self):
+        self.run_until_idle()
+
+    def window_size(self):
+        return (self.width, self.height)
+
+    def onclick(self, handler):
+        self.click_handler = handler
+
+    def onkey(self, handler, key):
+        self.key_handlers[key] = handler
+
+    def onresize(self, handler):
+        self.resize_handler = handler
+
+    def ontimer(self, callback, delay):
+        heapq.heappush(self.timers, (self.now + delay, next(self.order), callback))
+
+    def textinput(self, title, prompt):
+        return self.inputs.pop(0) if self.inputs else None
+
+    def clock(self):
+        return self.now
+
+    def add_shape(self, name, data=None):
+        self.shapes.add(name)
+
+    def remove_shape(self, name):
+        self.shapes.discard(name)
+
+    def create_sprite(self, shape, x=0, y=0, visible=True):
+        sprite = Sprite(shape, x, y, visible)
+        self.sprites.append(sprite)
+        return sprite
+
+    def set_shape(self, sprite, shape):
+        sprite.shape = shape
+
+    def move_sprite(self, sprite, x, y):
+        sprite.x = x
+        sprite.y = y
+
+    def show(self, sprite):
+        sprite.visible = True
+
+    def hide(self, sprite):
+        sprite.visible = False
+
+    def create_pen(self):
+        pen = Pen()
+        self.pens.append(pen)
+        return pen
+
+    def clear_pen(self, pen):
+        self.items -= pen.items
+        pen.items = 0
+
+    def write(self, pen, x, y, text, font, color="black"):
+        pen.items += 1
+        self.items += 1
+
+    def draw_box(self, pen, x, y, width, height, color="black", pensize=3):
+        pen.items += 4
+        self.items += 4
+
+    def object_count(self):
+        return len(self.sprites) + len(self.pens)
+
+    def item_count(self):
+        return self.items + len(self.sprites)
+
+    def click(self, x, y):
+        """Simulate a click at (x, y).
+
+        Args:
+            x (float): The x-coordinate of the click.
+            y (float): The y-coordinate of the click.
+
+        Returns:
+            None
+        """
+        if self.click_handler is not None:
+            self.click_handler(x, y)
+
+    def press(self, key):
+        """Simulate a key press.
+
+        Args:
+            key (str): The key name, such as "Down".
+
+        Returns:
+            None
+        """
+        handler = self.key_handlers.get(key)
+        if handler is not None:
+            handler()
+
+    def resize(self, width, height):
+        """Simulate the player resizing the window.
+
+        Args:
+            width (int): The new window width in pixels.
+            height (int): The new window height in pixels.
+
+        Returns:
+            None
+        """
+        self.width = width
+        self.height = height
+        if self.resize_handler is not None:
+            self.resize_handler(width, height)
+
+    def advance(self, ms):
+        """Move the virtual clock forward, running timers that come due.
+
+        Args:
+            ms (int): How far to move the clock.
+
+        Returns:
+            None
+        """
+        end = self.now + ms
+        while self.timers and self.timers[0][0] <= end:
+            due, _, callback = heapq.heappop(self.timers)
+            self.now = max(self.now, due)
+            callback()
+        self.now = end
+
+    def run_until_idle(self, limit=1000000):
+        """Run timers in order until none are left.
+
+        Args:
+            limit (int): The most timers to run, to stop endless timer chains.
+
+        Returns:
+            None
+        """
+        for _ in range(limit):
+            if not self.timers:
+                break
+            due, _, callback = heapq.heappop(self.timers)
+            self.now = max(self.now, due)
+            callback()
+
+
+class RecordingRenderer(NullRenderer):
+    def __init__(self, inputs=()):
+        """Initialize a null renderer that logs every call.
+
+        Args:
+            inputs (iterable): Answers returned by textinput, in order.
+        """
+        super().__init__(inputs)
+        self.calls = []  # (method name, args) in call order
+
+    def __getattribute__(self, name):
+        attribute = super().__getattribute__(name)
+        if name in RECORDED_CALLS:
+            calls = super().__getattribute__("calls")
+
+            def record(*args, **kwargs):
+                calls.append((name, args + tuple(kwargs.values())))
+                return attribute(*args, **kwargs)
+            return record
+        return attribute
+
+    def count(self, name):
+        """Return how many times a renderer method was called.
+
+        Args:
+            name (str): The method name, such as "update".
+
+        Returns:
+            int: The number of calls.
+        """
+        return sum(1 for call, _ in self.calls if call == name)
+
+
+# Renderer methods the RecordingRenderer logs
+RECORDED_CALLS = frozenset(
+    name for name, value in vars(Renderer).items()
+    if callable(value) and not name.startswith("_")
+    and name not in ("clock", "window_size", "object_count", "item_count")
+)
+
+
+def create_renderer(backend="turtle", **kwargs):
+    """Create a renderer by name.
+
+    Args:
+        backend (str): "turtle", "null" or "recording".
+        **kwargs: Passed on to the renderer.
+
+    Returns:
+        Renderer: The new renderer.
+    """
+    backends = {"turtle": TurtleRenderer, "null": NullRenderer, "recording": RecordingRenderer}
+    if backend not in backends:
+        raise ValueError(f"Unknown renderer backend {backend!r}, expected one of {sorted(backends)}")
+    return backends[backend](**kwargs)
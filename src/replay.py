@@ -0,0 +1,524 @@
+"""
+Sydney Umezurike
+replay.py
+CS 5001 - Memory Game
+Compact binary replay logs and a replay engine.
+A replay holds the seed the board was shuffled with,
+the deck it came from, and every click and flip with
+its time. The engine plays a replay back through
+MemoryGameLogic without drawing anything, to check the
+score it claims, and can scan whole folders of replays.
+
+Usage:
+    python src/replay.py show assets/replays/<file>.mgr
+    python src/replay.py verify assets/replays
+"""
+
+import argparse
+import os
+import random
+import struct
+import time
+from game_logic import MemoryGameLogic
+from deck_manifest import load_manifest, is_streamed_deck, sample_deck
+from spatial_index import SpatialIndex
+from constants import (ASSETS_PATH, REPLAYS_PATH, CARD_FLIP_DURATION, CARD_WIDTH, CARD_HEIGHT,
+                       CARD_SPACING)
+
+REPLAY_MAGIC = b"MGRP"
+REPLAY_VERSION = 4  # Version 2 added layout events, version 3 widened the card count
+READABLE_VERSIONS = (1, 2, 3, 4)  # Version 4 records the card size
+REPLAY_SUFFIX = ".mgr"
+
+# magic, version, seed, card count, manifest id, start time, card width, height and spacing
+HEADER = struct.Struct("<4sBQI8sdHHH")
+# Version 3 did not record the card size
+V3_HEADER = struct.Struct("<4sBQI8sd")
+# Versions 1 and 2 also stored the card count in two bytes
+OLD_HEADER = struct.Struct("<4sBQH8sd")
+CLICK_POSITION = struct.Struct("<ff")
+GRID = struct.Struct("<Hff")  # columns, first card's center x and y
+
+# Event kinds
+CLICK = 1
+FLIP = 2
+WIN = 3
+QUIT = 4
+LAYOUT = 5
+
+# Bytes kept in memory before a replay is written out
+REPLAY_BUFFER_SIZE = 64 * 1024
+
+# Shortest time between a guess and the next flip, with some slack for timer jitter
+FLIP_BACK_MS = CARD_FLIP_DURATION * 1000 - 50
+
+
+class ReplayError(Exception):
+    pass
+
+
+def write_varint(buffer, value):
+    """Append an unsigned integer using 7 bits per byte.
+
+    Args:
+        buffer (bytearray): Where to append.
+        value (int): The value, 0 or more.
+
+    Returns:
+        None
+    """
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, offset):
+    """Read an unsigned integer written by write_varint.
+
+    Args:
+        data (bytes): The replay bytes.
+        offset (int): Where the integer starts.
+
+    Returns:
+        tuple: (value, offset just past it).
+    """
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ReplayError("Replay ends in the middle of a number")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def pack_text(text):
+    """Encode a short string as a length byte and UTF-8 bytes."""
+    encoded = text.encode("utf-8")[:255]
+    return bytes([len(encoded)]) + encoded
+
+
+class ReplayWriter:
+    def __init__(self, path, seed, deck, manifest_id, card_count, player_name, clock,
+                 card_size=(CARD_WIDTH, CARD_HEIGHT, CARD_SPACING)):
+        """Start a replay for a new board.
+
+        Events are kept in memory and written in large chunks, so recording
+        a click costs a few bytes appended to a buffer.
+
+        Args:
+            path (str): The replay file to write.
+            seed (int): The seed the board was shuffled with.
+            deck (str): The deck file name.
+            manifest_id (str): The deck manifest's id (16 hex digits).
+            card_count (int): The number of cards on the board.
+            player_name (str): The player's name.
+            clock (function): Returns the current time in milliseconds.
+            card_size (tuple): The card width, height and spacing the board is laid out with.
+        """
+        self.path = path
+        self.clock = clock
+        self.last_time = clock()
+        self.written = False
+        self.closed = False
+        self.buffer = bytearray(HEADER.pack(
+            REPLAY_MAGIC, REPLAY_VERSION, seed, card_count,
+            bytes.fromhex(manifest_id or "0" * 16), time.time(), *card_size))
+        self.buffer += pack_text(deck)
+        self.buffer += pack_text(player_name)
+
+    def _event(self, kind):
+        """Start an event: its kind, then ms since the previous event."""
+        now = self.clock()
+        self.buffer.append(kind)
+        write_varint(self.buffer, max(0, round(now - self.last_time)))
+        self.last_time = now
+
+    def click(self, x, y):
+        """Record a click at (x, y)."""
+        self._event(CLICK)
+        self.buffer += CLICK_POSITION.pack(x, y)
+        self._maybe_flush()
+
+    def flip(self, index):
+        """Record a card being flipped face up."""
+        self._event(FLIP)
+        write_varint(self.buffer, index)
+        self._maybe_flush()
+
+    def win(self, moves):
+        """Record the game being won with the score sent to the leaderboard."""
+        self._event(WIN)
+        write_varint(self.buffer, moves)
+
+    def quit(self):
+        """Record the player quitting."""
+        self._event(QUIT)
+
+    def layout(self, columns, start_x, start_y):
+        """Record where the cards are on screen, when dealt and after paging."""
+        self._event(LAYOUT)
+        self.buffer += GRID.pack(columns, start_x, start_y)
+
+    def _maybe_flush(self):
+        if len(self.buffer) >= REPLAY_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write buffered events to the replay file.
+
+        Failing to write is reported but never stops the game.
+
+        Returns:
+            None
+        """
+        if not self.buffer:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab" if self.written else "wb") as file:
+                file.write(self.buffer)
+            self.written = True
+        except OSError as e:
+            print(f"Could not save replay {self.path}: {e}")
+        self.buffer = bytearray()
+
+    def close(self):
+        """Write everything left and stop recording.
+
+        Returns:
+            None
+        """
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+
+def replay_path(seed, folder=REPLAYS_PATH):
+    """Return a new replay file name for a board.
+
+    Args:
+        seed (int): The board's seed.
+        folder (str): The folder replays are saved in.
+
+    Returns:
+        str: The path.
+    """
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(folder, f"{stamp}_{seed:016x}{REPLAY_SUFFIX}")
+
+
+class Replay:
+    def __init__(self, data, path=""):
+        """Parse a replay's header; events are read lazily by events().
+
+        Args:
+            data (bytes): The whole replay file.
+            path (str): Where it was read from, for messages.
+
+        Raises:
+            ReplayError: If the data is not a replay.
+        """
+        if len(data) < OLD_HEADER.size or data[:4] != REPLAY_MAGIC:
+            raise ReplayError(f"{path or 'data'} is not a replay")
+        version = data[4]
+        if version not in READABLE_VERSIONS:
+            raise ReplayError(f"{path}: unsupported replay version {version}")
+        header = HEADER if version >= 4 else V3_HEADER if version == 3 else OLD_HEADER
+        if len(data) < header.size:
+            raise ReplayError(f"{path}: replay header is cut short")
+        magic, version, seed, card_count, manifest_id, started, *card_size = header.unpack_from(data)
+        self.path = path
+        self.data = data
+        self.version = version
+        self.card_size = tuple(card_size) or None  # Width, height and spacing; None before version 4
+        self.seed = seed
+        self.card_count = card_count
+        self.manifest_id = manifest_id.hex()
+        self.started = started
+        offset = header.size
+        self.deck, offset = self._text(offset)
+        self.player_name, offset = self._text(offset)
+        self.events_offset = offset
+
+    def _text(self, offset):
+        if offset >= len(self.data):
+            raise ReplayError(f"{self.path}: replay header is cut short")
+        length = self.data[offset]
+        end = offset + 1 + length
+        return self.data[offset + 1:end].decode("utf-8", "replace"), end
+
+    def events(self):
+        """Yield every event as (kind, time in ms since the start, value).
+
+        The value is (x, y) for a click, the card index for a flip, the
+        claimed moves for a win, (columns, start_x, start_y) for a layout
+        and None for a quit.
+        """
+        data = self.data
+        offset = self.events_offset
+        now = 0
+        while offset < len(data):
+            kind = data[offset]
+            delta, offset = read_varint(data, offset + 1)
+            now += delta
+            if kind == CLICK:
+                if offset + CLICK_POSITION.size > len(data):
+                    raise ReplayError(f"{self.path}: click is cut short")
+                value = CLICK_POSITION.unpack_from(data, offset)
+                offset += CLICK_POSITION.size
+            elif kind == FLIP or kind == WIN:
+                value, offset = read_varint(data, offset)
+            elif kind == LAYOUT:
+                if offset + GRID.size > len(data):
+                    raise ReplayError(f"{self.path}: layout is cut short")
+                value = GRID.unpack_from(data, offset)
+                offset += GRID.size
+            elif kind == QUIT:
+                value = None
+            else:
+                raise ReplayError(f"{self.path}: unknown event {kind} at byte {offset}")
+            yield kind, now, value
+
+
+def read_replay(path):
+    """Read a replay file.
+
+    Args:
+        path (str): The replay file.
+
+    Returns:
+        Replay: The parsed replay.
+    """
+    with open(path, "rb") as file:
+        return Replay(file.read(), path)
+
+
+class ReplayResult:
+    def __init__(self, replay, moves, won, claimed, problems):
+        """The outcome of playing a replay back.
+
+        Args:
+            replay (Replay): The replay.
+            moves (int): The moves counted by playing it back.
+            won (bool): True if every pair was matched.
+            claimed (int): The moves the replay says were submitted, or None.
+            problems (list): Everything that did not add up.
+        """
+        self.replay = replay
+        self.moves = moves
+        self.won = won
+        self.claimed = claimed
+        self.problems = problems
+
+    @property
+    def valid(self):
+        """True if the replay plays back cleanly and matches its claimed score."""
+        return not self.problems
+
+
+class ReplayEngine:
+    def __init__(self, assets_path=ASSETS_PATH, check_timing=True):
+        """Initialize an engine that plays replays back without drawing.
+
+        Args:
+            assets_path (str): The folder holding the decks.
+            check_timing (bool): Also check no flip came before the cards settled.
+        """
+        self.assets_path = assets_path
+        self.check_timing = check_timing
+        self.decks = {}  # (deck file, manifest id) -> face names, or an error message
+
+    def deck_faces(self, deck, manifest_id):
+        """Return the face names a replay was shuffled from.
+
+        Args:
+            deck (str): The deck file name.
+            manifest_id (str): The manifest id recorded in the replay.
+
+        Returns:
+            list: The face names in deck order.
+
+        Raises:
+            ReplayError: If the deck has errors or changed since the recording.
+        """
+        key = (deck, manifest_id)
+        if key not in self.decks:
+            manifest = load_manifest(deck, self.assets_path)
+            if manifest.errors:
+                self.decks[key] = f"deck {deck} has errors: {'; '.join(manifest.errors)}"
+            elif manifest.manifest_id != manifest_id:
+                self.decks[key] = f"deck {deck} changed since the game was recorded"
+            else:
+                self.decks[key] = manifest.faces
+        faces = self.decks[key]
+        if isinstance(faces, str):
+            raise ReplayError(faces)
+        return faces
+
+    def board(self, replay):
+        """Rebuild a replay's board exactly as MemoryGame.create_cards shuffled it.
+
+        Args:
+            replay (Replay): The replay.
+
+        Returns:
+            MemoryGameLogic: The board, with nothing flipped yet.
+        """
+        if is_streamed_deck(replay.deck, self.assets_path):
+            # Huge decks were sampled for the board from its seed, so sample them again
+            sample = sample_deck(replay.deck, replay.card_count // 2, replay.seed, self.assets_path)
+            if sample.errors:
+                raise ReplayError(f"deck {replay.deck} has errors: {'; '.join(sample.errors)}")
+            if sample.manifest_id != replay.manifest_id:
+                raise ReplayError(f"deck {replay.deck} changed since the game was recorded")
+            faces = sample.faces
+        else:
+            faces = self.deck_faces(replay.deck, replay.manifest_id)
+        rng = random.Random(replay.seed)
+        if replay.card_count // 2 > len(faces):
+            raise ReplayError(f"deck {replay.deck} has too few faces for {replay.card_count} cards")
+        return MemoryGameLogic(rng.sample(faces, replay.card_count // 2), rng)
+
+    def verify(self, replay, claimed=None):
+        """Play a replay back and check it against the score it claims.
+
+        Every flip must land on a card that was clicked, follow the flip
+        rules, and (with check_timing) come after the previous guess settled.
+        Replays from before version 4 do not record the card size, so where
+        their clicks landed is unknown and they are refused.
+
+        Args:
+            replay (Replay): The replay.
+            claimed (int): A score to check, such as a leaderboard entry.
+                Defaults to the score recorded in the replay's win event.
+
+        Returns:
+            ReplayResult: What the replay adds up to.
+        """
+        if replay.card_size is None:
+            return ReplayResult(replay, 0, False, claimed, [
+                f"layout unknown: version {replay.version} replays do not record the card size"])
+        problems = []
+        try:
+            logic = self.board(replay)
+        except ReplayError as e:
+            return ReplayResult(replay, 0, False, claimed, [str(e)])
+
+        hit_index = None  # Set by the layout recorded when the board was dealt
+        selected = []
+        moves = 0
+        recorded = None
+        last_click = None
+        settled_at = 0  # When the last guess's cards were put back or removed
+        try:
+            for kind, now, value in replay.events():
+                if kind == CLICK:
+                    last_click = value
+                elif kind == LAYOUT:
+                    columns, start_x, start_y = value
+                    hit_index = SpatialIndex(replay.card_count, max(1, columns), start_x, start_y,
+                                             *replay.card_size)
+                elif kind == FLIP:
+                    if len(selected) == 2:
+                        if self.check_timing and now < settled_at:
+                            problems.append(f"flip at {now} ms came before the last guess settled")
+                        selected = []
+                    if hit_index is None:
+                        problems.append(f"layout unknown: flip of card {value} at {now} ms "
+                                        "came before any layout")
+                    elif last_click is None or hit_index.card_at(*last_click) != value:
+                        problems.append(f"flip of card {value} at {now} ms had no click on it")
+                    last_click = None
+                    if (not 0 <= value < replay.card_count or value in selected
+                            or logic.is_matched(value)):
+                        problems.append(f"flip of card {value} at {now} ms is not allowed")
+                        continue
+                    logic.reveal(value)
+                    selected.append(value)
+                    if len(selected) == 2:
+                        moves += 1
+                        if not logic.check_indices(*selected):
+                            logic.hide(selected[0])
+                            logic.hide(selected[1])
+                        settled_at = now + FLIP_BACK_MS
+                elif kind == WIN:
+                    recorded = value
+        except ReplayError as e:
+            problems.append(str(e))
+
+        won = logic.check_all_matched()
+        if claimed is None:
+            claimed = recorded
+        if claimed is not None:
+            if not won:
+                problems.append(f"claims {claimed} moves but the board was not cleared")
+            elif claimed != moves:
+                problems.append(f"claims {claimed} moves but the replay took {moves}")
+        return ReplayResult(replay, moves, won, claimed, problems)
+
+    def scan(self, folder):
+        """Verify every replay in a folder, one file at a time.
+
+        Args:
+            folder (str): The folder to scan.
+
+        Yields:
+            tuple: (path, ReplayResult), or (path, error message) for unreadable files.
+        """
+        with os.scandir(folder) as entries:
+            paths = sorted(entry.path for entry in entries
+                           if entry.name.endswith(REPLAY_SUFFIX) and entry.is_file())
+        for path in paths:
+            try:
+                yield path, self.verify(read_replay(path))
+            except (OSError, ReplayError) as e:
+                yield path, str(e)
+
+
+def main():
+    """Show one replay or verify a folder of replays."""
+    parser = argparse.ArgumentParser(description="Memory Game replays")
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="print a replay's events")
+    show.add_argument("path")
+    verify = commands.add_parser("verify", help="check every replay in a folder")
+    verify.add_argument("folder", nargs="?", default=REPLAYS_PATH)
+    verify.add_argument("--no-timing", action="store_true", help="skip the timing check")
+    args = parser.parse_args()
+
+    if args.command == "show":
+        replay = read_replay(args.path)
+        print(f"{replay.player_name!r} on {replay.deck} ({replay.manifest_id}), "
+              f"{replay.card_count} cards, seed {replay.seed}, card size {replay.card_size}")
+        names = {CLICK: "click", FLIP: "flip", WIN: "win", QUIT: "quit", LAYOUT: "layout"}
+        for kind, now, value in replay.events():
+            print(f"{now:>8} ms  {names[kind]:<6}{'' if value is None else value}")
+        return
+
+    engine = ReplayEngine(check_timing=not args.no_timing)
+    start = time.perf_counter()
+    counts = {"valid": 0, "invalid": 0, "unfinished": 0, "unreadable": 0}
+    for path, result in engine.scan(args.folder):
+        if isinstance(result, str):
+            counts["unreadable"] += 1
+            print(f"{os.path.basename(path)}: {result}")
+        elif not result.valid:
+            counts["invalid"] += 1
+            print(f"{os.path.basename(path)}: {'; '.join(result.problems)}")
+        elif result.claimed is None:
+            counts["unfinished"] += 1
+        else:
+            counts["valid"] += 1
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(", ".join(f"{count} {name}" for name, count in counts.items())
+          + f" ({total} replays in {elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
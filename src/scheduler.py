@@ -0,0 +1,185 @@
+"""
+Sydney Umezurike
+scheduler.py
+CS 5001 - Memory Game
+Game clock that runs every delayed action in the game.
+Timers can be cancelled, and each one belongs to a
+generation, so starting a new board drops every timer
+left over from the old one. Queued clicks are applied
+after the timers, and all changes made during a tick
+are drawn with a single screen update.
+"""
+
+import heapq
+import itertools
+import math
+from constants import FRAME_MS
+
+
+class Timer:
+    __slots__ = ("due", "callback", "generation", "cancelled")
+
+    def __init__(self, due, callback, generation):
+        """A scheduled callback.
+
+        Args:
+            due (float): When it should run, in clock milliseconds.
+            callback (function): Called with no arguments.
+            generation (int): The clock generation it was scheduled in.
+        """
+        self.due = due
+        self.callback = callback
+        self.generation = generation
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the callback from running.
+
+        Returns:
+            None
+        """
+        self.cancelled = True
+
+
+class GameClock:
+    def __init__(self, renderer, frame_ms=FRAME_MS):
+        """Initialize the clock on top of a renderer's timers.
+
+        Only one renderer timer is waiting at a time, set for the earliest
+        thing the clock has to do.
+
+        Args:
+            renderer (Renderer): The renderer whose clock and timers are used.
+            frame_ms (int): The shortest time between two screen updates.
+        """
+        self.renderer = renderer
+        self.frame_ms = frame_ms
+        self.generation = 0
+        self.timers = []  # Heap of (due, order, Timer)
+        self.order = itertools.count()
+        self.tick_due = None  # When the waiting renderer timer fires, or None
+        self.ticking = False
+        self.dirty = False  # True if something changed since the last update
+        self.last_update = -math.inf
+        self.updates = 0
+        self.input = None  # InputQueue drained on every tick, set by the queue
+
+    def now(self):
+        """Return the current time in milliseconds."""
+        return self.renderer.clock()
+
+    def schedule(self, delay, callback):
+        """Run a callback after a delay, unless it is cancelled first.
+
+        Args:
+            delay (float): The delay in milliseconds.
+            callback (function): Called with no arguments.
+
+        Returns:
+            Timer: The timer, which can be cancelled.
+        """
+        timer = Timer(self.now() + delay, callback, self.generation)
+        heapq.heappush(self.timers, (timer.due, next(self.order), timer))
+        self._arm(timer.due)
+        return timer
+
+    def new_generation(self):
+        """Drop every pending timer and queued click, such as when a new board is dealt.
+
+        Timers from the old generation never run, even if they are already
+        due in the tick that is running now.
+
+        Returns:
+            None
+        """
+        self.generation += 1
+        self.timers = []
+        if self.input is not None:
+            self.input.clear()
+
+    def pending(self):
+        """Return how many timers are still waiting to run."""
+        return sum(1 for _, _, timer in self.timers
+                   if not timer.cancelled and timer.generation == self.generation)
+
+    def queued(self):
+        """Return how many timers are queued, counting cancelled ones not dropped yet."""
+        return len(self.timers)
+
+    def reset(self):
+        """Forget every timer, queued click and requested update.
+
+        For callers that also throw away the renderer's waiting timer, such
+        as benchmarks that time the same moves over and over.
+
+        Returns:
+            None
+        """
+        self.new_generation()
+        self.tick_due = None
+        self.dirty = False
+
+    def request_update(self):
+        """Ask for the screen to be updated on the next tick.
+
+        Any number of requests before that tick share one update.
+
+        Returns:
+            None
+        """
+        if not self.dirty:
+            self.dirty = True
+            self._arm(max(self.now(), self.last_update + self.frame_ms))
+
+    def request_frame(self):
+        """Ask for a tick on the next frame, to apply queued input.
+
+        The tick is no sooner than frame_ms after the last update, so input
+        arriving faster than the frame rate is applied in batches.
+
+        Returns:
+            None
+        """
+        self._arm(max(self.now(), self.last_update + self.frame_ms))
+
+    def _arm(self, due):
+        """Make sure a renderer timer fires by a given time."""
+        if self.ticking or (self.tick_due is not None and self.tick_due <= due):
+            return  # A running tick arms the next one when it ends
+        self.tick_due = due
+        delay = max(0, math.ceil(due - self.now()))
+        self.renderer.ontimer(lambda: self._tick(due), delay)
+
+    def _tick(self, due):
+        """Run every due timer, then update the screen once if anything changed.
+
+        A timer that raises is reported and the rest still run, and the
+        next tick is always armed, so one failing action never stops the clock.
+        """
+        if self.tick_due == due:
+            self.tick_due = None
+        now = self.now()
+        self.ticking = True
+        try:
+            while self.timers and self.timers[0][0] <= now:
+                _, _, timer = heapq.heappop(self.timers)
+                if not timer.cancelled and timer.generation == self.generation:
+                    try:
+                        timer.callback()
+                    except Exception as e:
+                        print(f"Error in game timer {timer.callback!r}: {e}")
+            if self.input is not None and self.input.events:
+                self.input.drain()
+        finally:
+            self.ticking = False
+            if self.dirty and now >= self.last_update + self.frame_ms:
+                self.dirty = False
+                self.last_update = now
+                self.updates += 1
+                self.renderer.update()
+                if self.input is not None:
+                    self.input.presented(now)
+            if self.dirty:
+                self._arm(self.last_update + self.frame_ms)
+            if self.timers:
+                self._arm(self.timers[0][0])
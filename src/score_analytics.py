@@ -0,0 +1,410 @@
+"""
+Sydney Umezurike
+score_analytics.py
+CS 5001 - Memory Game
+Streaming summaries of every leaderboard result.
+Each partition (all results, one player, one deck or
+one card count) keeps a count, a mean and a mergeable
+quantile sketch in constant memory. They are updated
+as results are saved, so percentiles never need a
+scan of the history.
+
+The sketch stores counts in logarithmic buckets, so
+any quantile it returns is within a fixed relative
+error of the true one, and two sketches merge by
+adding their buckets.
+"""
+
+import math
+import struct
+import sys
+from array import array
+
+# Quantiles are within this relative error; small move counts each get their own bucket
+SKETCH_ACCURACY = 0.01
+
+# Values at or below this are counted in the zero bucket
+MIN_SKETCH_VALUE = 1e-9
+
+# relative accuracy, count, total, minimum, maximum, zero count, first bucket, bucket count
+SKETCH_HEADER = struct.Struct("<dQdddQiI")
+
+# Results folded in between saved snapshots of the summaries
+SNAPSHOT_EVERY = 256
+
+# Metrics kept per partition
+MOVES = "moves"
+EFFICIENCY = "efficiency"
+
+
+class QuantileSketch:
+    __slots__ = ("relative_accuracy", "log_gamma", "offset", "counts", "zero_count",
+                 "count", "total", "minimum", "maximum")
+
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY):
+        """Create an empty sketch.
+
+        Args:
+            relative_accuracy (float): The relative error allowed on quantiles.
+        """
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(gamma)
+        self.offset = 0  # Bucket index of counts[0]
+        self.counts = array("Q")  # Dense bucket counts, so encoding is one copy
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    @property
+    def mean(self):
+        """The mean of every value added, or None if the sketch is empty."""
+        return self.total / self.count if self.count else None
+
+    def index(self, value):
+        """Return the bucket a positive value falls in."""
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def add(self, value, count=1):
+        """Add a value.
+
+        Args:
+            value (float): The value, zero or more.
+            count (int): How many times to add it.
+
+        Returns:
+            None
+        """
+        if value <= MIN_SKETCH_VALUE:
+            self.zero_count += count
+        else:
+            key = self.index(value)
+            self._cover(key, key)
+            self.counts[key - self.offset] += count
+        self.count += count
+        self.total += value * count
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other):
+        """Add every value of another sketch with the same accuracy.
+
+        Args:
+            other (QuantileSketch): The sketch to merge in.
+
+        Returns:
+            None
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same accuracy can be merged")
+        if other.counts:
+            self._cover(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            for i, count in enumerate(other.counts):
+                self.counts[start + i] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def quantile(self, q):
+        """Return the value at a quantile.
+
+        Args:
+            q (float): The quantile, from 0 to 1.
+
+        Returns:
+            float: The value, or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(0.0, self.minimum)
+        gamma = math.exp(self.log_gamma)
+        for i, count in enumerate(self.counts):
+            seen += count
+            if rank < seen:
+                value = 2 * gamma ** (self.offset + i) / (gamma + 1)
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+    def count_below(self, value):
+        """Return how many values fall in buckets below the value's bucket."""
+        if value <= MIN_SKETCH_VALUE:
+            return 0
+        position = self.index(value) - self.offset
+        return self.zero_count + sum(self.counts[:max(0, position)])
+
+    def count_above(self, value):
+        """Return how many values fall in buckets above the value's bucket."""
+        if value <= MIN_SKETCH_VALUE:
+            return self.count - self.zero_count
+        position = self.index(value) - self.offset
+        return sum(self.counts[max(0, position + 1):])
+
+    def to_bytes(self):
+        """Encode the sketch.
+
+        Returns:
+            bytes: The encoded sketch.
+        """
+        counts = self.counts
+        if sys.byteorder == "big":
+            counts = array("Q", counts)
+            counts.byteswap()
+        header = SKETCH_HEADER.pack(self.relative_accuracy, self.count, self.total, self.minimum,
+                                    self.maximum, self.zero_count, self.offset, len(counts))
+        return header + counts.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a sketch saved with to_bytes.
+
+        Args:
+            data (bytes): The encoded sketch.
+
+        Returns:
+            QuantileSketch: The sketch.
+        """
+        (accuracy, count, total, minimum, maximum,
+         zero_count, offset, length) = SKETCH_HEADER.unpack_from(data)
+        sketch = cls(accuracy)
+        sketch.counts.frombytes(data[SKETCH_HEADER.size:SKETCH_HEADER.size + 8 * length])
+        if sys.byteorder == "big":
+            sketch.counts.byteswap()
+        sketch.offset = offset
+        sketch.zero_count = zero_count
+        sketch.count = count
+        sketch.total = total
+        sketch.minimum = minimum
+        sketch.maximum = maximum
+        return sketch
+
+    def _cover(self, low, high):
+        """Grow the bucket array so it holds buckets low to high."""
+        if not self.counts:
+            self.offset = low
+            self.counts = array("Q", bytes(8 * (high - low + 1)))
+            return
+        if low < self.offset:
+            self.counts = array("Q", bytes(8 * (self.offset - low))) + self.counts
+            self.offset = low
+        last = self.offset + len(self.counts) - 1
+        if high > last:
+            self.counts.extend(array("Q", bytes(8 * (high - last))))
+
+
+def partitions(name, deck, card_count, efficiency):
+    """Return the summaries one result goes into.
+
+    Moves are only comparable on boards of the same size, so they are
+    summarized per card count. Efficiency is comparable everywhere, so
+    it is summarized overall, per player and per deck.
+
+    Args:
+        name (str): The player's name.
+        deck (str): The deck file, or "".
+        card_count (int): The number of cards, 0 if unknown.
+        efficiency (float): The efficiency score, or None.
+
+    Returns:
+        list: ((partition, metric), value) pairs.
+    """
+    targets = []
+    if card_count:
+        targets.append(((f"count:{card_count}", MOVES), None))
+    if efficiency is not None:
+        targets.append((("all", EFFICIENCY), efficiency))
+        targets.append(((f"player:{name}", EFFICIENCY), efficiency))
+        if deck:
+            targets.append(((f"deck:{deck}", EFFICIENCY), efficiency))
+    return targets
+
+
+class ScoreAnalytics:
+    def __init__(self, relative_accuracy=SKETCH_ACCURACY, snapshot_every=SNAPSHOT_EVERY):
+        """Keep the summaries of a score database in memory.
+
+        The results table works as a log: new results are folded in by
+        id, with one range query, whenever this or another connection has
+        written. The summaries are saved in the summaries table, with the
+        last result id they include, every snapshot_every results and
+        when the store closes, so opening a big database only reads the
+        snapshot and the few results after it.
+
+        Args:
+            relative_accuracy (float): The accuracy of new sketches.
+            snapshot_every (int): Results folded in between snapshots.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.snapshot_every = snapshot_every
+        self.sketches = {}  # (partition, metric) -> QuantileSketch
+        self.last_ids = {}  # (partition, metric) -> id of the last result folded into it
+        self.through = None  # Every result up to this id is summarized
+        self.generation = None  # Changes when the summaries are rebuilt
+        self.data_version = None
+        self.pending = 0  # Results folded in since the last snapshot
+
+    def catch_up(self, connection, force=False):
+        """Fold in results saved since the last call.
+
+        Args:
+            connection (sqlite3.Connection): The score database, or a cursor.
+            force (bool): Look for new results even if no other connection
+                wrote, as after this connection saves one.
+
+        Returns:
+            int: The number of results folded in.
+        """
+        version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.data_version and self.through is not None:
+            if not force:
+                return 0
+        elif self.through is None or self._meta(connection, "summaries_generation") != self.generation:
+            self.load(connection)
+        self.data_version = version
+        rows = connection.execute(
+            "SELECT id, name, moves, deck, card_count, efficiency FROM results "
+            "WHERE id > ? ORDER BY id", (self.through,)).fetchall()
+        self.fold(rows)
+        return len(rows)
+
+    def fold(self, rows):
+        """Add results to the summaries in memory.
+
+        Args:
+            rows (list): (id, name, moves, deck, card_count, efficiency) tuples, by id.
+
+        Returns:
+            None
+        """
+        for result_id, name, moves, deck, card_count, efficiency in rows:
+            for key, value in partitions(name, deck, card_count, efficiency):
+                sketch = self.sketches.get(key)
+                if sketch is None:
+                    sketch = self.sketches[key] = QuantileSketch(self.relative_accuracy)
+                sketch.add(moves if value is None else value)
+                self.last_ids[key] = result_id
+            self.through = result_id
+        self.pending += len(rows)
+
+    def get(self, connection, partition, metric):
+        """Return the summary of a partition, empty if it has no results.
+
+        Args:
+            connection (sqlite3.Connection): The score database.
+            partition (str): For example "all", "player:Sam" or "count:12".
+            metric (str): MOVES or EFFICIENCY.
+
+        Returns:
+            QuantileSketch: The summary. Do not change it.
+        """
+        self.catch_up(connection)
+        sketch = self.sketches.get((partition, metric))
+        return sketch if sketch is not None else QuantileSketch(self.relative_accuracy)
+
+    def load(self, connection):
+        """Read the saved snapshot, dropping whatever is in memory.
+
+        Args:
+            connection (sqlite3.Connection): The score database, or a cursor.
+
+        Returns:
+            None
+        """
+        self.sketches = {(partition, metric): QuantileSketch.from_bytes(data) for partition, metric, data
+                         in connection.execute("SELECT partition, metric, data FROM summaries")}
+        self.last_ids = {}
+        self.through = int(self._meta(connection, "summaries_through") or 0)
+        self.generation = self._meta(connection, "summaries_generation")
+        self.pending = 0
+
+    def flush(self, cursor):
+        """Save the summaries that changed since the stored snapshot.
+
+        Another process may have saved a snapshot too. Only the partitions
+        with results after the stored one's last id are written, and
+        nothing is written if the stored one is already as new.
+
+        Args:
+            cursor (sqlite3.Cursor): A cursor in a write transaction.
+
+        Returns:
+            int: The number of summaries written.
+        """
+        if self.through is None:
+            return 0
+        if self._meta(cursor, "summaries_generation") != self.generation:
+            self.through = None  # Rebuilt elsewhere; reload on next use
+            return 0
+        stored = int(self._meta(cursor, "summaries_through") or 0)
+        self.pending = 0
+        if stored >= self.through:
+            return 0
+        changed = [key for key, last_id in self.last_ids.items() if last_id > stored]
+        cursor.executemany(
+            "INSERT OR REPLACE INTO summaries (partition, metric, data) VALUES (?, ?, ?)",
+            [(partition, metric, self.sketches[(partition, metric)].to_bytes())
+             for partition, metric in changed])
+        cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('summaries_through', ?)",
+                       (str(self.through),))
+        return len(changed)
+
+    def rebuild(self, cursor):
+        """Summarize every stored result again and save a new snapshot.
+
+        Other connections see the new generation and reload it.
+
+        Args:
+            cursor (sqlite3.Cursor): A cursor in a write transaction.
+
+        Returns:
+            int: The number of results summarized.
+        """
+        self.sketches = {}
+        self.last_ids = {}
+        self.through = 0
+        rows = cursor.execute(
+            "SELECT id, name, moves, deck, card_count, efficiency FROM results ORDER BY id").fetchall()
+        self.fold(rows)
+        self.generation = str(int(self._meta(cursor, "summaries_generation") or 0) + 1)
+        cursor.execute("DELETE FROM summaries")
+        cursor.executemany(
+            "INSERT INTO summaries (partition, metric, data) VALUES (?, ?, ?)",
+            [(partition, metric, sketch.to_bytes())
+             for (partition, metric), sketch in self.sketches.items()])
+        cursor.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                           [("summaries_through", str(self.through)),
+                            ("summaries_generation", self.generation)])
+        self.data_version = None
+        self.pending = 0
+        return len(rows)
+
+    def _meta(self, connection, key):
+        """Return a value from the meta table, or None."""
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+
+def share_beaten(sketch, value, higher_is_better=False):
+    """Return the share of the other results in a summary that a value beats.
+
+    Args:
+        sketch (QuantileSketch): A summary that already includes the value.
+        value (float): The result to rank.
+        higher_is_better (bool): True for efficiency, False for moves.
+
+    Returns:
+        float: From 0 to 1, or None if there are no other results.
+    """
+    if sketch.count < 2:
+        return None
+    beaten = sketch.count_below(value) if higher_is_better else sketch.count_above(value)
+    return beaten / (sketch.count - 1)
@@ -0,0 +1,433 @@
+"""
+Sydney Umezurike
+score_store.py
+CS 5001 - Memory Game
+Storage engine for leaderboard results.
+Keeps every result in a SQLite database in WAL
+mode so several game processes can save scores
+at the same time without losing any, and keeps
+small top-K heaps per deck and card count so the
+leaderboard can be read without sorting. Results
+also carry an efficiency score, so games on boards
+of different sizes can be ranked together, and feed
+the streaming summaries in score_analytics.py.
+"""
+
+import heapq
+import os
+import sqlite3
+import time
+from constants import ASSETS_PATH, LEADERBOARD_DB, LEADERBOARD_FILE
+from score_analytics import ScoreAnalytics
+
+# How many of the best results each in-memory heap keeps
+TOP_K = 10
+
+# How long a writer waits for another process to release the lock, in ms
+BUSY_TIMEOUT = 5000
+
+# Partition key for results that are not tied to a deck or card count
+ALL = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    moves INTEGER NOT NULL,
+    deck TEXT NOT NULL DEFAULT '',
+    card_count INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    efficiency REAL
+);
+CREATE INDEX IF NOT EXISTS results_by_moves ON results (moves, id);
+CREATE INDEX IF NOT EXISTS results_by_deck ON results (deck, moves, id);
+CREATE INDEX IF NOT EXISTS results_by_count ON results (card_count, moves, id);
+CREATE TABLE IF NOT EXISTS summaries (
+    partition TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (partition, metric)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class ScoreStore:
+    def __init__(self, db_path=None, legacy_path=None, top_k=TOP_K):
+        """Open (or create) the score database.
+
+        Args:
+            db_path (str): The database file. Defaults to LEADERBOARD_DB in the assets folder.
+            legacy_path (str): The old leaderboard text file to migrate from.
+            top_k (int): How many of the best results each heap keeps.
+        """
+        if db_path is None:
+            db_path = os.path.join(ASSETS_PATH, LEADERBOARD_DB)
+        if legacy_path is None:
+            legacy_path = os.path.join(ASSETS_PATH, LEADERBOARD_FILE)
+        self.db_path = db_path
+        self.top_k = top_k
+        self.connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT / 1000,
+                                          isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+        self.connection.executescript(SCHEMA)
+        self.add_efficiency_column()
+        self.heaps = {}  # Partition key -> max-heap of (-moves, -id, name)
+        self.most_efficient = None  # Cached top_efficiency rows
+        self.data_version = None
+        self.analytics = ScoreAnalytics()
+        self.migrate_text_file(legacy_path)
+
+    def close(self):
+        """Save the summaries and close the database connection.
+
+        Returns:
+            None
+        """
+        if self.analytics.pending:
+            with self._write() as cursor:
+                self.analytics.flush(cursor)
+        self.connection.close()
+
+    def add_efficiency_column(self):
+        """Add the efficiency column to databases made before it existed.
+
+        Returns:
+            bool: True if the column had to be added.
+        """
+        added = False
+        with self._write() as cursor:
+            columns = [row[1] for row in cursor.execute("PRAGMA table_info(results)")]
+            if "efficiency" not in columns:
+                cursor.execute("ALTER TABLE results ADD COLUMN efficiency REAL")
+                added = True
+            cursor.execute("CREATE INDEX IF NOT EXISTS results_by_efficiency "
+                           "ON results (efficiency DESC, id)")
+        return added
+
+    def summary(self, partition, metric):
+        """Return the streaming summary of a partition of the results.
+
+        Args:
+            partition (str): "all", "player:<name>", "deck:<deck>" or "count:<cards>".
+            metric (str): MOVES for card counts, EFFICIENCY for the rest.
+
+        Returns:
+            QuantileSketch: The summary, with count, mean and quantiles.
+        """
+        return self.analytics.get(self.connection, partition, metric)
+
+    def fill_efficiency(self, score):
+        """Score older results that were saved without an efficiency.
+
+        Only results with a known card count can be scored.
+
+        Args:
+            score (function): Takes (moves, card_count) and returns the
+                efficiency, or None.
+
+        Returns:
+            int: The number of results scored.
+        """
+        with self._write() as cursor:
+            rows = cursor.execute(
+                "SELECT id, moves, card_count FROM results "
+                "WHERE efficiency IS NULL AND card_count > 0").fetchall()
+            updates = [(score(moves, card_count), result_id) for result_id, moves, card_count in rows]
+            updates = [update for update in updates if update[0] is not None]
+            cursor.executemany("UPDATE results SET efficiency = ? WHERE id = ?", updates)
+            if updates:
+                # Old results changed rather than new ones added, so start again
+                self.analytics.rebuild(cursor)
+        if updates:
+            self.most_efficient = None
+        return len(updates)
+
+    def migrate_text_file(self, path):
+        """Import the old name,moves leaderboard file once.
+
+        Lines that are not a name and a whole number of moves are skipped
+        and reported, and the rest are still imported.
+
+        Args:
+            path (str): The path to the old leaderboard text file.
+
+        Returns:
+            int: The number of results imported.
+        """
+        imported = 0
+        with self._write() as cursor:
+            done = cursor.execute("SELECT 1 FROM meta WHERE key = 'migrated_text'").fetchone()
+            if done or not os.path.exists(path):
+                return 0
+            rows = []
+            with open(path, "r") as file:
+                for number, line in enumerate(file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        name, moves = line.strip().rsplit(",", 1)
+                        rows.append((name, int(moves), time.time()))
+                    except ValueError:
+                        print(f"Skipping line {number} of {path}, expected name,moves: {line.strip()!r}")
+            cursor.executemany(
+                "INSERT INTO results (name, moves, created) VALUES (?, ?, ?)", rows)
+            cursor.execute("INSERT INTO meta (key, value) VALUES ('migrated_text', ?)", (path,))
+            imported = len(rows)
+        self.heaps.clear()
+        return imported
+
+    def add_result(self, name, moves, deck="", card_count=0, efficiency=None):
+        """Save one finished game.
+
+        The insert is a single atomic transaction. The heaps are updated in
+        place, so the next top-N read does not touch the database, and the
+        result is folded into the streaming summaries.
+
+        Args:
+            name (str): The player's name.
+            moves (int): The number of moves the game took.
+            deck (str): The deck file the game was played with.
+            card_count (int): The number of cards on the board.
+            efficiency (float): Expected moves over actual moves, if known.
+
+        Returns:
+            int: The id of the new result.
+        """
+        with self._write() as cursor:
+            cursor.execute(
+                "INSERT INTO results (name, moves, deck, card_count, created, efficiency) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (name, moves, deck or "", card_count or 0, time.time(), efficiency))
+            result_id = cursor.lastrowid
+        # Another process may have written since our last read
+        if self._refresh_version():
+            for key in (ALL, ("deck", deck or ""), ("count", card_count or 0)):
+                heap = self.heaps.get(key)
+                if heap is not None:
+                    self._push(heap, moves, result_id, name)
+            if self.most_efficient is not None:
+                self._insert_efficient((name, moves, card_count or 0, efficiency))
+        self._update_summaries()
+        return result_id
+
+    def top(self, n=TOP_K, deck=None, card_count=None):
+        """Return the best results, fewest moves first.
+
+        Args:
+            n (int): How many results to return.
+            deck (str): Only results for this deck. Defaults to all decks.
+            card_count (int): Only results for this card count. Defaults to all counts.
+
+        Returns:
+            list: (name, moves) tuples.
+        """
+        if deck is not None and card_count is not None:
+            # Combined filters are rare, so go straight to the index
+            rows = self.connection.execute(
+                "SELECT name, moves FROM results WHERE deck = ? AND card_count = ? "
+                "ORDER BY moves, id LIMIT ?", (deck, card_count, n)).fetchall()
+            return rows
+        if n > self.top_k:
+            return self._query(self._key(deck, card_count), n)
+        self._refresh_version()
+        key = self._key(deck, card_count)
+        heap = self.heaps.get(key)
+        if heap is None:
+            heap = self.heaps[key] = [(-moves, -result_id, name) for result_id, name, moves
+                                      in self._query_rows(key, self.top_k)]
+            heapq.heapify(heap)
+        best = sorted(heap, reverse=True)[:n]
+        return [(name, -neg_moves) for neg_moves, _, name in best]
+
+    def top_efficiency(self, n=TOP_K):
+        """Return the most efficient results, best first.
+
+        Results without an efficiency come last, fewest moves first. Like
+        the heaps, the best rows are kept in memory and updated in place
+        when a result is added.
+
+        Args:
+            n (int): How many results to return.
+
+        Returns:
+            list: (name, moves, card_count, efficiency) tuples.
+        """
+        if n > self.top_k:
+            return self._query_efficient(n)
+        self._refresh_version()
+        if self.most_efficient is None:
+            self.most_efficient = self._query_efficient(self.top_k)
+        return self.most_efficient[:n]
+
+    def count(self):
+        """Return the number of stored results.
+
+        Returns:
+            int: The number of results.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _key(self, deck, card_count):
+        """Return the heap partition key for a deck or card count filter.
+
+        Args:
+            deck (str): A deck filter or None.
+            card_count (int): A card count filter or None.
+
+        Returns:
+            tuple: The partition key, or ALL.
+        """
+        if deck is not None:
+            return ("deck", deck)
+        if card_count is not None:
+            return ("count", card_count)
+        return ALL
+
+    def _query(self, key, n):
+        """Return the best n results of a partition from the database.
+
+        Args:
+            key (tuple): The partition key.
+            n (int): How many results to return.
+
+        Returns:
+            list: (name, moves) tuples.
+        """
+        return [(name, moves) for _, name, moves in self._query_rows(key, n)]
+
+    def _query_rows(self, key, n):
+        """Run the indexed top-n query for a partition.
+
+        Args:
+            key (tuple): The partition key.
+            n (int): How many rows to return.
+
+        Returns:
+            list: (id, name, moves) rows.
+        """
+        if key is ALL:
+            sql, args = "SELECT id, name, moves FROM results", ()
+        elif key[0] == "deck":
+            sql, args = "SELECT id, name, moves FROM results WHERE deck = ?", (key[1],)
+        else:
+            sql, args = "SELECT id, name, moves FROM results WHERE card_count = ?", (key[1],)
+        return self.connection.execute(sql + " ORDER BY moves, id LIMIT ?", args + (n,)).fetchall()
+
+    def _query_efficient(self, n):
+        """Run the indexed most efficient query, topped up with unscored results.
+
+        Args:
+            n (int): How many rows to return.
+
+        Returns:
+            list: (name, moves, card_count, efficiency) rows.
+        """
+        rows = self.connection.execute(
+            "SELECT name, moves, card_count, efficiency FROM results "
+            "WHERE efficiency IS NOT NULL ORDER BY efficiency DESC, id LIMIT ?", (n,)).fetchall()
+        if len(rows) < n:
+            rows += self.connection.execute(
+                "SELECT name, moves, card_count, efficiency FROM results "
+                "WHERE efficiency IS NULL ORDER BY moves, id LIMIT ?", (n - len(rows),)).fetchall()
+        return rows
+
+    def _push(self, heap, moves, result_id, name):
+        """Add a result to a bounded max-heap if it is among the best.
+
+        Args:
+            heap (list): The heap of (-moves, -id, name).
+            moves (int): The number of moves.
+            result_id (int): The id of the result, used to break ties.
+            name (str): The player's name.
+
+        Returns:
+            None
+        """
+        entry = (-moves, -result_id, name)
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def _insert_efficient(self, row):
+        """Add a new result to the cached top_efficiency rows if it belongs there.
+
+        A new result ranks after older ones with the same efficiency.
+
+        Args:
+            row (tuple): (name, moves, card_count, efficiency).
+
+        Returns:
+            None
+        """
+        rows = self.most_efficient
+        efficiency = row[3]
+        for position, (_, moves, _, other) in enumerate(rows):
+            if efficiency is None:
+                if other is None and moves > row[1]:
+                    break
+            elif other is None or other < efficiency:
+                break
+        else:
+            position = len(rows)
+        rows.insert(position, row)
+        del rows[self.top_k:]
+
+    def _update_summaries(self):
+        """Fold new results into the summaries, saving a snapshot now and then.
+
+        Returns:
+            None
+        """
+        self.analytics.catch_up(self.connection, force=True)
+        if self.analytics.pending >= self.analytics.snapshot_every:
+            with self._write() as cursor:
+                self.analytics.flush(cursor)
+
+    def _refresh_version(self):
+        """Drop the heaps if another connection changed the database.
+
+        Returns:
+            bool: True if the heaps are still valid, False if they were dropped.
+        """
+        version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.data_version:
+            self.data_version = version
+            self.heaps.clear()
+            self.most_efficient = None
+            return False
+        return True
+
+    def _write(self):
+        """Return a context manager for one locked write transaction.
+
+        Returns:
+            _Transaction: The transaction.
+        """
+        return _Transaction(self.connection)
+
+
+class _Transaction:
+    def __init__(self, connection):
+        """Wrap a connection in a BEGIN IMMEDIATE transaction.
+
+        Args:
+            connection (sqlite3.Connection): The connection, in autocommit mode.
+        """
+        self.connection = connection
+
+    def __enter__(self):
+        """Take the write lock and return a cursor."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection.cursor()
+
+    def __exit__(self, exc_type, exc, tb):
+        """Commit, or roll back if the block raised."""
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,341 @@
+"""
+Sydney Umezurike
+session.py
+CS 5001 - Memory Game
+Session snapshots for resuming an unfinished board.
+A snapshot is one small binary file holding the deck,
+the face of every card, what is matched or face up,
+the guesses and the player's name. The parts that
+never change during a board are encoded once, so a
+snapshot after a move only copies the matched bits,
+and a background thread writes the newest one to disk
+atomically, off the click path.
+
+Usage:
+    python src/session.py show assets/session.mgs
+"""
+
+import argparse
+import os
+import struct
+import threading
+import time
+from array import array
+from board import Board, Bitset, FaceTable
+from replay import ReplayError, pack_text, read_varint, write_varint
+from constants import ASSETS_PATH, SESSION_PATH
+
+SESSION_MAGIC = b"MGSS"
+SESSION_VERSION = 2  # Version 2 faces are converted at the smaller card size
+
+# magic, version, seed, card count, manifest id, guesses, first row, save time
+HEADER = struct.Struct("<4sBQI8sIId")
+
+# Queued in place of a snapshot to delete the file instead
+_DISCARD = object()
+
+
+class SessionError(Exception):
+    pass
+
+
+def pack_long_text(text):
+    """Encode a string of any length as a varint length and UTF-8 bytes."""
+    encoded = text.encode("utf-8")
+    buffer = bytearray()
+    write_varint(buffer, len(encoded))
+    return bytes(buffer) + encoded
+
+
+def _relative(path):
+    """Store paths in the assets folder relative to it, so the game folder can move."""
+    prefix = ASSETS_PATH + os.sep
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+class SessionBoard:
+    def __init__(self, seed, deck, manifest_id, player_name, board, sources):
+        """Encode the parts of a board's snapshots that never change.
+
+        Args:
+            seed (int): The seed the board was shuffled with, or None.
+            deck (str): The deck file name.
+            manifest_id (str): The deck manifest's id (16 hex digits), or None.
+            player_name (str): The player's name.
+            board (Board): The board; its matched bits are read on every snapshot.
+            sources (dict): Face path -> converted file in the image cache.
+        """
+        self.seed = seed or 0
+        self.manifest_id = bytes.fromhex(manifest_id or "0" * 16)
+        self.board = board
+        static = bytearray(pack_text(deck))
+        static += pack_text(player_name)
+        # Faces and their image cache files as two blocks of NUL separated paths
+        write_varint(static, len(board.table))
+        images = board.table.images
+        static += pack_long_text("\0".join(map(_relative, images)))
+        static += pack_long_text("\0".join(_relative(sources.get(image, "")) for image in images))
+        static += board.face_ids.typecode.encode("ascii")
+        static += board.face_ids.tobytes()
+        self.static = bytes(static)
+
+    def snapshot(self, guesses, first_row, selected):
+        """Encode the board as it is now.
+
+        Only the header, the matched bits and the selected cards are new
+        bytes; the rest is shared with every other snapshot of the board.
+
+        Args:
+            guesses (int): The guesses so far.
+            first_row (int): The first board row on screen.
+            selected (list): The face up, unmatched cards.
+
+        Returns:
+            list: The snapshot's bytes, in parts, for SessionWriter.save.
+        """
+        header = HEADER.pack(SESSION_MAGIC, SESSION_VERSION, self.seed, len(self.board),
+                             self.manifest_id, guesses, first_row, time.time())
+        tail = bytearray(self.board.matched.bits)
+        write_varint(tail, len(selected))
+        for index in selected:
+            write_varint(tail, index)
+        return [header, self.static, tail]
+
+
+class Session:
+    def __init__(self, data, path=""):
+        """Parse a snapshot.
+
+        Args:
+            data (bytes): The whole snapshot file.
+            path (str): Where it was read from, for messages.
+
+        Raises:
+            SessionError: If the data is not a complete snapshot.
+        """
+        if len(data) < HEADER.size or data[:4] != SESSION_MAGIC:
+            raise SessionError(f"{path or 'data'} is not a session snapshot")
+        (magic, version, self.seed, self.card_count, manifest_id,
+         self.guesses, self.first_row, self.saved) = HEADER.unpack_from(data)
+        if version != SESSION_VERSION:
+            raise SessionError(f"{path}: unsupported session version {version}")
+        self.path = path
+        self.manifest_id = manifest_id.hex()
+        try:
+            offset = HEADER.size
+            self.deck, offset = self._text(data, offset)
+            self.player_name, offset = self._text(data, offset)
+            face_count, offset = read_varint(data, offset)
+            images, offset = self._paths(data, offset, face_count)
+            sources, offset = self._paths(data, offset, face_count)
+            self.images = images
+            self.sources = {image: source for image, source in zip(images, sources)
+                            if source}  # Face path -> converted file in the image cache
+            typecode = chr(data[offset])
+            if typecode not in "BHI":
+                raise ValueError(f"unknown face id type {typecode!r}")
+            self.face_ids = array(typecode)
+            offset += 1
+            end = offset + self.face_ids.itemsize * self.card_count
+            self.face_ids.frombytes(data[offset:end])
+            offset = end
+            end = offset + (self.card_count + 7) // 8
+            self.matched = data[offset:end]
+            selected_count, offset = read_varint(data, end)
+            self.selected = []
+            for _ in range(selected_count):
+                index, offset = read_varint(data, offset)
+                self.selected.append(index)
+        except (IndexError, ValueError, ReplayError) as e:
+            raise SessionError(f"{path}: snapshot is cut short or damaged ({e})")
+        if (len(self.face_ids) != self.card_count or len(self.matched) != (self.card_count + 7) // 8
+                or (self.card_count and max(self.face_ids) >= face_count)
+                or any(index >= self.card_count for index in self.selected)):
+            raise SessionError(f"{path}: snapshot does not describe a whole board")
+
+    @staticmethod
+    def _text(data, offset):
+        length = data[offset]
+        end = offset + 1 + length
+        if end > len(data):
+            raise IndexError("text runs past the end")
+        return data[offset + 1:end].decode("utf-8", "replace"), end
+
+    @staticmethod
+    def _paths(data, offset, count):
+        length, offset = read_varint(data, offset)
+        end = offset + length
+        if end > len(data):
+            raise IndexError("paths run past the end")
+        paths = data[offset:end].decode("utf-8", "replace").split("\0") if count else []
+        if len(paths) != count:
+            raise ValueError(f"{len(paths)} paths for {count} faces")
+        prefix = ASSETS_PATH + os.sep
+        return [prefix + path if path and not os.path.isabs(path) else path for path in paths], end
+
+    def board(self):
+        """Rebuild the board with its matched cards.
+
+        Returns:
+            Board: The board, with every card face down.
+        """
+        board = Board(self.face_ids, FaceTable.from_unique(self.images))
+        board.matched = Bitset.from_bytes(self.matched, self.card_count)
+        return board
+
+
+def read_session(path=SESSION_PATH):
+    """Read a session snapshot.
+
+    Args:
+        path (str): The snapshot file.
+
+    Returns:
+        Session: The parsed snapshot.
+
+    Raises:
+        OSError: If the file cannot be read.
+        SessionError: If it is not a valid snapshot.
+    """
+    with open(path, "rb") as file:
+        return Session(file.read(), path)
+
+
+class SessionWriter(threading.Thread):
+    def __init__(self, path=SESSION_PATH):
+        """Initialize the thread that writes snapshots.
+
+        Only the newest snapshot is kept, so a burst of moves while a
+        write is in progress becomes one more write, not a queue.
+
+        Args:
+            path (str): The snapshot file.
+        """
+        super().__init__(name="session-writer", daemon=True)
+        self.path = path
+        self.condition = threading.Condition()
+        self.pending = None  # Newest snapshot parts, _DISCARD, or None
+        self.busy = False
+        self.closed = False
+        self.writes = 0
+        self.replaced = 0  # Snapshots replaced by a newer one before being written
+        self.errors = []
+
+    def save(self, parts):
+        """Queue a snapshot to be written, replacing any not written yet.
+
+        Args:
+            parts (list): Bytes from SessionBoard.snapshot.
+
+        Returns:
+            None
+        """
+        with self.condition:
+            if self.pending is not None:
+                self.replaced += 1
+            self.pending = parts
+            self.condition.notify_all()
+
+    def discard(self):
+        """Delete the snapshot, after any write already in progress.
+
+        Returns:
+            None
+        """
+        with self.condition:
+            self.pending = _DISCARD
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                parts, self.pending = self.pending, None
+                self.busy = True
+            try:
+                if parts is _DISCARD:
+                    self._remove()
+                else:
+                    self._write(parts)
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def _write(self, parts):
+        """Write a snapshot to a temporary file and move it into place."""
+        temp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(temp, "wb") as file:
+                file.writelines(parts)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp, self.path)
+            self.writes += 1
+        except OSError as e:
+            self.errors.append(str(e))
+            print(f"Could not save session {self.path}: {e}")
+
+    def _remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.errors.append(str(e))
+            print(f"Could not remove session {self.path}: {e}")
+
+    def flush(self, timeout=None):
+        """Wait until every queued snapshot has been written.
+
+        Args:
+            timeout (float): The most seconds to wait. Defaults to no limit.
+
+        Returns:
+            bool: True if nothing is left to write.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending is None and not self.busy, timeout)
+
+    def close(self, timeout=5):
+        """Write anything still queued and stop the thread.
+
+        Args:
+            timeout (float): The most seconds to wait for the last write.
+
+        Returns:
+            None
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.is_alive():
+            self.join(timeout)
+
+
+def main():
+    """Print what a session snapshot holds."""
+    parser = argparse.ArgumentParser(description="Memory Game session snapshots")
+    parser.add_argument("command", choices=["show"])
+    parser.add_argument("path", nargs="?", default=SESSION_PATH)
+    args = parser.parse_args()
+
+    try:
+        session = read_session(args.path)
+    except (OSError, SessionError) as e:
+        raise SystemExit(f"Could not read session: {e}")
+    matched = sum(bin(byte).count("1") for byte in session.matched)
+    print(f"{session.path}: {session.player_name or '(no name)'} playing {session.deck} "
+          f"({session.manifest_id})")
+    print(f"  saved {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session.saved))}, "
+          f"seed {session.seed:016x}")
+    print(f"  {session.card_count} cards, {len(session.images)} faces, {matched} matched, "
+          f"{session.guesses} guesses, selected {session.selected or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Sydney Umezurike
+simulation.py
+CS 5001 - Memory Game
+Headless batch simulator for the Memory Game.
+Plays many complete games at once on NumPy
+arrays of face ids so difficulty and leaderboard
+scores can be checked without opening a window.
+"""
+
+import numpy as np
+from constants import DEFAULT_CARD_COUNT
+
+# Player models understood by the simulator
+RANDOM_PLAYER = "random"
+PERFECT_MEMORY = "perfect"
+LIMITED_MEMORY = "limited"
+PLAYER_MODELS = (RANDOM_PLAYER, PERFECT_MEMORY, LIMITED_MEMORY)
+
+# Number of games simulated together in one set of arrays
+DEFAULT_BATCH_SIZE = 100000
+
+
+def generate_boards(n_games, card_count=DEFAULT_CARD_COUNT, rng=None):
+    """Generate many shuffled boards at once.
+
+    Each row holds the face ids of one board. Every face id from
+    0 to card_count // 2 - 1 appears exactly twice, like the pairs
+    built by MemoryGameLogic.create_deck.
+
+    Args:
+        n_games (int): The number of boards to generate.
+        card_count (int): The number of cards on each board.
+        rng (numpy.random.Generator): Random generator to shuffle with.
+
+    Returns:
+        numpy.ndarray: An (n_games, card_count) array of face ids.
+    """
+    if card_count < 2 or card_count % 2:
+        raise ValueError(f"card_count must be a positive even number, got {card_count}")
+    if rng is None:
+        rng = np.random.default_rng()
+    pairs = np.arange(card_count // 2, dtype=np.int32)
+    boards = np.tile(np.concatenate((pairs, pairs)), (n_games, 1))
+    return rng.permuted(boards, axis=1)  # Shuffle every row independently
+
+
+def _pick_random(mask, rng):
+    """Pick one random True position from every row of a mask.
+
+    Args:
+        mask (numpy.ndarray): Boolean (rows, cards) array of allowed positions.
+        rng (numpy.random.Generator): Random generator.
+
+    Returns:
+        numpy.ndarray: The chosen column for every row.
+    """
+    keys = rng.random(mask.shape)
+    keys[~mask] = 2.0  # Never pick a position that is not allowed
+    return keys.argmin(axis=1)
+
+
+def _first_true(mask):
+    """Return the first True column of every row, or -1 if there is none.
+
+    Args:
+        mask (numpy.ndarray): Boolean (rows, cards) array.
+
+    Returns:
+        numpy.ndarray: Column index per row, -1 where the row is empty.
+    """
+    found = mask.any(axis=1)
+    return np.where(found, mask.argmax(axis=1), -1)
+
+
+class BatchSimulator:
+    def __init__(self, card_count=DEFAULT_CARD_COUNT, model=PERFECT_MEMORY,
+                 memory=4, seed=None):
+        """Initialize the batch simulator.
+
+        Args:
+            card_count (int): The number of cards on each board.
+            model (str): The player model, one of PLAYER_MODELS.
+            memory (int): How many recent flips a limited memory player remembers.
+            seed (int): Seed for the random generator. Defaults to None.
+        """
+        if model not in PLAYER_MODELS:
+            raise ValueError(f"Unknown player model {model!r}, expected one of {PLAYER_MODELS}")
+        if card_count < 2 or card_count % 2:
+            raise ValueError(f"card_count must be a positive even number, got {card_count}")
+        self.card_count = card_count
+        self.model = model
+        self.memory = memory
+        self.rng = np.random.default_rng(seed)
+
+    def generate_boards(self, n_games):
+        """Generate shuffled boards with this simulator's generator.
+
+        Args:
+            n_games (int): The number of boards to generate.
+
+        Returns:
+            numpy.ndarray: An (n_games, card_count) array of face ids.
+        """
+        return generate_boards(n_games, self.card_count, self.rng)
+
+    def run(self, n_games, batch_size=DEFAULT_BATCH_SIZE):
+        """Play n_games complete games and count the moves of each.
+
+        Args:
+            n_games (int): The number of games to play.
+            batch_size (int): The number of games simulated together.
+
+        Returns:
+            numpy.ndarray: The number of moves each game took.
+        """
+        moves = np.empty(n_games, dtype=np.int32)
+        for start in range(0, n_games, batch_size):
+            stop = min(start + batch_size, n_games)
+            moves[start:stop] = self.play(self.generate_boards(stop - start))
+        return moves
+
+    def play(self, boards):
+        """Play every board in an array to the end.
+
+        A move is two flips, the same as one guess in MemoryGame.
+
+        Args:
+            boards (numpy.ndarray): An (n_games, card_count) array of face ids.
+
+        Returns:
+            numpy.ndarray: The number of moves each game took.
+        """
+        n_games, card_count = boards.shape
+        moves = np.zeros(n_games, dtype=np.int32)
+        rows = np.arange(n_games)  # Which game each working row belongs to
+        faces = boards
+        matched = np.zeros(boards.shape, dtype=bool)
+        # Flip number at which each position was last seen, -1 if never seen
+        seen_at = np.full(boards.shape, -1, dtype=np.int64)
+        remaining = np.full(n_games, card_count // 2, dtype=np.int32)
+        flip = 0
+
+        while rows.size:
+            local = np.arange(rows.size)
+            if self.model == RANDOM_PLAYER:
+                first, second = self._random_move(matched)
+            else:
+                first, second = self._memory_move(faces, matched, seen_at, flip)
+            seen_at[local, first] = flip
+            seen_at[local, second] = flip + 1
+            flip += 2
+
+            # Vectorized match check on the two flipped face ids
+            active = remaining > 0
+            hit = (faces[local, first] == faces[local, second]) & active
+            matched[local[hit], first[hit]] = True
+            matched[local[hit], second[hit]] = True
+            remaining -= hit
+            moves[rows] += active
+
+            # Drop finished games once they are a large share of the batch
+            done = remaining == 0
+            if done.all():
+                break
+            if done.sum() * 2 >= rows.size:
+                keep = ~done
+                rows, faces, matched = rows[keep], faces[keep], matched[keep]
+                seen_at, remaining = seen_at[keep], remaining[keep]
+            else:
+                # Park finished games; their picks are ignored from now on
+                matched[done] = True
+        return moves
+
+    def _random_move(self, matched):
+        """Pick two different unmatched positions at random.
+
+        Args:
+            matched (numpy.ndarray): Boolean (rows, cards) matched flags.
+
+        Returns:
+            tuple: The first and second flipped column of every row.
+        """
+        open_cards = ~matched
+        first = _pick_random(open_cards, self.rng)
+        open_cards[np.arange(first.size), first] = False
+        second = _pick_random(open_cards, self.rng)
+        return first, second
+
+    def _memory_move(self, faces, matched, seen_at, flip):
+        """Pick two positions the way a player with memory would.
+
+        A player first matches any pair they already know. Otherwise they
+        flip an unknown card, then its known partner if they remember it,
+        or another unknown card if they do not.
+
+        Args:
+            faces (numpy.ndarray): The face ids of every working board.
+            matched (numpy.ndarray): Boolean (rows, cards) matched flags.
+            seen_at (numpy.ndarray): Flip number each position was last seen at.
+            flip (int): The number of the next flip.
+
+        Returns:
+            tuple: The first and second flipped column of every row.
+        """
+        local = np.arange(faces.shape[0])
+        known = (seen_at >= 0) & ~matched
+        if self.model == LIMITED_MEMORY:
+            known &= seen_at >= flip - self.memory
+
+        # Count remembered cards per face to find known pairs
+        pairs = faces.shape[1] // 2
+        keys = (local[:, None] * pairs + faces)[known]
+        counts = np.bincount(keys, minlength=local.size * pairs).reshape(local.size, pairs)
+        pair_face = _first_true(counts >= 2)
+        has_pair = pair_face >= 0
+
+        # Otherwise flip an unknown card first
+        unknown = ~known & ~matched
+        first = _pick_random(unknown, self.rng)
+        first_face = np.where(has_pair, pair_face, faces[local, first])
+        same_face = faces == first_face[:, None]
+        pair_first = _first_true(known & same_face)
+        first = np.where(has_pair, pair_first, first)
+
+        # Second card is the remembered partner, or else another unknown card
+        same_face[local, first] = False
+        partner = _first_true(known & same_face)
+        unknown[local, first] = False
+        second = np.where(partner >= 0, partner, _pick_random(unknown, self.rng))
+        return first, second
+
+
+def simulate_games(n_games, card_count=DEFAULT_CARD_COUNT, model=PERFECT_MEMORY,
+                   memory=4, seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Play many headless games and return their move counts.
+
+    Args:
+        n_games (int): The number of games to play.
+        card_count (int): The number of cards on each board.
+        model (str): The player model, one of PLAYER_MODELS.
+        memory (int): How many recent flips a limited memory player remembers.
+        seed (int): Seed for the random generator. Defaults to None.
+        batch_size (int): The number of games simulated together.
+
+    Returns:
+        numpy.ndarray: The number of moves each game took.
+    """
+    simulator = BatchSimulator(card_count, model, memory, seed)
+    return simulator.run(n_games, batch_size)
@@ -0,0 +1,282 @@
+"""
+Sydney Umezurike
+solver.py
+CS 5001 - Memory Game
+Expected number of moves for a board under perfect
+memory play, used to put games of different sizes on
+one scale. Small and medium boards are solved exactly
+with a dynamic program over (unseen cards, known
+unmatched cards) states; huge boards fall back to a
+Monte Carlo estimate over the batch simulator, spread
+over several processes. Results are saved in a table
+in the assets folder so the leaderboard only looks
+them up.
+
+Usage:
+    python src/solver.py table --max-cards 2000 --monte-carlo 5000 10000
+    python src/solver.py moves 8 12 100000
+"""
+
+import argparse
+import bisect
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from constants import EXPECTED_MOVES_PATH
+
+TABLE_VERSION = 1
+
+# Largest board solved exactly; the DP takes about (cards / 2) ** 2 steps
+EXACT_LIMIT = 2000
+
+# Games played for one Monte Carlo estimate
+MONTE_CARLO_GAMES = 200
+
+
+def solve_expected_moves(max_cards):
+    """Solve the expected moves of every even board size up to max_cards.
+
+    A perfect memory player matches a known pair first. Otherwise they
+    flip an unseen card and then its partner if it has been seen, or
+    another unseen card if it has not. With u unseen cards and k seen
+    but unmatched ones, the first flip finds a known partner with
+    chance k / u. Otherwise the second flip is its partner with chance
+    1 / (u - 1), the partner of a seen card with chance k / (u - 1),
+    which is then matched on the next move, or a new face.
+
+    E(u, k) only depends on smaller u, so rows are filled upwards and
+    only the last two are kept. E(n, 0) of every even n comes out of
+    the same pass.
+
+    Args:
+        max_cards (int): The largest board to solve.
+
+    Returns:
+        dict: Card count -> expected moves, for every even count from 2.
+    """
+    results = {}
+    older = [0.0]  # Row u - 2, indexed by k
+    old = [0.0, 1.0]  # Row u - 1; one unseen card whose partner is known
+    for u in range(2, max_cards + 1):
+        row = [0.0] * (u + 1)
+        for k in range(u % 2, u + 1, 2):
+            expected = 0.0
+            if k:
+                expected += k / u * (1 + old[k - 1])
+            if u > k:
+                after = older[k]
+                new_face = (1 + after + k * (2 + after)) / (u - 1)
+                if u - 2 > k:
+                    new_face += (u - 2 - k) / (u - 1) * (1 + older[k + 2])
+                expected += (u - k) / u * new_face
+            row[k] = expected
+        if u % 2 == 0:
+            results[u] = row[0]
+        older, old = old, row
+    return results
+
+
+def _simulate_chunk(card_count, games, seed):
+    """Play one share of a Monte Carlo estimate. Runs in a worker process.
+
+    Returns:
+        tuple: (sum of moves, sum of squared moves).
+    """
+    from simulation import simulate_games, PERFECT_MEMORY
+
+    moves = simulate_games(games, card_count, PERFECT_MEMORY, seed=seed,
+                           batch_size=max(1, min(games, 10 ** 7 // card_count)))
+    moves = moves.astype(float)
+    return float(moves.sum()), float((moves * moves).sum())
+
+
+def estimate_expected_moves(card_count, games=MONTE_CARLO_GAMES, workers=None, seed=None):
+    """Estimate the expected moves of a board by simulating perfect players.
+
+    The games are split between worker processes, each with its own
+    seed, and the partial sums are combined.
+
+    Args:
+        card_count (int): The number of cards on the board.
+        games (int): The number of games to play.
+        workers (int): Processes to use. Defaults to the number of CPUs.
+        seed (int): Seed for the random generators. Defaults to None.
+
+    Returns:
+        tuple: (mean moves, standard error of the mean).
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, games))
+    shares = [games // workers + (i < games % workers) for i in range(workers)]
+    seeds = [None if seed is None else seed + i for i in range(workers)]
+    if workers > 1:
+        # Spawn, since the game may already have Tk and threads running
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            parts = list(pool.map(_simulate_chunk, [card_count] * workers, shares, seeds))
+    else:
+        parts = [_simulate_chunk(card_count, games, seeds[0])]
+    total = sum(part[0] for part in parts)
+    squares = sum(part[1] for part in parts)
+    mean = total / games
+    variance = max(0.0, squares / games - mean * mean) * games / max(1, games - 1)
+    return mean, math.sqrt(variance / games)
+
+
+def expected_moves(card_count, exact_limit=EXACT_LIMIT, games=MONTE_CARLO_GAMES, workers=None):
+    """Return the expected moves of one board, solved or estimated.
+
+    Args:
+        card_count (int): The number of cards on the board.
+        exact_limit (int): The largest board to solve exactly.
+        games (int): Games to simulate for boards past the exact limit.
+        workers (int): Processes to simulate with.
+
+    Returns:
+        float: The expected number of moves.
+    """
+    if card_count <= exact_limit:
+        return solve_expected_moves(card_count)[card_count]
+    return estimate_expected_moves(card_count, games, workers)[0]
+
+
+class ExpectedMovesTable:
+    def __init__(self, path=EXPECTED_MOVES_PATH):
+        """Load the precomputed table of expected moves.
+
+        When the file is missing or unreadable, the exact part is solved
+        once here, so lookups never have to solve anything.
+
+        Args:
+            path (str): The table file.
+        """
+        self.path = path
+        self.moves = {}  # Card count -> expected moves
+        self.estimated = {}  # Card count -> (mean, standard error) from Monte Carlo
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+            if data.get("version") != TABLE_VERSION:
+                raise ValueError(f"unsupported version {data.get('version')}")
+            self.moves = {int(count): value for count, value in data["exact"].items()}
+            self.estimated = {int(count): tuple(value) for count, value in data["estimated"].items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Expected moves table not loaded ({e}); solving up to {EXACT_LIMIT} cards")
+            self.moves = solve_expected_moves(EXACT_LIMIT)
+        self.counts = sorted(set(self.moves) | set(self.estimated))
+
+    def lookup(self, card_count):
+        """Return the expected moves for a board.
+
+        Counts between table entries are interpolated, and counts past
+        the end are extrapolated from the last two entries, which is
+        close since the expected moves grow almost linearly.
+
+        Args:
+            card_count (int): The number of cards on the board.
+
+        Returns:
+            float: The expected number of moves, or None for an empty board.
+        """
+        value = self._value(card_count)
+        if value is not None or card_count < 2 or len(self.counts) < 2:
+            return value
+        position = min(bisect.bisect(self.counts, card_count), len(self.counts) - 1)
+        low, high = self.counts[max(0, position - 1)], self.counts[max(1, position)]
+        low_value, high_value = self._value(low), self._value(high)
+        return low_value + (high_value - low_value) * (card_count - low) / (high - low)
+
+    def efficiency(self, moves, card_count):
+        """Score a game against perfect memory play.
+
+        Args:
+            moves (int): The moves the game took.
+            card_count (int): The number of cards on the board.
+
+        Returns:
+            float: Expected moves over actual moves, 1.0 for a game as good as
+                perfect memory on average, or None if it cannot be scored.
+        """
+        expected = self.lookup(card_count) if card_count else None
+        if expected is None or moves <= 0:
+            return None
+        return expected / moves
+
+    def _value(self, card_count):
+        """Return the stored value for a card count, or None."""
+        if card_count in self.moves:
+            return self.moves[card_count]
+        if card_count in self.estimated:
+            return self.estimated[card_count][0]
+        return None
+
+
+def build_table(path, max_cards=EXACT_LIMIT, monte_carlo=(), games=MONTE_CARLO_GAMES,
+                workers=None, seed=5001):
+    """Solve and estimate expected moves and save them as the table.
+
+    Args:
+        path (str): Where to write the table.
+        max_cards (int): Solve every even board up to this size exactly.
+        monte_carlo (iterable): Larger card counts to estimate.
+        games (int): Games to simulate for each estimate.
+        workers (int): Processes to simulate with.
+        seed (int): Seed for the simulations.
+
+    Returns:
+        dict: The table that was written.
+    """
+    exact = solve_expected_moves(max_cards)
+    estimated = {}
+    for card_count in monte_carlo:
+        if card_count > max_cards:
+            mean, error = estimate_expected_moves(card_count, games, workers, seed)
+            estimated[str(card_count)] = [round(mean, 4), round(error, 4)]
+    table = {"version": TABLE_VERSION, "model": "perfect memory", "games": games,
+             "exact": {str(count): round(value, 6) for count, value in exact.items()},
+             "estimated": estimated}
+    temp = path + ".tmp"
+    with open(temp, "w") as file:
+        json.dump(table, file, separators=(",", ":"))
+    os.replace(temp, path)
+    return table
+
+
+def main():
+    """Build the expected moves table, or print the expected moves of some boards."""
+    parser = argparse.ArgumentParser(description="Memory Game expected moves solver")
+    parser.add_argument("command", choices=["table", "moves"])
+    parser.add_argument("counts", nargs="*", type=int, help="card counts for the moves command")
+    parser.add_argument("--max-cards", type=int, default=EXACT_LIMIT,
+                        help="largest board to solve exactly")
+    parser.add_argument("--monte-carlo", nargs="*", type=int, default=[],
+                        help="larger card counts to estimate for the table")
+    parser.add_argument("--games", type=int, default=MONTE_CARLO_GAMES,
+                        help="games simulated per estimate")
+    parser.add_argument("--workers", type=int, default=None, help="processes to simulate with")
+    args = parser.parse_args()
+
+    if args.command == "table":
+        start = time.perf_counter()
+        table = build_table(EXPECTED_MOVES_PATH, args.max_cards, args.monte_carlo,
+                            args.games, args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"{len(table['exact'])} exact and {len(table['estimated'])} estimated entries "
+              f"written to {EXPECTED_MOVES_PATH} in {elapsed:.1f} s")
+        return
+
+    for card_count in args.counts:
+        start = time.perf_counter()
+        if card_count <= args.max_cards:
+            value, note = expected_moves(card_count, args.max_cards), "exact"
+        else:
+            mean, error = estimate_expected_moves(card_count, args.games, args.workers)
+            value, note = mean, f"+/- {error:.2f}, {args.games} games"
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{card_count} cards: {value:.3f} moves ({note}) in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
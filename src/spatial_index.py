@@ -0,0 +1,171 @@
+"""
+Sydney Umezurike
+spatial_index.py
+CS 5001 - Memory Game
+Layout-aware spatial index used for click hit-testing.
+Maps a click coordinate to the card cell or button
+under it in constant time, no matter how many
+cards are on the board.
+"""
+
+import math
+from constants import (
+    CARD_WIDTH, CARD_HEIGHT, CARD_SPACING, START_X, START_Y, COLUMNS
+)
+
+# Size of the buckets used to look up rectangular regions such as buttons
+REGION_BUCKET_SIZE = 100
+
+# Hit kinds returned by SpatialIndex.lookup
+CARD_HIT = "card"
+REGION_HIT = "region"
+
+
+class SpatialIndex:
+    def __init__(self, card_count, columns=COLUMNS, start_x=START_X, start_y=START_Y,
+                 card_width=CARD_WIDTH, card_height=CARD_HEIGHT, spacing=CARD_SPACING):
+        """Build the index for a grid of cards.
+
+        Cards are laid out row by row. Card i sits in row i // columns and
+        column i % columns, centered on cell_center(i).
+
+        Args:
+            card_count (int): The number of cards on the board.
+            columns (int): The number of cards in each row.
+            start_x (int): The x-coordinate of the first card's center.
+            start_y (int): The y-coordinate of the first card's center.
+            card_width (int): The width of a card.
+            card_height (int): The height of a card.
+            spacing (int): The gap between neighbouring cards.
+        """
+        self.card_count = card_count
+        self.columns = columns
+        self.rows = math.ceil(card_count / columns) if columns else 0
+        self.start_x = start_x
+        self.start_y = start_y
+        self.half_width = card_width / 2
+        self.half_height = card_height / 2
+        self.pitch_x = card_width + spacing  # Distance between card centers
+        self.pitch_y = card_height + spacing
+        self.regions = {}  # Region name -> (x_range, y_range)
+        self.buckets = {}  # (bucket x, bucket y) -> list of region names
+
+    def cell_center(self, index):
+        """Return the center of a card's cell.
+
+        Args:
+            index (int): The card index.
+
+        Returns:
+            tuple: The (x, y) center of the card.
+        """
+        row, col = divmod(index, self.columns)
+        return (self.start_x + col * self.pitch_x,
+                self.start_y - row * self.pitch_y)
+
+    def add_region(self, name, x_range, y_range):
+        """Register a rectangular region such as a button.
+
+        Args:
+            name (str): The name returned when the region is clicked.
+            x_range (tuple): The (left, right) edges of the region.
+            y_range (tuple): The (bottom, top) edges of the region.
+
+        Returns:
+            None
+        """
+        self.regions[name] = (x_range, y_range)
+        for bx in range(self._bucket(x_range[0]), self._bucket(x_range[1]) + 1):
+            for by in range(self._bucket(y_range[0]), self._bucket(y_range[1]) + 1):
+                self.buckets.setdefault((bx, by), []).append(name)
+
+    def lookup(self, x, y):
+        """Find what is under a click.
+
+        Regions are checked before cards, so buttons win over cards.
+
+        Args:
+            x (float): The x-coordinate of the click.
+            y (float): The y-coordinate of the click.
+
+        Returns:
+            tuple: (REGION_HIT, name), (CARD_HIT, index) or None if nothing was hit.
+        """
+        region = self.region_at(x, y)
+        if region is not None:
+            return (REGION_HIT, region)
+        index = self.card_at(x, y)
+        if index is not None:
+            return (CARD_HIT, index)
+        return None
+
+    def region_at(self, x, y):
+        """Return the name of the region under a point, or None.
+
+        Args:
+            x (float): The x-coordinate of the point.
+            y (float): The y-coordinate of the point.
+
+        Returns:
+            str: The region name, or None.
+        """
+        for name in self.buckets.get((self._bucket(x), self._bucket(y)), ()):
+            (left, right), (bottom, top) = self.regions[name]
+            if left < x < right and bottom < y < top:
+                return name
+        return None
+
+    def card_at(self, x, y):
+        """Return the index of the card under a point, or None.
+
+        Args:
+            x (float): The x-coordinate of the point.
+            y (float): The y-coordinate of the point.
+
+        Returns:
+            int: The card index, or None if the point is between or outside cards.
+        """
+        # Shift by half a pitch so each cell is centered on its card
+        col = math.floor((x - self.start_x) / self.pitch_x + 0.5)
+        row = math.floor((self.start_y - y) / self.pitch_y + 0.5)
+        if not (0 <= col < self.columns and 0 <= row < self.rows):
+            return None
+        index = row * self.columns + col
+        if index >= self.card_count:
+            return None
+        center_x, center_y = self.cell_center(index)
+        if abs(center_x - x) < self.half_width and abs(center_y - y) < self.half_height:
+            return index
+        return None
+
+    def cells_in(self, x_range, y_range):
+        """Return the indices of the cards that fit completely inside an area.
+
+        Args:
+            x_range (tuple): The (left, right) edges of the area.
+            y_range (tuple): The (bottom, top) edges of the area.
+
+        Returns:
+            list: The card indices, in board order.
+        """
+        first_col = max(0, math.ceil((x_range[0] + self.half_width - self.start_x) / self.pitch_x))
+        last_col = min(self.columns - 1,
+                       math.floor((x_range[1] - self.half_width - self.start_x) / self.pitch_x))
+        first_row = max(0, math.ceil((self.start_y - y_range[1] + self.half_height) / self.pitch_y))
+        last_row = min(self.rows - 1,
+                       math.floor((self.start_y - y_range[0] - self.half_height) / self.pitch_y))
+        return [index
+                for row in range(first_row, last_row + 1)
+                for index in range(row * self.columns + first_col,
+                                   min(row * self.columns + last_col + 1, self.card_count))]
+
+    def _bucket(self, value):
+        """Return the region bucket a coordinate falls in.
+
+        Args:
+            value (float): A coordinate.
+
+        Returns:
+            int: The bucket number.
+        """
+        return math.floor(value / REGION_BUCKET_SIZE)
@@ -0,0 +1,168 @@
+"""
+Sydney Umezurike
+startup.py
+CS 5001 - Memory Game
+Helpers for a non-blocking game startup.
+Reads the deck and image files, or an asset pack,
+on a background thread while the splash screen is
+showing, and times how long it takes until the
+board is playable.
+"""
+
+import base64
+import json
+import os
+import queue
+import threading
+import time
+from deck_manifest import load_manifest, is_streamed_deck, describe_image
+from image_cache import ImageCache
+from flip_animation import FlipFrames
+from constants import ASSETS_PATH, IMAGE_CACHE_PATH, CARD_BACK, EAGER_FACE_LIMIT
+
+# Process-relative clock start, taken when this module is first imported
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    def __init__(self, start=PROCESS_START):
+        """Initialize the timer.
+
+        Args:
+            start (float): The perf_counter value to measure from.
+        """
+        self.start = start
+        self.marks = []  # (name, seconds since start), in order
+
+    def mark(self, name):
+        """Record that a startup stage has finished.
+
+        Args:
+            name (str): The stage name, such as "first_frame".
+
+        Returns:
+            None
+        """
+        self.marks.append((name, time.perf_counter() - self.start))
+
+    def report(self, path=None):
+        """Print the startup timings and optionally save them as JSON.
+
+        Args:
+            path (str): A JSON file to write the timings to. Defaults to None.
+
+        Returns:
+            dict: Stage name -> milliseconds since start.
+        """
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.marks}
+        print("Startup timing:")
+        for name, ms in timings.items():
+            print(f"  {name:<14}{ms:>10.1f} ms")
+        if path:
+            with open(path, "w") as file:
+                json.dump(timings, file, indent=2)
+        return timings
+
+
+class AssetPreloader(threading.Thread):
+    def __init__(self, deck_file, images=(), pack=None, assets_path=ASSETS_PATH,
+                 cache_path=IMAGE_CACHE_PATH):
+        """Initialize the preloader.
+
+        Args:
+            deck_file (str): The deck file name in the assets folder.
+            images (iterable): Extra image paths to load, such as UI images.
+            pack (AssetPack): A pack to take the deck and images from first. Defaults to None.
+            assets_path (str): The folder the deck is loaded from.
+            cache_path (str): The folder converted card images are saved in.
+        """
+        super().__init__(name="asset-preloader", daemon=True)
+        self.deck_file = deck_file
+        self.images = list(images)
+        self.pack = pack
+        self.assets_path = assets_path
+        self.cache_path = cache_path
+        self.pinned = set(self.images)  # UI images are never evicted
+        self.card_faces = []  # Face names read from the deck file
+        self.sources = {}  # Face path -> converted file in the image cache
+        self.ready = queue.Queue()  # (path, image data) waiting to be registered
+        self.errors = []
+
+    def run(self):
+        """Check the deck and read the bytes of every image it needs.
+
+        Faces not in the image cache yet are converted first, along with
+        their flip frames, and every face is read from its converted file.
+        A deck in the asset pack needs no checking or converting, and its
+        images are sliced from the mapped pack. Only file work happens here.
+        Tk is not thread safe, so shapes are registered on the main thread
+        by pump.
+
+        Returns:
+            None
+        """
+        if self.pack is not None and self.pack.has_deck(self.deck_file):
+            manifest = self.pack.manifest(self.deck_file)
+            self.card_faces = manifest.faces
+            self.errors.extend(manifest.errors)
+            paths = self.images + manifest.paths
+        # Huge decks are sampled per board, so only the UI images are preloaded for them
+        elif is_streamed_deck(self.deck_file, self.assets_path):
+            paths = self.images
+        else:
+            # Compiling the manifest here also warms its cache for load_deck
+            manifest = load_manifest(self.deck_file, self.assets_path)
+            self.card_faces = manifest.faces
+            self.errors.extend(manifest.errors)
+            if not manifest.errors:
+                cache = ImageCache(self.cache_path)
+                self.sources = cache.build(manifest.entries)
+                self.errors.extend(cache.errors)
+                if len(manifest.paths) <= EAGER_FACE_LIMIT:
+                    # Only converts frames the first time, so dealing a board finds them cached
+                    FlipFrames(os.path.join(self.cache_path, "flip")).build(
+                        [os.path.join(ASSETS_PATH, CARD_BACK)] + manifest.paths)
+            paths = self.images + manifest.paths
+
+        # The card back is scaled to the card size like the faces
+        card_back = os.path.join(ASSETS_PATH, CARD_BACK)
+        if card_back in self.images and (self.pack is None
+                                         or self.pack.image_data(card_back) is None):
+            cache = ImageCache(self.cache_path)
+            try:
+                self.sources.update(cache.build([describe_image(card_back)]))
+            except OSError as e:
+                self.errors.append(f"Could not read image {card_back}: {e}")
+            self.errors.extend(cache.errors)
+
+        for path in paths:
+            data = self.pack.image_data(path) if self.pack is not None else None
+            if data is not None:
+                self.ready.put((path, data))
+                continue
+            try:
+                with open(self.sources.get(path, path), "rb") as file:
+                    # Tk reads base64 image data on every platform
+                    self.ready.put((path, base64.b64encode(file.read())))
+            except OSError as e:
+                self.errors.append(f"Could not read image {path}: {e}")
+
+    def pump(self, assets, limit):
+        """Register up to limit preloaded images with the asset cache.
+
+        Call this from the Tk event loop, for example from screen.ontimer.
+
+        Args:
+            assets (AssetCache): The cache to register shapes with.
+            limit (int): The most images to register in this call.
+
+        Returns:
+            bool: True once every image has been read and registered.
+        """
+        for _ in range(limit):
+            try:
+                path, data = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            assets.register(path, pinned=path in self.pinned, data=data)
+        return not self.is_alive() and self.ready.empty()
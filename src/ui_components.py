@@ -7,36 +7,51 @@ such as the game border, status bar,
 splash screen, buttons, etc.
 """
 
-import turtle
 import os
-from constants import ASSETS_PATH, CARD_SPACING, CARD_WIDTH, CARD_HEIGHT, START_X, START_Y
+from asset_cache import get_asset_cache
+from layout import BoardLayout
+from overlay import OverlayLayer
+from constants import ASSETS_PATH
+
+# Button names used for click hit-testing
+QUIT_BUTTON_NAME = "quit"
+LOAD_BUTTON_NAME = "load"
+PAGE_UP_NAME = "page_up"
+PAGE_DOWN_NAME = "page_down"
+
+STATUS_FONT = ("Arial", 20, "bold")
+PAGE_FONT = ("Arial", 14)
+ARROW_FONT = ("Arial", 20, "bold")
+ARROW_SIZE = 30  # Width and height of the clickable page arrows
 
 class GameUI:
-    def __init__(self, screen):
+    def __init__(self, renderer, clock):
         """Initialize UI components
         
         Args:
-            screen (turtle.Screen): The turtle screen to draw on
+            renderer (Renderer): The renderer to draw with
+            clock (GameClock): The clock that updates the screen
         """
-        self.screen = screen
+        self.renderer = renderer
+        self.clock = clock
+        self.assets = get_asset_cache(renderer) if renderer is not None else None
+        self.layer = OverlayLayer(renderer)
+        self.layout = BoardLayout(0)
 
-    def draw_game_border(self):
+    def draw_game_border(self, layout=None):
         """Draw the main game border.
+        
+        Args:
+            layout (BoardLayout): The screen layout to draw with. Defaults
+                to the last one used.
             
         Returns:
             None
         """
-        border = turtle.Turtle()
-        border.hideturtle()
-        border.penup()
-        border.goto(-675, 400)
-        border.pendown()
-        border.pensize(3)
-        for i in range(2):
-            border.forward(700)
-            border.right(90)
-            border.forward(600)
-            border.right(90)
+        if layout is not None:
+            self.layout = layout
+        self.layer.set_box("game_border", *self.layout.board)
+        self.layer.flush()
 
     def draw_status_bar(self, guesses, matches):
         """Draw the status bar.
@@ -49,33 +64,15 @@ class GameUI:
             None
         """
         # Draw the status border
-        border = turtle.Turtle()
-        border.hideturtle()
-        border.speed(0)
-        border.penup()
-        border.goto(-675, -250)  # Start position for border
-        border.pendown()
-        border.pensize(3)
-        border.color("black")
-        for _ in range(2):
-            border.forward(700)  # Width of status bar
-            border.right(90)
-            border.forward(100)  # Height of status bar
-            border.right(90)
-        
-        # Draw the status text
-        status = turtle.Turtle()
-        status.hideturtle()
-        status.speed(0)
-        status.penup()
-        status.goto(-650, -300)  # Position for status text
-        status.color("black")
-        status.write(f"Status: {guesses} moves, {matches} matches", 
-                    font=("Arial", 20, "bold"))
+        self.layer.set_box("status_border", *self.layout.status)
+        self.update_status(guesses, matches)
 
     def update_status(self, guesses, matches):
         """Update the status bar text only.
         
+        The status text keeps a single persistent item that is rewritten
+        in place, so no new turtles or canvas items are created per guess.
+        
         Args:
             guesses (int): The number of guesses made.
             matches (int): The number of matches found.
@@ -83,30 +80,44 @@ class GameUI:
         Returns:
             None
         """
-        status = turtle.Turtle()
-        status.hideturtle()
-        status.speed(0)
-        status.penup()
-
-        # Clear the previous text by drawing a rectangle over it
-        status.fillcolor("#A0D6D8") 
-        status.goto(-650, -280)
-        status.begin_fill()
-        status.forward(400)
-        status.right(90)
-        status.forward(40)
-        status.right(90)
-        status.forward(400)
-        status.right(90)
-        status.forward(40)
-        status.end_fill()
-
-        # Write new status
-        status.penup()
-        status.goto(-650, -300)
-        status.color("black")
-        status.write(f"Status: {guesses} moves, {matches} matches", 
-                    font=("Arial", 20, "bold"))
+        left, top, width, height = self.layout.status
+        self.layer.set_text("status", left + 25, top - height / 2,
+                            f"Status: {guesses} moves, {matches} matches",
+                            STATUS_FONT)
+        self.layer.flush()
+
+    def update_page(self, first_row):
+        """Show which rows of a large board are on screen, with arrows to page.
+        
+        Nothing is drawn when the whole board fits.
+        
+        Args:
+            first_row (int): The first visible row.
+        
+        Returns:
+            None
+        """
+        layout = self.layout
+        left, top, width, height = layout.status
+        up, down = layout.pager()
+        if layout.paged:
+            last_row = min(layout.rows, first_row + layout.visible_rows)
+            text = f"Rows {first_row + 1}-{last_row} of {layout.rows}"
+            self.layer.set_text("page", left + 25, top - height + 10, text, PAGE_FONT)
+            self.layer.set_text("page_up", up[0] - 8, up[1] - 15, "▲", ARROW_FONT)
+            self.layer.set_text("page_down", down[0] - 8, down[1] - 15, "▼", ARROW_FONT)
+        else:
+            for name in ("page", "page_up", "page_down"):
+                self.layer.set_text(name, left, top, "", PAGE_FONT)
+        self.layer.flush()
+
+    def reset(self):
+        """Forget drawn items after the screen has been cleared.
+        
+        Returns:
+            None
+        """
+        self.layer.reset()
 
     def create_buttons(self):
         """Create the game buttons.
@@ -120,22 +131,34 @@ class GameUI:
         # Register button images
         quit_path = os.path.join(ASSETS_PATH, "quitbutton.gif")
         load_path = os.path.join(ASSETS_PATH, "load_deck_button.gif")
-        self.screen.addshape(quit_path)  
-        self.screen.addshape(load_path) 
+        self.assets.register(quit_path, pinned=True)
+        self.assets.register(load_path, pinned=True)
         
         # Create quit button
-        quit_btn = turtle.Turtle()
-        quit_btn.penup()
-        quit_btn.shape(quit_path)
-        quit_btn.goto(275, -290)
-        quit_btn.showturtle()
+        self.renderer.create_sprite(quit_path, *self.layout.quit_button)
         
         # Create load deck button
-        load_btn = turtle.Turtle()
-        load_btn.penup()
-        load_btn.shape(load_path)
-        load_btn.goto(160, -290)
-        load_btn.showturtle()
+        self.renderer.create_sprite(load_path, *self.layout.load_button)
+
+    def button_regions(self):
+        """Return the clickable area of each button.
+
+        Args:
+            None
+
+        Returns:
+            dict: Button name -> ((left, right), (bottom, top)).
+        """
+        layout = self.layout
+        regions = {
+            QUIT_BUTTON_NAME: layout.button_region(layout.quit_button),
+            LOAD_BUTTON_NAME: layout.button_region(layout.load_button),
+        }
+        if layout.paged:
+            half = ARROW_SIZE / 2
+            for name, (x, y) in zip((PAGE_UP_NAME, PAGE_DOWN_NAME), layout.pager()):
+                regions[name] = ((x - half, x + half), (y - half, y + half))
+        return regions
 
     def show_splash_screen(self):
         """Display the splash screen.
@@ -147,17 +170,11 @@ class GameUI:
             splash: The splash screen
         """
         try:
-            # Create and position splash screen
-            splash = turtle.Turtle()
-            splash.hideturtle()
-            splash.penup()
-            
             # Load and show splash image
             splash_path = os.path.join(ASSETS_PATH, "splashscreen.gif")
-            self.screen.addshape(splash_path)
-            splash.shape(splash_path)
-            splash.showturtle()
-            self.screen.update()
+            self.assets.register(splash_path, pinned=True)
+            splash = self.renderer.create_sprite(splash_path)
+            self.clock.request_update()
             
             return splash  
             
@@ -175,18 +192,19 @@ class GameUI:
         Returns:
             warning: The warning message
         """
-        warning = turtle.Turtle()
-        warning.hideturtle()
-        warning.penup()
+        return self.show_image("card_warning.gif")
+
+    def show_file_error(self):
+        """Show the file error message telling the user that
+        their deck could not be used.
         
-        warning_path = os.path.join(ASSETS_PATH, "card_warning.gif")
-        self.screen.addshape(warning_path)
-        warning.shape(warning_path)
-        warning.goto(0, 0)
-        warning.showturtle()
-        self.screen.update()
+        Args:
+            None
         
-        return warning  
+        Returns:
+            file_error: The file error message
+        """
+        return self.show_image("file_error.gif")
 
     def show_winner(self):
         """Show winner message.
@@ -197,18 +215,7 @@ class GameUI:
         Returns:
             winner: The winner message
         """
-        winner = turtle.Turtle()
-        winner.hideturtle()
-        winner.penup()
-        
-        winner_path = os.path.join(ASSETS_PATH, "winner.gif")
-        self.screen.addshape(winner_path)
-        winner.shape(winner_path)
-        winner.goto(0, 0)
-        winner.showturtle()
-        self.screen.update()
-        
-        return winner
+        return self.show_image("winner.gif")
 
     def show_quit_message(self):
         """Show quit message.
@@ -219,15 +226,20 @@ class GameUI:
         Returns:
             quit_msg: The quit message
         """
-        quit_msg = turtle.Turtle()
-        quit_msg.hideturtle()
-        quit_msg.penup()
-        
-        quit_path = os.path.join(ASSETS_PATH, "quitmsg.gif")
-        self.screen.addshape(quit_path)
-        quit_msg.shape(quit_path)
-        quit_msg.goto(0, 0)
-        quit_msg.showturtle()
-        self.screen.update()
-        
-        return quit_msg
+        return self.show_image("quitmsg.gif")
+
+    def show_image(self, image_name):
+        """Show an image from the assets folder in the middle of the screen.
+        
+        Args:
+            image_name (str): The image file name.
+        
+        Returns:
+            sprite: The sprite showing the image
+        """
+        image_path = os.path.join(ASSETS_PATH, image_name)
+        self.assets.register(image_path, pinned=True)
+        sprite = self.renderer.create_sprite(image_path, 0, 0)
+        self.clock.request_update()
+        
+        return sprite
@@ -0,0 +1,78 @@
+"""
+Sydney Umezurike
+test_deck_manifest.py
+CS 5001 - Memory Game
+Tests for compiling deck files into manifests.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from deck_manifest import load_manifest
+from game_logic import MemoryGameLogic
+from constants import MIN_CARD_COUNT
+
+
+class DeckManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="memory_deck_test_")
+        for name in ("a.gif", "b.gif", "c.gif"):
+            with open(os.path.join(self.folder, name), "wb") as file:
+                file.write(b"GIF89a\x64\x00\x96\x00" + name.encode())
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write_deck(self, names):
+        with open(os.path.join(self.folder, "deck.txt"), "w") as file:
+            file.write("\n".join(names))
+
+    def test_repeated_face_is_listed_once(self):
+        self.write_deck(["a.gif", "b.gif", "a.gif", "c.gif", "c.gif"])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            manifest = load_manifest("deck.txt", self.folder)
+        self.assertEqual(manifest.errors, [])
+        self.assertEqual(manifest.faces, ["a.gif", "b.gif", "c.gif"])
+        self.assertIn("a.gif more than once", output.getvalue())
+
+        # Every face id of a board dealt from it has exactly two cards
+        logic = MemoryGameLogic(manifest.paths)
+        for face_id in range(len(logic.board.table)):
+            self.assertEqual(len(set(logic.pair_positions(face_id))), 2)
+
+    def test_cached_manifest_is_reused(self):
+        self.write_deck(["a.gif", "b.gif"])
+        first = load_manifest("deck.txt", self.folder)
+        second = load_manifest("deck.txt", self.folder)
+        self.assertEqual(first.manifest_id, second.manifest_id)
+        self.assertEqual(second.faces, ["a.gif", "b.gif"])
+
+    def test_deck_with_too_few_faces_is_rejected(self):
+        self.write_deck(["a.gif", "a.gif"])
+        with contextlib.redirect_stdout(io.StringIO()):
+            manifest = load_manifest("deck.txt", self.folder).require_faces(MIN_CARD_COUNT // 2)
+        self.assertEqual(len(manifest.errors), 1)
+        self.assertIn("1 usable faces", manifest.errors[0])
+
+        self.write_deck(["a.gif", "b.gif"])
+        manifest = load_manifest("deck.txt", self.folder).require_faces(MIN_CARD_COUNT // 2)
+        self.assertEqual(manifest.errors, [])
+
+    def test_board_rejects_repeated_images(self):
+        with self.assertRaises(ValueError):
+            MemoryGameLogic(["a.gif", "b.gif", "a.gif"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Sydney Umezurike
+test_game_logic.py
+CS 5001 - Memory Game
+Tests for the incremental game state counters.
+Plays random games on large boards and compares every
+counter in MemoryGameLogic with a full scan of the
+cards after each move.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from game_logic import MemoryGameLogic
+
+
+def full_scan(logic):
+    """Work out every counter the slow way, by walking the whole board."""
+    board = logic.board
+    unmatched = [i for i in range(len(board)) if not board.matched[i]]
+    seen_unmatched = {}
+    for i in unmatched:
+        if i in logic.seen:
+            seen_unmatched.setdefault(board.face_id(i), set()).add(i)
+    return {
+        "won": all(board.matched[i] for i in range(len(board))),
+        "remaining_pairs": len(unmatched) // 2,
+        "matched_pairs": (len(board) - len(unmatched)) // 2,
+        "seen_unmatched": len(seen_unmatched),
+        "known_faces": {face_id for face_id, found in seen_unmatched.items() if len(found) == 2},
+    }
+
+
+def counters(logic):
+    """Read the same values from the incremental counters."""
+    return {
+        "won": logic.check_all_matched(),
+        "remaining_pairs": logic.remaining_pairs,
+        "matched_pairs": logic.matched_pairs(),
+        "seen_unmatched": logic.seen_unmatched_faces(),
+        "known_faces": logic.known_faces,
+    }
+
+
+class CounterTest(unittest.TestCase):
+    def play_and_check(self, card_count, seed, check_every):
+        """Play one random game, checking the counters against a full scan as it goes.
+
+        Half the time the player takes a pair it has already seen both cards
+        of, so large boards finish in a number of moves close to their size.
+        """
+        rng = random.Random(seed)
+        logic = MemoryGameLogic([f"face{i}.gif" for i in range(card_count // 2)], rng)
+        unmatched = list(range(card_count))
+        moves = 0
+        while not logic.check_all_matched():
+            pair = logic.known_pair() if rng.random() < 0.5 else None
+            first, second = pair if pair is not None else rng.sample(unmatched, 2)
+            logic.reveal(first)
+            logic.reveal(second)
+            if logic.check_indices(first, second):
+                unmatched.remove(first)
+                unmatched.remove(second)
+            else:
+                logic.hide(first)
+                logic.hide(second)
+            moves += 1
+            if moves % check_every == 0 or logic.check_all_matched():
+                expected = full_scan(logic)
+                self.assertEqual(counters(logic), expected, f"counters drifted after {moves} moves")
+                self.assertEqual(logic.known_pair() is None, not expected["known_faces"])
+        self.assertEqual(logic.matched_pairs(), card_count // 2)
+
+    def test_pair_positions(self):
+        logic = MemoryGameLogic([f"face{i}.gif" for i in range(500)], random.Random(1))
+        for face_id in range(len(logic.board.table)):
+            image = logic.board.table.image(face_id)
+            positions = logic.pair_positions(face_id)
+            self.assertEqual(len(set(positions)), 2)
+            self.assertTrue(all(logic.face_at(i) == image for i in positions))
+
+    def test_counters_match_full_scan_on_small_boards(self):
+        for seed in range(20):
+            self.play_and_check(12, seed, 1)
+
+    def test_counters_match_full_scan_on_large_boards(self):
+        for seed, card_count in enumerate((1000, 5000, 20000)):
+            self.play_and_check(card_count, seed, card_count // 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Sydney Umezurike
+test_game_server.py
+CS 5001 - Memory Game
+Tests for the asyncio game server.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import game_server
+from game_server import GameServer, IGNORED, FIRST
+
+
+class GameServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.folder = tempfile.mkdtemp(prefix="memory_server_test_")
+        self.server = GameServer(flip_delay=0.01, db_path=os.path.join(self.folder, "scores.db"))
+        self.listener = await self.server.start(unix_path=os.path.join(self.folder, "game.sock"))
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        await self.server.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    async def connect(self):
+        return await asyncio.open_unix_connection(os.path.join(self.folder, "game.sock"))
+
+    async def request(self, connection, message):
+        reader, writer = connection
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+    async def test_flip_rejects_booleans(self):
+        connection = await self.connect()
+        board = await self.request(connection, {"type": "new", "name": "ann", "cards": 8})
+        self.assertEqual(board["type"], "board")
+        for index in (True, False):
+            reply = await self.request(connection, {"type": "flip", "index": index})
+            self.assertEqual(reply["result"], IGNORED)
+        reply = await self.request(connection, {"type": "click", "x": True, "y": False})
+        self.assertEqual(reply["result"], IGNORED)
+        reply = await self.request(connection, {"type": "flip", "index": 1})
+        self.assertEqual(reply["result"], FIRST)
+        connection[1].close()
+
+    async def test_cold_deck_load_does_not_stall_other_sessions(self):
+        playing = await self.connect()
+        await self.request(playing, {"type": "new", "name": "ann", "cards": 8})
+
+        load_manifest = game_server.load_manifest
+
+        def slow_load_manifest(deck):
+            time.sleep(0.5)  # Stands in for compiling a large deck's manifest
+            return load_manifest(deck)
+        game_server.load_manifest = slow_load_manifest
+        try:
+            loading = await self.connect()
+            loading[1].write(json.dumps({"type": "new", "name": "bob", "cards": 8,
+                                         "deck": "custom_deck.txt"}).encode() + b"\n")
+            # The server shares this event loop, so a load that blocks it shows up here too
+            start = time.perf_counter()
+            await asyncio.sleep(0.05)  # Let the server start loading the deck
+            reply = await self.request(playing, {"type": "flip", "index": 0})
+            self.assertEqual(reply["result"], FIRST)
+            self.assertLess(time.perf_counter() - start, 0.3)
+            board = json.loads(await asyncio.wait_for(loading[0].readline(), 5))
+            self.assertEqual(board["type"], "board")
+        finally:
+            game_server.load_manifest = load_manifest
+        playing[1].close()
+        loading[1].close()
+
+    async def test_same_seed_deals_the_same_board(self):
+        faces = []
+        for _ in range(2):
+            connection = await self.connect()
+            board = await self.request(connection, {"type": "new", "name": "ann", "cards": 8,
+                                                    "seed": 1234})
+            self.assertEqual(board["seed"], 1234)
+            board_faces = []
+            for index in range(board["cards"]):
+                # One card per turn, so no turn ever ends and every face can be read
+                reply = await self.request(connection, {"type": "new", "name": "ann",
+                                                        "cards": 8, "seed": 1234})
+                reply = await self.request(connection, {"type": "flip", "index": index})
+                board_faces.append(reply["face"])
+            faces.append(board_faces)
+            connection[1].close()
+        self.assertEqual(faces[0], faces[1])
+
+    async def test_failed_deck_load_is_tried_again(self):
+        load_manifest = game_server.load_manifest
+
+        def broken_load_manifest(deck):
+            raise OSError("disk went away")
+        game_server.load_manifest = broken_load_manifest
+        connection = await self.connect()
+        try:
+            reply = await self.request(connection, {"type": "new", "name": "ann", "cards": 8,
+                                                    "deck": "custom_deck.txt"})
+            self.assertEqual(reply["type"], "error")
+        finally:
+            game_server.load_manifest = load_manifest
+        reply = await self.request(connection, {"type": "new", "name": "ann", "cards": 8,
+                                                "deck": "custom_deck.txt"})
+        self.assertEqual(reply["type"], "board")
+        connection[1].close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Sydney Umezurike
+test_image_cache.py
+CS 5001 - Memory Game
+Tests for decoding, fitting and caching card faces.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from deck_manifest import describe_image, image_dimensions
+from image_cache import Image, ImageCache, decode_image, fit_image
+
+
+def solid(width, height, value=200):
+    """Return an opaque gray image."""
+    return Image(width, height, bytearray([value, value, value, 255]) * (width * height))
+
+
+class FitImageTest(unittest.TestCase):
+    def test_wide_face_is_letterboxed(self):
+        card = fit_image(solid(200, 100), 80, 120)
+        self.assertEqual((card.width, card.height), (80, 120))
+        alpha = card.pixels[3::4]
+        top_band = alpha[:40 * 80]
+        middle = alpha[40 * 80:80 * 80]
+        self.assertEqual(set(top_band), {0})
+        self.assertEqual(set(middle), {255})
+
+    def test_card_shaped_face_fills_the_card(self):
+        card = fit_image(solid(100, 150), 80, 120)
+        self.assertEqual(set(card.pixels[3::4]), {255})
+
+
+class PnmTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="memory_image_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_every_pnm_kind_the_decoder_reads_has_a_size(self):
+        files = {
+            "P2": b"P2\n# plain gray\n2 3\n255\n" + b"9 " * 6,
+            "P3": b"P3 2 3 255\n" + b"1 2 3 " * 6,
+            "P5": b"P5\n# CREATOR: GIMP PNM Filter Version 1.1\n2 3\n255\n" + bytes(6),
+            "P6": b"P6\n2 3\n255\n" + bytes(18),
+        }
+        for kind, data in files.items():
+            self.assertEqual(image_dimensions(data), (2, 3), kind)
+            image = decode_image(data)
+            self.assertEqual((image.width, image.height), (2, 3), kind)
+
+    def test_gray_face_is_converted(self):
+        path = os.path.join(self.folder, "face.pgm")
+        with open(path, "wb") as file:
+            file.write(b"P5\n# gray face\n100 150\n255\n" + bytes(range(150)) * 100)
+        entry = describe_image(path)
+        self.assertEqual((entry["width"], entry["height"]), (100, 150))
+        cache = ImageCache(os.path.join(self.folder, "cache"), workers=1)
+        sources = cache.build([entry])
+        self.assertEqual(cache.errors, [])
+        self.assertTrue(sources[path].endswith(".ppm"))
+
+
+if __name__ == "__main__":
+    unittest.main()
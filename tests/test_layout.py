@@ -0,0 +1,103 @@
+"""
+Sydney Umezurike
+test_layout.py
+CS 5001 - Memory Game
+Tests for the board layout and laying the board out
+again when the window is resized.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from layout import BoardLayout
+from main import MemoryGame
+from renderer import NullRenderer
+from score_store import ScoreStore
+from constants import (ASSETS_PATH, DEFAULT_DECK, SCREEN_WIDTH, SCREEN_HEIGHT, MIN_CARD_COUNT,
+                       RESIZE_DELAY_MS)
+
+
+def inside(layout, x, y):
+    """Check if a card centered on (x, y) lies inside the board area."""
+    left, top, width, height = layout.board
+    return (left + layout.card_width / 2 <= x <= left + width - layout.card_width / 2
+            and top - height + layout.card_height / 2 <= y <= top - layout.card_height / 2)
+
+
+class BoardLayoutTest(unittest.TestCase):
+    def test_default_decks_fit_the_default_window(self):
+        # custom_deck.txt has 6 faces and default_deck.txt has 7, so they deal up to 14 cards
+        for count in range(MIN_CARD_COUNT, 15, 2):
+            layout = BoardLayout(count, SCREEN_WIDTH, SCREEN_HEIGHT)
+            self.assertFalse(layout.paged, f"{count} cards")
+            self.assertEqual(layout.slots, count)
+            index = layout.hit_index()
+            for card in range(count):
+                self.assertTrue(inside(layout, *index.cell_center(card)), f"card {card} of {count}")
+
+    def test_window_size_changes_the_grid(self):
+        small = BoardLayout(12, 500, 400)
+        large = BoardLayout(12, 1200, 900)
+        self.assertTrue(small.paged)
+        self.assertFalse(large.paged)
+        self.assertLess(small.columns, large.columns)
+
+
+class ResizeTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="memory_layout_test_")
+        # Manifests and converted images are written next to this copy of the deck
+        assets_path = os.path.join(self.folder, "assets")
+        os.mkdir(assets_path)
+        with open(os.path.join(ASSETS_PATH, DEFAULT_DECK)) as file:
+            faces = file.read().split()
+        for name in [DEFAULT_DECK] + faces:
+            shutil.copy(os.path.join(ASSETS_PATH, name), assets_path)
+        self.renderer = NullRenderer()
+        store = ScoreStore(os.path.join(self.folder, "scores.db"),
+                           legacy_path=os.path.join(self.folder, "none.txt"))
+        self.game = MemoryGame(self.renderer, assets_path, os.path.join(self.folder, "image_cache"),
+                               store)
+        self.game.replays_path = None
+        self.game.session_path = None
+        self.game.card_count = 12
+        self.game.setup_game()
+
+    def tearDown(self):
+        self.game.leaderboard.store.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_resize_lays_the_board_out_again(self):
+        game = self.game
+        self.assertEqual(len(game.cards), 12)
+        game.flip_card(5)
+
+        self.renderer.resize(640, 480)
+        self.renderer.advance(RESIZE_DELAY_MS // 2)
+        self.assertEqual(game.layout.window_size, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.renderer.resize(660, 500)  # Still dragging, so the rebuild waits again
+        self.renderer.advance(RESIZE_DELAY_MS)
+        self.assertEqual(game.layout.window_size, (660, 500))
+        self.assertTrue(game.layout.paged)
+        self.assertIn(5, game.layout.visible_cells(game.first_row))
+        for index, sprite in game.cards.items():
+            self.assertTrue(inside(game.layout, sprite.x, sprite.y), f"card {index}")
+        self.assertEqual(game.cards[5].shape, game.logic.board.image(5))
+
+        self.renderer.resize(SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.renderer.advance(RESIZE_DELAY_MS)
+        self.assertFalse(game.layout.paged)
+        self.assertEqual(sorted(game.cards), list(range(12)))
+        self.assertEqual(game.selected_cards, [5])
+
+
+if __name__ == "__main__":
+    unittest.main()
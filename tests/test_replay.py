@@ -0,0 +1,68 @@
+"""
+Sydney Umezurike
+test_replay.py
+CS 5001 - Memory Game
+Tests for the replay file format.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from replay import (OLD_HEADER, V3_HEADER, REPLAY_MAGIC, FLIP, WIN, Replay, ReplayEngine,
+                    ReplayWriter, pack_text, read_replay)
+from constants import CARD_WIDTH, CARD_HEIGHT, CARD_SPACING
+
+
+class ReplayFormatTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="memory_replay_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_round_trip_past_two_byte_card_count(self):
+        path = os.path.join(self.folder, "big.mgr")
+        writer = ReplayWriter(path, 12345, "huge_deck", "0123456789abcdef", 100000, "ann",
+                              lambda: 0)
+        writer.flip(99999)
+        writer.win(50000)
+        writer.close()
+
+        replay = read_replay(path)
+        self.assertEqual(replay.card_count, 100000)
+        self.assertEqual(replay.seed, 12345)
+        self.assertEqual(replay.deck, "huge_deck")
+        self.assertEqual(replay.player_name, "ann")
+        self.assertEqual(replay.manifest_id, "0123456789abcdef")
+        self.assertEqual(replay.card_size, (CARD_WIDTH, CARD_HEIGHT, CARD_SPACING))
+        self.assertEqual([(kind, value) for kind, _, value in replay.events()],
+                         [(FLIP, 99999), (WIN, 50000)])
+
+    def test_reads_version_2_header(self):
+        data = OLD_HEADER.pack(REPLAY_MAGIC, 2, 7, 12, bytes(8), 0.0)
+        data += pack_text("default_deck.txt") + pack_text("ann")
+        replay = Replay(data)
+        self.assertEqual(replay.card_count, 12)
+        self.assertEqual(replay.deck, "default_deck.txt")
+        self.assertEqual(list(replay.events()), [])
+        self.assertIsNone(replay.card_size)
+
+    def test_replay_without_card_size_is_refused(self):
+        data = V3_HEADER.pack(REPLAY_MAGIC, 3, 7, 4, bytes(8), 0.0)
+        data += pack_text("default_deck.txt") + pack_text("ann")
+        result = ReplayEngine().verify(Replay(data), claimed=2)
+        self.assertFalse(result.valid)
+        self.assertEqual(len(result.problems), 1)
+        self.assertIn("layout unknown", result.problems[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Sydney Umezurike
+test_scheduler.py
+CS 5001 - Memory Game
+Tests for the game clock.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from renderer import RecordingRenderer
+from scheduler import GameClock
+from ui_components import GameUI
+
+
+class GameClockTest(unittest.TestCase):
+    def setUp(self):
+        self.renderer = RecordingRenderer()
+        self.clock = GameClock(self.renderer)
+
+    def test_failing_timer_does_not_stop_the_clock(self):
+        ran = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        self.clock.schedule(10, fail)
+        self.clock.schedule(10, lambda: ran.append("same tick"))
+        self.clock.schedule(50, lambda: ran.append("later"))
+        with redirect_stdout(StringIO()) as output:
+            self.renderer.advance(100)
+        self.assertEqual(ran, ["same tick", "later"])
+        self.assertIn("boom", output.getvalue())
+
+    def test_images_share_one_update_per_tick(self):
+        ui = GameUI(self.renderer, self.clock)
+        ui.show_splash_screen()
+        ui.show_winner()
+        ui.show_quit_message()
+        self.assertEqual(self.renderer.count("update"), 0)
+        self.renderer.advance(20)
+        self.assertEqual(self.renderer.count("update"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+Sydney Umezurike
+test_score_store.py
+CS 5001 - Memory Game
+Tests for the leaderboard score database.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from score_store import ScoreStore
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="memory_scores_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_malformed_lines_are_skipped(self):
+        legacy = os.path.join(self.folder, "leaderboard.txt")
+        with open(legacy, "w") as file:
+            file.write("ann,12\nno comma here\nbob,lots\n\ncara, 9\nsmith, jr,15\n")
+        store = ScoreStore(os.path.join(self.folder, "scores.db"), legacy_path=legacy)
+        try:
+            self.assertEqual(store.top(5), [("cara", 9), ("ann", 12), ("smith, jr", 15)])
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Sydney Umezurike
+test_session.py
+CS 5001 - Memory Game
+Tests for resuming a saved board.
+
+Usage:
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from main import MemoryGame
+from renderer import NullRenderer
+from score_store import ScoreStore
+from session import SessionBoard, read_session
+from startup import StartupTimer
+from constants import ASSETS_PATH, DEFAULT_DECK
+
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp(prefix="memory_session_test_")
+        self.session_path = os.path.join(self.folder, "session.mgs")
+        # Manifests and converted images are written next to this copy of the deck
+        self.assets_path = os.path.join(self.folder, "assets")
+        os.mkdir(self.assets_path)
+        with open(os.path.join(ASSETS_PATH, DEFAULT_DECK)) as file:
+            faces = file.read().split()
+        for name in [DEFAULT_DECK] + faces:
+            shutil.copy(os.path.join(ASSETS_PATH, name), self.assets_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def new_game(self):
+        """Create a headless game that saves nowhere outside the test folder."""
+        store = ScoreStore(os.path.join(self.folder, "scores.db"),
+                           legacy_path=os.path.join(self.folder, "none.txt"))
+        game = MemoryGame(NullRenderer(), self.assets_path, os.path.join(self.folder, "image_cache"),
+                          store)
+        game.replays_path = None
+        game.session_path = None
+        return game
+
+    def test_resuming_a_fully_matched_board_wins_it(self):
+        game = self.new_game()
+        game.player_name = "ann"
+        game.card_count = 4
+        game.setup_game()
+        for face_id in range(game.card_count // 2):
+            game.logic.check_indices(*game.logic.pair_positions(face_id))
+        # Saved after the last match, then closed before the win was scored
+        parts = SessionBoard(game.seed, game.current_deck, None, game.player_name,
+                             game.logic.board, game.assets.sources).snapshot(3, 0, [])
+        with open(self.session_path, "wb") as file:
+            file.write(b"".join(parts))
+        game.leaderboard.store.close()
+
+        resumed = self.new_game()
+        resumed.session_path = self.session_path
+        resumed.resume(read_session(self.session_path), StartupTimer())
+        resumed.session_writer.flush(timeout=5)
+        self.assertEqual(resumed.leaderboard.store.top(1), [("ann", 3)])
+        self.assertFalse(os.path.exists(self.session_path))
+        resumed.session_writer.close()
+        resumed.leaderboard.store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()